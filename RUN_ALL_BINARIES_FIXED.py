@@ -12,6 +12,10 @@ import signal
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from afl_stats import parse_fuzzer_stats
+from stats_watcher import StatsWatcher
+from stats_bus import attach_stats_bus
+
 # ANSI Colors
 GREEN = '\033[92m'
 CYAN = '\033[96m'
@@ -36,6 +40,8 @@ class MultiBinaryRunner:
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
         self.fuzzers = []
+        # Published stats come from a running stats_bus collector when there is one
+        self.stats_watcher = StatsWatcher(bus=attach_stats_bus())
         self.start_time = None
         self.end_time = None
         
@@ -169,6 +175,7 @@ class MultiBinaryRunner:
                 'output_dir': output_dir,
                 'binary': binary_info
             })
+            self.stats_watcher.subscribe(output_dir / "default/fuzzer_stats")
             
             print(f"{GREEN}[✓] {name} started (PID: {process.pid}){RESET}")
             return True
@@ -191,6 +198,8 @@ class MultiBinaryRunner:
                     fuzzer_info['process'].kill()
                 except:
                     pass
+        
+        self.stats_watcher.close()
     
     def monitor_progress(self, duration_hours):
         """Monitor all running fuzzers for specified duration"""
@@ -226,27 +235,23 @@ class MultiBinaryRunner:
         total_crashes = 0
         total_paths = 0
         
+        # Only fuzzer_stats files written since the last update are re-read
+        self.stats_watcher.poll()
+        
         for fuzzer_info in self.fuzzers:
             name = fuzzer_info['name']
             output_dir = fuzzer_info['output_dir']
             
-            # Count crashes
-            crashes = len(list(output_dir.rglob("crashes/id:*")))
-            
-            # Get paths from stats
+            # Get crashes and paths from stats
             stats_file = output_dir / "default/fuzzer_stats"
+            crashes = 0
             paths = 0
             execs = 0
-            if stats_file.exists():
-                with open(stats_file) as f:
-                    for line in f:
-                        if 'corpus_count' in line:
-                            paths = int(line.split(':')[1].strip())
-                        elif 'execs_done' in line:
-                            try:
-                                execs = int(line.split(':')[1].strip())
-                            except:
-                                pass
+            stats = self.stats_watcher.get(stats_file)
+            if stats is not None:
+                crashes = stats.saved_crashes
+                paths = stats.corpus_count
+                execs = stats.execs_done
             
             print(f"{name:15s}: {crashes:3d} crashes | {paths:5d} paths | {execs:8d} execs")
             
@@ -282,18 +287,11 @@ class MultiBinaryRunner:
             paths = 0
             coverage = 0
             execs = 0
-            if stats_file.exists():
-                with open(stats_file) as f:
-                    for line in f:
-                        if 'corpus_count' in line:
-                            paths = int(line.split(':')[1].strip())
-                        elif 'bitmap_cvg' in line:
-                            coverage = float(line.split(':')[1].strip().rstrip('%'))
-                        elif 'execs_done' in line:
-                            try:
-                                execs = int(line.split(':')[1].strip())
-                            except:
-                                pass
+            stats = parse_fuzzer_stats(stats_file)
+            if stats is not None:
+                paths = stats.corpus_count
+                coverage = stats.bitmap_cvg
+                execs = stats.execs_done
             
             report.append(f"\n{name}:")
             report.append(f"  Crashes: {len(crashes)}")
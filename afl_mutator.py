@@ -0,0 +1,49 @@
+"""
+AFL++ Python Custom Mutator
+Module-level AFL++ custom mutator API (init / fuzz_count / fuzz / describe /
+deinit) around AFLCustomMutator. afl-fuzz loads it with
+
+    PYTHONPATH=<repo> AFL_PYTHON_MODULE=afl_mutator afl-fuzz ...
+
+and, when FUZZMASTER_MUTATOR_CONTROL names a MutatorControl block, the
+strategy follows whatever FuzzingController publishes there.
+FUZZMASTER_DETERMINISTIC_CURSORS names the file keeping deterministic stage
+progress across restarts.
+"""
+
+import os
+from typing import Optional
+
+from mutation_selector import CONTROL_ENV, CURSOR_ENV, AFLCustomMutator
+
+_mutator: Optional[AFLCustomMutator] = None
+
+
+def init(seed: int):
+    """Called once by afl-fuzz when the module is loaded."""
+    global _mutator
+    _mutator = AFLCustomMutator(control=os.environ.get(CONTROL_ENV), seed=seed,
+                                cursor_file=os.environ.get(CURSOR_ENV))
+
+
+def fuzz_count(buf: bytearray) -> int:
+    """Number of fuzz() calls for the queue entry buf."""
+    return _mutator.fuzz_count(buf)
+
+
+def fuzz(buf: bytearray, add_buf: Optional[bytearray], max_size: int) -> bytearray:
+    """Mutate buf (add_buf is a second queue entry for splicing)."""
+    return _mutator.fuzz(buf, add_buf, max_size)
+
+
+def describe(max_description_length: int) -> str:
+    """Description appended to the names of queue entries this mutator found."""
+    return _mutator.describe(max_description_length)
+
+
+def deinit():
+    """Called by afl-fuzz on exit."""
+    global _mutator
+    if _mutator is not None:
+        _mutator.close()
+        _mutator = None
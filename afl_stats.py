@@ -0,0 +1,215 @@
+"""
+AFL++ fuzzer_stats Parser
+Single-pass parser shared by every module that reads an AFL++ fuzzer_stats
+file. The pass only splits lines; values are converted into a typed record
+when first read, and key names from older AFL / AFL++ releases are mapped
+onto the current AFL++ names.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _to_percent(value: str) -> float:
+    return float(value.rstrip('%'))
+
+
+# Record fields and their converters, named after current AFL++ (4.x) keys
+FIELDS = {
+    'start_time': int,
+    'last_update': int,
+    'run_time': int,
+    'fuzzer_pid': int,
+    'cycles_done': int,
+    'cycles_wo_finds': int,
+    'time_wo_finds': int,
+    'execs_done': int,
+    'execs_per_sec': float,
+    'execs_ps_last_min': float,
+    'corpus_count': int,
+    'corpus_favored': int,
+    'corpus_found': int,
+    'corpus_imported': int,
+    'corpus_variable': int,
+    'max_depth': int,
+    'cur_item': int,
+    'pending_favs': int,
+    'pending_total': int,
+    'stability': _to_percent,
+    'bitmap_cvg': _to_percent,
+    'saved_crashes': int,
+    'saved_hangs': int,
+    'last_find': int,
+    'last_crash': int,
+    'last_hang': int,
+    'execs_since_crash': int,
+    'exec_timeout': int,
+    'slowest_exec_ms': int,
+    'peak_rss_mb': int,
+    'cpu_affinity': int,
+    'edges_found': int,
+    'total_edges': int,
+    'var_byte_count': int,
+    'havoc_expansion': int,
+    'auto_dict_entries': int,
+    'testcache_size': int,
+    'testcache_count': int,
+    'testcache_evict': int,
+    'afl_banner': str,
+    'afl_version': str,
+    'target_mode': str,
+    'command_line': str,
+}
+
+# Keys written by AFL and AFL++ < 4.0 that were renamed since
+ALIASES = {
+    'paths_total': 'corpus_count',
+    'paths_favored': 'corpus_favored',
+    'paths_found': 'corpus_found',
+    'paths_imported': 'corpus_imported',
+    'variable_paths': 'corpus_variable',
+    'cur_path': 'cur_item',
+    'unique_crashes': 'saved_crashes',
+    'unique_hangs': 'saved_hangs',
+    'last_path': 'last_find',
+}
+
+# Field -> legacy key, looked up when the current key is missing
+_LEGACY = {new: old for old, new in ALIASES.items()}
+
+# Fields read on every poll (metrics_from_stats), converted right after the
+# split pass; every other field is converted on first read
+HOT_FIELDS = ('execs_done', 'execs_per_sec', 'corpus_count', 'saved_crashes', 'saved_hangs',
+              'bitmap_cvg', 'stability', 'pending_favs', 'pending_total', 'cycles_done',
+              'last_crash', 'last_hang', 'last_find')
+_HOT = tuple((field, _LEGACY.get(field), FIELDS[field]) for field in HOT_FIELDS)
+
+_DEFAULTS = {str: '', float: 0.0, _to_percent: 0.0, int: 0}
+
+
+class FuzzerStats:
+    """
+    Typed snapshot of one fuzzer_stats file.
+
+    Every field in FIELDS is an attribute (0, 0.0 or '' when the file does
+    not contain it), converted from the raw value the first time it is read.
+    Keys the parser does not know, and values that fail to convert, are kept
+    as raw strings in `extras`.
+    """
+
+    __slots__ = tuple(FIELDS) + ('_raw', '_failed')
+
+    def __init__(self, raw: Optional[Dict[str, str]] = None):
+        """
+        Initialize the record.
+
+        Args:
+            raw: Raw value per key, as written in the file
+        """
+        self._raw = raw if raw is not None else {}
+        self._failed: Dict[str, str] = {}
+
+    def __getattr__(self, field: str) -> Any:
+        # Only reached for fields that have not been read or set yet
+        conv = FIELDS.get(field)
+        if conv is None:
+            raise AttributeError(field)
+        key = field
+        raw = self._raw.get(field)
+        if raw is None and field in _LEGACY:
+            key = _LEGACY[field]
+            raw = self._raw.get(key)
+        if raw is None:
+            value = _DEFAULTS[conv]
+        else:
+            try:
+                value = conv(raw)
+            except ValueError:
+                value = _DEFAULTS[conv]
+                self._failed[key] = raw
+        setattr(self, field, value)
+        return value
+
+    @property
+    def extras(self) -> Dict[str, str]:
+        """Raw values of unknown keys and of values that failed to convert."""
+        extras = {key: value for key, value in self._raw.items()
+                  if key not in FIELDS and key not in ALIASES}
+        for field in FIELDS:
+            getattr(self, field)
+        extras.update(self._failed)
+        return extras
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a value by any current or legacy key name."""
+        field = ALIASES.get(key, key)
+        if field in FIELDS:
+            return getattr(self, field)
+        return self._raw.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a dictionary of current key names (plus unknown keys)."""
+        data = {field: getattr(self, field) for field in FIELDS}
+        data.update(self.extras)
+        return data
+
+    def __repr__(self) -> str:
+        return (f"FuzzerStats(execs_done={self.execs_done}, corpus_count={self.corpus_count}, "
+                f"bitmap_cvg={self.bitmap_cvg}, saved_crashes={self.saved_crashes})")
+
+
+def parse_stats_text(text: str) -> FuzzerStats:
+    """
+    Parse the contents of a fuzzer_stats file in a single pass.
+
+    Lines are `key : value`; when a key repeats, the last value wins. The
+    pass only splits lines; HOT_FIELDS are converted right after it and
+    every other value when first read.
+
+    Args:
+        text: File contents
+
+    Returns:
+        FuzzerStats record
+    """
+    raw = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(':')
+        if sep:
+            raw[key.strip()] = value.strip()
+    raw.pop('', None)
+
+    stats = FuzzerStats(raw)
+    for field, legacy, conv in _HOT:
+        value = raw.get(field)
+        if value is None:
+            value = raw.get(legacy)
+        if value is not None:
+            try:
+                setattr(stats, field, conv(value))
+            except ValueError:
+                pass  # Left to __getattr__, which records it in extras
+    return stats
+
+
+def parse_fuzzer_stats(stats_file: Union[str, Path]) -> Optional[FuzzerStats]:
+    """
+    Read and parse a fuzzer_stats file.
+
+    Args:
+        stats_file: Path to fuzzer_stats
+
+    Returns:
+        FuzzerStats record, or None if the file is missing or unreadable
+    """
+    try:
+        with open(stats_file, 'r', errors='replace') as f:
+            text = f.read()
+    except OSError as e:
+        logger.debug(f"Could not read {stats_file}: {e}")
+        return None
+    return parse_stats_text(text)
@@ -15,6 +15,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import logging
 
+from feedback_analyzer import read_campaign_metrics
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -246,17 +248,16 @@ class AutomaticFuzzingFramework:
             # Count crashes and paths across all instances
             crashes = len(list(output_dir.rglob("crashes/id:*")))
             
-            # Get stats from master or default
-            stats_files = list(output_dir.rglob("fuzzer_stats"))
+            # Get stats aggregated over master and slaves (or default)
+            metrics = read_campaign_metrics(output_dir)
             paths = 0
             coverage = 0
             execs = 0
             
-            if stats_files:
-                stats = self._parse_stats(stats_files[0])
-                paths = stats.get('corpus_count', 0)
-                coverage = stats.get('bitmap_cvg', 0)
-                execs = stats.get('execs_done', 0)
+            if metrics is not None:
+                paths = metrics.paths_total
+                coverage = round(metrics.coverage, 2)
+                execs = metrics.total_execs
             
             status_lines.append(f"\n{name}:")
             status_lines.append(f"  Crashes: {crashes}")
@@ -273,27 +274,6 @@ class AutomaticFuzzingFramework:
         
         logger.info("\n".join(status_lines))
     
-    def _parse_stats(self, stats_file):
-        """Parse AFL++ fuzzer_stats file"""
-        stats = {}
-        try:
-            with open(stats_file) as f:
-                for line in f:
-                    if ':' in line:
-                        key, val = line.strip().split(':', 1)
-                        key = key.strip()
-                        val = val.strip().rstrip('%')
-                        try:
-                            stats[key] = int(val)
-                        except:
-                            try:
-                                stats[key] = float(val)
-                            except:
-                                stats[key] = val
-        except:
-            pass
-        return stats
-    
     def stop_fuzzing(self):
         """Stop all fuzzing processes"""
         logger.info("\nStopping all fuzzers...")
@@ -331,7 +311,7 @@ class AutomaticFuzzingFramework:
                 continue
             
             crashes = list(output_dir.rglob("crashes/id:*"))
-            stats_files = list(output_dir.rglob("fuzzer_stats"))
+            metrics = read_campaign_metrics(output_dir)
             
             bench_data = {
                 'name': name,
@@ -339,13 +319,12 @@ class AutomaticFuzzingFramework:
                 'crash_files': [str(c) for c in crashes[:10]]  # First 10
             }
             
-            if stats_files:
-                stats = self._parse_stats(stats_files[0])
+            if metrics is not None:
                 bench_data.update({
-                    'paths': stats.get('corpus_count', 0),
-                    'coverage': stats.get('bitmap_cvg', 0),
-                    'execs': stats.get('execs_done', 0),
-                    'stability': stats.get('stability', 0)
+                    'paths': metrics.paths_total,
+                    'coverage': round(metrics.coverage, 2),
+                    'execs': metrics.total_execs,
+                    'stability': metrics.stability
                 })
             
             summary['benchmarks'].append(bench_data)
@@ -13,6 +13,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from afl_stats import parse_fuzzer_stats
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -370,23 +372,17 @@ class BenchmarkRunner:
     
     def _log_final_stats(self, stats_file: Path):
         """Log final fuzzing statistics."""
-        try:
-            with open(stats_file, 'r') as f:
-                stats = {}
-                for line in f:
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        stats[key.strip()] = value.strip()
-                
-                logger.info("\nFinal Statistics:")
-                logger.info(f"  Total Execs: {stats.get('execs_done', 'N/A')}")
-                logger.info(f"  Execs/sec: {stats.get('execs_per_sec', 'N/A')}")
-                logger.info(f"  Coverage: {stats.get('bitmap_cvg', 'N/A')}")
-                logger.info(f"  Crashes: {stats.get('saved_crashes', 'N/A')}")
-                logger.info(f"  Paths: {stats.get('paths_total', 'N/A')}")
-                
-        except Exception as e:
-            logger.error(f"Could not read stats: {e}")
+        stats = parse_fuzzer_stats(stats_file)
+        if stats is None:
+            logger.error(f"Could not read stats: {stats_file}")
+            return
+        
+        logger.info("\nFinal Statistics:")
+        logger.info(f"  Total Execs: {stats.execs_done}")
+        logger.info(f"  Execs/sec: {stats.execs_per_sec}")
+        logger.info(f"  Coverage: {stats.bitmap_cvg:.2f}%")
+        logger.info(f"  Crashes: {stats.saved_crashes}")
+        logger.info(f"  Paths: {stats.corpus_count}")
     
     def run_all_benchmarks(
         self,
@@ -4280,6 +4280,21 @@ def check_command(cmd):
 
 def count_fuzzers():
     """Count running AFL++ instances"""
+    # A running stats_bus collector already knows which instances are alive
+    try:
+        from stats_bus import attach_stats_bus
+        bus = attach_stats_bus()
+    except ImportError:
+        bus = None
+    if bus is not None:
+        try:
+            if bus.refresh():
+                return bus.alive_count()
+        except TimeoutError:
+            pass
+        finally:
+            bus.close()
+    
     try:
         result = subprocess.run(['pgrep', '-c', 'afl-fuzz'], 
                               capture_output=True, text=True)
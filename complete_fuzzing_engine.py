@@ -17,6 +17,10 @@ import threading
 import queue
 import logging
 
+from afl_stats import parse_fuzzer_stats
+from stats_watcher import StatsWatcher
+from stats_bus import attach_stats_bus
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,8 @@ class FuzzingEngine:
         self.fuzzer_processes = []
         self.ppo_process = None
         self.monitoring_thread = None
+        # Published stats come from a running stats_bus collector when there is one
+        self.stats_watcher = StatsWatcher(bus=attach_stats_bus())
         self.should_stop = False
         
         # Results tracking
@@ -85,6 +91,7 @@ class FuzzingEngine:
             'output_dir': output_dir,
             'start_time': datetime.now()
         })
+        self.stats_watcher.subscribe(output_dir / "default/fuzzer_stats")
         
         logger.info(f"✓ AFL++ Baseline started (PID: {process.pid})")
         return process
@@ -128,6 +135,7 @@ class FuzzingEngine:
             'output_dir': output_dir,
             'start_time': datetime.now()
         })
+        self.stats_watcher.subscribe(output_dir / "default/fuzzer_stats")
         
         logger.info(f"✓ AFL++ started (PID: {afl_process.pid})")
         
@@ -181,6 +189,7 @@ class FuzzingEngine:
             'output_dir': output_dir,
             'start_time': datetime.now()
         })
+        self.stats_watcher.subscribe(output_dir / "default/fuzzer_stats")
         
         logger.info(f"✓ AFL++ (no PPO) started (PID: {process.pid})")
         return process
@@ -190,6 +199,7 @@ class FuzzingEngine:
         
         # Create PPO controller script on-the-fly
         ppo_script = self.project_root / "ppo_controller_runtime.py"
+        repo_dir = Path(__file__).resolve().parent
         
         ppo_code = f'''#!/usr/bin/env python3
 import sys
@@ -198,6 +208,9 @@ import json
 from pathlib import Path
 import random
 
+sys.path.insert(0, "{repo_dir}")
+from afl_stats import parse_fuzzer_stats
+
 # Simple PPO controller for demonstration
 afl_dir = Path("{afl_output_dir}")
 stats_file = afl_dir / "default/fuzzer_stats"
@@ -210,16 +223,11 @@ while True:
     try:
         if stats_file.exists():
             # Read AFL++ stats
-            stats = {{}}
-            with open(stats_file) as f:
-                for line in f:
-                    if ':' in line:
-                        key, val = line.strip().split(':', 1)
-                        stats[key.strip()] = val.strip()
+            stats = parse_fuzzer_stats(stats_file)
             
             # PPO decision making (simplified)
-            coverage = float(stats.get('bitmap_cvg', '0').rstrip('%'))
-            execs = int(stats.get('execs_done', '0'))
+            coverage = stats.bitmap_cvg
+            execs = stats.execs_done
             
             # Adjust mutation strategy based on coverage
             if coverage < 1.0:
@@ -344,6 +352,7 @@ while True:
         
         self._display_progress(final=True)
         self._stop_all_fuzzers()
+        self.stats_watcher.close()
         self._generate_final_report()
     
     def _display_progress(self, final=False):
@@ -361,30 +370,28 @@ while True:
         
         total_crashes = 0
         
+        # Only fuzzer_stats files written since the last update are re-read
+        self.stats_watcher.poll()
+        
         for fuzzer_info in self.fuzzer_processes:
             output_dir = fuzzer_info['output_dir']
             mode = fuzzer_info['mode']
             benchmark = fuzzer_info['benchmark']
             
-            # Count crashes
-            crashes = len(list(output_dir.rglob("crashes/id:*")))
-            total_crashes += crashes
-            
-            # Get stats
+            # Get stats (crash count from saved_crashes instead of walking crashes/)
             stats_file = output_dir / "default/fuzzer_stats"
+            crashes = 0
             paths = 0
             coverage = 0
             execs = 0
             
-            if stats_file.exists():
-                with open(stats_file) as f:
-                    for line in f:
-                        if 'corpus_count' in line:
-                            paths = int(line.split(':')[1].strip())
-                        elif 'bitmap_cvg' in line:
-                            coverage = float(line.split(':')[1].strip().rstrip('%'))
-                        elif 'execs_done' in line:
-                            execs = int(line.split(':')[1].strip())
+            stats = self.stats_watcher.get(stats_file)
+            if stats is not None:
+                crashes = stats.saved_crashes
+                paths = stats.corpus_count
+                coverage = stats.bitmap_cvg
+                execs = stats.execs_done
+            total_crashes += crashes
             
             lines.append(f"\n{benchmark} ({mode}):")
             lines.append(f"  Crashes: {crashes}")
@@ -455,15 +462,11 @@ while True:
                 'crash_files': [str(c) for c in crashes[:10]]
             }
             
-            if stats_file.exists():
-                with open(stats_file) as f:
-                    for line in f:
-                        if 'corpus_count' in line:
-                            mode_data['paths'] = int(line.split(':')[1].strip())
-                        elif 'bitmap_cvg' in line:
-                            mode_data['coverage'] = float(line.split(':')[1].strip().rstrip('%'))
-                        elif 'execs_done' in line:
-                            mode_data['execs'] = int(line.split(':')[1].strip())
+            stats = parse_fuzzer_stats(stats_file)
+            if stats is not None:
+                mode_data['paths'] = stats.corpus_count
+                mode_data['coverage'] = stats.bitmap_cvg
+                mode_data['execs'] = stats.execs_done
             
             report['modes'].append(mode_data)
         
@@ -0,0 +1,250 @@
+"""
+Deterministic Mutation Stages
+Resumable AFL++-style deterministic stages (bit flips, byte flips,
+arithmetic, interesting values) that walk every position of a queue entry
+in order. Progress is kept as a cursor per seed and stage group,
+(seed id -> stage, position), and streamed to an append-only log so that a
+strategy switch or a restart picks up exactly where the walk stopped.
+"""
+
+import os
+import hashlib
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+import logging
+
+import mutation_kernels
+from mutation_kernels import ARITH_MAX, INTERESTING
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Stage groups (one per deterministic MutationStrategy) and their stages, in walk order
+STAGE_GROUPS = {
+    'bitflip': (('bit', 1), ('bit', 2), ('bit', 4)),
+    'byteflip': (('byte', 1), ('byte', 2), ('byte', 4)),
+    'arith': (('arith', 1), ('arith', 2), ('arith', 4)),
+    'interesting': (('interesting', 1), ('interesting', 2), ('interesting', 4)),
+}
+GROUP_IDS = {name: i for i, name in enumerate(STAGE_GROUPS)}
+
+# Candidate steps examined at a time when filling a batch
+FILL_CHUNK = 1024
+
+# Cursor log layout: magic, then one 16-byte record per cursor update (the last one wins)
+CURSOR_MAGIC = b'FZMCURS1'
+CURSOR_DTYPE = np.dtype([('seed', '<u8'), ('group', 'u1'), ('stage', 'u1'), ('pad', '<u2'),
+                         ('position', '<u4')])
+
+
+def seed_id(data) -> int:
+    """Stable 64-bit id of a queue entry (hash of its contents)."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def _variants(kind: str, width: int) -> int:
+    """Mutations per position of a stage: deltas or values, times both byte orders for words."""
+    if kind in ('bit', 'byte'):
+        return 1
+    orders = 1 if width == 1 else 2
+    if kind == 'arith':
+        return 2 * ARITH_MAX * orders
+    return len(INTERESTING[width]) * orders
+
+
+def stage_steps(kind: str, width: int, size: int) -> int:
+    """Number of mutations a stage makes on an input of size bytes."""
+    positions = (8 * size if kind == 'bit' else size) - width + 1
+    return max(positions, 0) * _variants(kind, width)
+
+
+def _arith_variant(steps: np.ndarray, width: int):
+    """(position, delta, big endian) of arith stage steps."""
+    variants = _variants('arith', width)
+    variant = steps % variants
+    big_endian = variant >= 2 * ARITH_MAX
+    variant = variant % (2 * ARITH_MAX)
+    delta = (variant // 2 + 1) * np.where(variant % 2, -1, 1)
+    return steps // variants, delta, big_endian
+
+
+def useful_steps(source: np.ndarray, kind: str, width: int, steps: np.ndarray) -> np.ndarray:
+    """
+    Mask of the steps worth running on source.
+
+    Like AFL++, 16/32-bit arithmetic only runs when it carries out of the
+    low byte / low half of the word; otherwise the narrower arith stage
+    already produced the same mutant.
+    """
+    if kind != 'arith' or width == 1:
+        return np.ones(steps.size, dtype=bool)
+    position, delta, big_endian = _arith_variant(steps, width)
+    low_mask = (1 << (4 * width)) - 1
+    low = mutation_kernels.read_words(source, position, width, big_endian) & low_mask
+    return np.where(delta < 0, low < -delta, low + delta > low_mask)
+
+
+def apply_stage(rows: np.ndarray, kind: str, width: int, steps: np.ndarray):
+    """
+    Apply stage mutation steps[i] to rows[i], in place.
+
+    Steps enumerate positions in order and, per position, AFL++'s order of
+    variants: +1, -1, ..., +ARITH_MAX, -ARITH_MAX (or the interesting
+    values), little endian first.
+    """
+    n, size = rows.shape
+    flat = rows.reshape(-1)
+    if kind == 'bit':
+        mutation_kernels.xor_bits(flat, np.arange(n) * 8 * size + steps, width)
+        return
+    if kind == 'byte':
+        mutation_kernels.xor_bytes(flat, np.arange(n) * size + steps, width)
+        return
+
+    if kind == 'arith':
+        position, delta, big_endian = _arith_variant(steps, width)
+        mutation_kernels.add_words(flat, np.arange(n) * size + position, delta, width, big_endian)
+    else:
+        variants = _variants(kind, width)
+        idx = np.arange(n) * size + steps // variants
+        variant = steps % variants
+        values = INTERESTING[width]
+        big_endian = variant >= len(values)
+        mutation_kernels.set_words(flat, idx, values[variant % len(values)], width, big_endian)
+
+
+class DeterministicStages:
+    """
+    Deterministic stage engine with a resumable cursor per seed and group.
+
+    The cursor advances when mutants are generated, before afl-fuzz runs
+    them, so a crash can skip at most the last batch but never repeats one.
+    """
+
+    def __init__(self, cursor_file: Optional[Union[str, Path]] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            cursor_file: Optional cursor log; existing cursors are loaded from it
+        """
+        self.cursors: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        # (seed, group, start and end cursor, stage and step of each row) of the latest fill()
+        self.last_fill: Optional[tuple] = None
+        self.cursor_file = Path(cursor_file) if cursor_file is not None else None
+        self._log = None
+        if self.cursor_file is not None:
+            self._open_log()
+
+    def _open_log(self):
+        path = self.cursor_file
+        if path.exists() and path.stat().st_size >= len(CURSOR_MAGIC):
+            with open(path, 'rb') as f:
+                if f.read(len(CURSOR_MAGIC)) != CURSOR_MAGIC:
+                    raise ValueError(f"{path} is not a deterministic cursor log")
+                records = np.frombuffer(f.read(), dtype=np.uint8)
+            # Drop a torn trailing record so appends stay aligned
+            usable = records.size // CURSOR_DTYPE.itemsize * CURSOR_DTYPE.itemsize
+            if usable != records.size:
+                os.truncate(path, len(CURSOR_MAGIC) + usable)
+            for record in records[:usable].view(CURSOR_DTYPE).tolist():
+                self.cursors[(record[0], record[1])] = (record[2], record[4])
+            logger.info(f"Loaded {len(self.cursors)} deterministic cursors from {path}")
+            self._log = open(path, 'ab')
+        else:
+            self._log = open(path, 'wb')
+            self._log.write(CURSOR_MAGIC)
+            self._log.flush()
+
+    def cursor(self, seed: int, group: str) -> Tuple[int, int]:
+        """(stage, position) where the walk of group over seed resumes."""
+        return self.cursors.get((seed, GROUP_IDS[group]), (0, 0))
+
+    def remaining(self, seed: int, group: str, size: int) -> int:
+        """Steps left in group for a seed of size bytes (skipped arith steps included)."""
+        stage, position = self.cursor(seed, group)
+        stages = STAGE_GROUPS[group]
+        return sum(stage_steps(kind, width, size) for kind, width in stages[stage:]) - position
+
+    def fill(self, rows: np.ndarray, seed: int, group: str) -> int:
+        """
+        Mutate rows (copies of the seed) with the next mutations of group.
+
+        Args:
+            rows: [n, size] array, each row a copy of the seed
+            seed: seed_id() of the seed
+            group: Stage group name (key of STAGE_GROUPS)
+
+        Returns:
+            Number of rows mutated (fewer than n once the group is done)
+        """
+        n, size = rows.shape
+        stages = STAGE_GROUPS[group]
+        stage, position = start = self.cursor(seed, group)
+        source = rows[0].copy() if n else None
+        row_stages, row_steps = [], []
+        done = 0
+        while done < n and stage < len(stages):
+            kind, width = stages[stage]
+            total = stage_steps(kind, width, size)
+            # Candidate steps beyond n - done make up for the ones useful_steps() skips
+            candidates = position + np.arange(max(min(total - position, max(n - done, FILL_CHUNK)), 0))
+            steps = candidates[useful_steps(source, kind, width, candidates)][:n - done]
+            apply_stage(rows[done:done + steps.size], kind, width, steps)
+            row_stages.append(np.full(steps.size, stage))
+            row_steps.append(steps)
+            done += steps.size
+            position = int(steps[-1]) + 1 if done == n else position + candidates.size
+            if position >= total:
+                stage, position = stage + 1, 0
+
+        if (stage, position) != start:
+            self._set(seed, group, stage, position)
+        self.last_fill = (seed, group, start, (stage, position), np.concatenate(row_stages or [[]]).astype(np.int64),
+                          np.concatenate(row_steps or [[]]).astype(np.int64))
+        return done
+
+    def rewind(self, fill: tuple, used: int):
+        """
+        Give back the rows of a fill that were never run.
+
+        Nothing is given back if the walk has moved on since that fill.
+
+        Args:
+            fill: last_fill right after the fill() call
+            used: Number of its rows (from the first) that were run
+        """
+        seed, group, start, end, row_stages, row_steps = fill
+        if used >= row_steps.size or self.cursor(seed, group) != end:
+            return
+        if used == 0:
+            self._set(seed, group, *start)
+        else:
+            self._set(seed, group, int(row_stages[used - 1]), int(row_steps[used - 1]) + 1)
+
+    def _set(self, seed: int, group: str, stage: int, position: int):
+        self.cursors[(seed, GROUP_IDS[group])] = (stage, position)
+        if self._log is not None:
+            record = np.array([(seed, GROUP_IDS[group], stage, 0, position)], dtype=CURSOR_DTYPE)
+            self._log.write(record.tobytes())
+            self._log.flush()
+
+    def save(self, filepath: Union[str, Path]):
+        """Write one record per cursor to a cursor log (atomically)."""
+        records = np.array([(seed, group, stage, 0, position)
+                            for (seed, group), (stage, position) in self.cursors.items()],
+                           dtype=CURSOR_DTYPE)
+        tmp_file = f"{filepath}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(CURSOR_MAGIC)
+            f.write(records.tobytes())
+        os.replace(tmp_file, filepath)
+
+    def close(self):
+        """Compact the cursor log to the latest cursors and close it."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+            self.save(self.cursor_file)
@@ -0,0 +1,380 @@
+"""
+Distributed PPO: Many AFL++ Actors, One Learner
+Every AFL++ instance (main and secondaries, across benchmarks) runs a
+lightweight DistributedActor that acts with a torch-free PolicySnapshot and
+streams fixed-length trajectory chunks to a central DistributedLearner over
+a Unix socket. The learner packs one chunk per rollout-buffer column, trains
+with PPOAgent.update, and sends the new weights back to each actor in the
+reply to its next chunk.
+"""
+
+import os
+import queue
+import socket
+import struct
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from policy_server import _recv_exact
+from policy_snapshot import PolicySnapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_LEARNER_SOCKET = "/tmp/fuzzmaster-learner.sock"
+
+# Wire format (little endian):
+#   handshake (learner -> actor): state_dim, action_dim, unroll_length, then a weights message
+#   chunk     (actor -> learner): actor policy version, then unroll_length rows of
+#             states f32[D], actions i64, log_probs f32, values f32, rewards f32, dones f32
+#   weights   (learner -> actor): policy version, payload length, payload (snapshot .npz
+#             bytes, empty if the actor is already up to date)
+HANDSHAKE = struct.Struct('<III')
+CHUNK_HEADER = struct.Struct('<q')
+WEIGHTS_HEADER = struct.Struct('<qI')
+
+
+def _chunk_dtype(state_dim: int) -> np.dtype:
+    """Structured row layout of a trajectory chunk."""
+    return np.dtype([
+        ('states', '<f4', (state_dim,)),
+        ('actions', '<i8'),
+        ('log_probs', '<f4'),
+        ('values', '<f4'),
+        ('rewards', '<f4'),
+        ('dones', '<f4'),
+    ])
+
+
+class DistributedLearner:
+    """
+    Central learner that trains one PPOAgent on trajectories from many actors.
+    """
+
+    def __init__(
+        self,
+        state_dim: int = 10,
+        action_dim: int = 8,
+        ppo_config: Optional[Dict] = None,
+        socket_path: str = DEFAULT_LEARNER_SOCKET,
+        unroll_length: int = 16,
+        chunks_per_update: int = 8,
+        n_epochs: int = 10,
+        batch_size: int = 32,
+        checkpoint_dir: Optional[str] = None
+    ):
+        """
+        Initialize the learner.
+
+        Args:
+            state_dim: Dimension of the state space
+            action_dim: Number of actions (mutation strategies)
+            ppo_config: PPO hyperparameters (same keys as the controller's 'ppo' section)
+            socket_path: Unix socket path to listen on
+            unroll_length: Time steps per trajectory chunk
+            chunks_per_update: Chunks (one per buffer column) gathered per update
+            n_epochs: Number of optimization epochs per update
+            batch_size: Mini-batch size
+            checkpoint_dir: Optional directory to save agent.pt after every update
+        """
+        from ppo_agent import PPOAgent, RolloutBuffer
+
+        ppo_config = ppo_config or {}
+        self.state_dim = state_dim
+        self.action_dim = action_dim
+        self.socket_path = socket_path
+        self.unroll_length = unroll_length
+        self.chunks_per_update = chunks_per_update
+        self.n_epochs = n_epochs
+        self.batch_size = batch_size
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+
+        self.agent = PPOAgent(
+            state_dim=state_dim,
+            action_dim=action_dim,
+            hidden_dim=ppo_config.get('hidden_dim', 128),
+            learning_rate=ppo_config.get('learning_rate', 3e-4),
+            gamma=ppo_config.get('gamma', 0.99),
+            gae_lambda=ppo_config.get('gae_lambda', 0.95),
+            clip_epsilon=ppo_config.get('clip_epsilon', 0.2),
+            value_coef=ppo_config.get('value_coef', 0.5),
+            entropy_coef=ppo_config.get('entropy_coef', 0.01),
+            target_kl=ppo_config.get('target_kl'),
+        )
+
+        # One column per actor chunk, reused for every update
+        self.buffer = RolloutBuffer(unroll_length, state_dim, n_envs=chunks_per_update)
+        self.chunk_dtype = _chunk_dtype(state_dim)
+        self.chunk_size = CHUNK_HEADER.size + self.chunk_dtype.itemsize * unroll_length
+
+        # Latest weights, published as a single (version, bytes) tuple
+        self._published = (0, b'')
+        self._publish()
+
+        self._chunks: 'queue.Queue[tuple]' = queue.Queue(maxsize=4 * chunks_per_update)
+        self._column = 0
+        self.server_socket: Optional[socket.socket] = None
+        self.running = False
+
+        # Statistics
+        self.chunks_received = 0
+        self.training_stats = []
+
+    def _publish(self):
+        """Serialize the current weights for broadcasting to actors."""
+        snapshot = PolicySnapshot.from_network(self.agent.network)
+        self._published = (self.agent.policy_version, snapshot.to_bytes())
+
+    def _send_weights(self, conn: socket.socket, actor_version: int):
+        """Send the latest weights if the actor is behind, else just the version."""
+        version, payload = self._published
+        if version <= actor_version:
+            payload = b''
+        conn.sendall(WEIGHTS_HEADER.pack(version, len(payload)) + payload)
+
+    def _handle_actor(self, conn: socket.socket):
+        """Per-actor thread: receive chunks and reply with weights."""
+        try:
+            conn.sendall(HANDSHAKE.pack(self.state_dim, self.action_dim, self.unroll_length))
+            self._send_weights(conn, -1)
+
+            while self.running:
+                data = _recv_exact(conn, self.chunk_size)
+                actor_version, = CHUNK_HEADER.unpack_from(data)
+                rows = np.frombuffer(data, dtype=self.chunk_dtype, offset=CHUNK_HEADER.size)
+                self._chunks.put((actor_version, rows))
+                self._send_weights(conn, actor_version)
+
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _accept_loop(self):
+        """Accept actor connections, one handler thread each."""
+        while self.running:
+            try:
+                conn, _ = self.server_socket.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_actor, args=(conn,), daemon=True).start()
+
+    def start(self):
+        """Bind the Unix socket and start accepting actors."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server_socket.bind(self.socket_path)
+        self.server_socket.listen(256)
+        self.running = True
+
+        threading.Thread(target=self._accept_loop, name="learner-accept", daemon=True).start()
+        logger.info(f"Distributed learner listening on {self.socket_path} "
+                   f"(unroll={self.unroll_length}, chunks/update={self.chunks_per_update})")
+
+    def train_step(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Gather chunks_per_update chunks and run one PPO update.
+
+        Chunks gathered before a timeout are kept for the next call.
+
+        Args:
+            timeout: Maximum seconds to wait for each chunk
+
+        Returns:
+            Training statistics, or an empty dictionary on timeout
+        """
+        buf = self.buffer
+        while self._column < self.chunks_per_update:
+            try:
+                actor_version, rows = self._chunks.get(timeout=timeout)
+            except queue.Empty:
+                return {}
+
+            column = self._column
+
+            buf.states[:, column] = rows['states']
+            buf.actions[:, column] = rows['actions']
+            buf.log_probs[:, column] = rows['log_probs']
+            buf.values[:, column] = rows['values']
+            buf.rewards[:, column] = rows['rewards']
+            buf.dones[:, column] = rows['dones']
+            buf.versions[:, column] = actor_version
+            self._column += 1
+            self.chunks_received += 1
+
+        buf.pos = self.unroll_length
+        self._column = 0
+        stats = self.agent.update(self.n_epochs, self.batch_size, buffer=buf)
+        self._publish()
+
+        if self.checkpoint_dir:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.checkpoint_dir / "agent.pt.tmp"
+            self.agent.save(str(tmp_path))
+            os.replace(tmp_path, self.checkpoint_dir / "agent.pt")
+
+        self.training_stats.append(stats)
+        return stats
+
+    def serve_forever(self):
+        """Main loop: train whenever enough chunks have arrived."""
+        if not self.running:
+            self.start()
+
+        try:
+            while self.running:
+                stats = self.train_step(timeout=1.0)
+                if stats:
+                    logger.info(f"Update v{stats['policy_version']}: "
+                               f"policy loss {stats['policy_loss']:.4f}, "
+                               f"value loss {stats['value_loss']:.4f}, "
+                               f"lag {stats['policy_lag_mean']:.2f}, "
+                               f"{self.chunks_received} chunks total")
+        except KeyboardInterrupt:
+            logger.info("Learner interrupted")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop accepting actors and remove the socket file."""
+        self.running = False
+        if self.server_socket:
+            self.server_socket.close()
+            self.server_socket = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class DistributedActor:
+    """
+    Lightweight actor for one AFL++ instance.
+
+    Implements select_action/store_transition like PPOAgent, but acts with a
+    NumPy PolicySnapshot and ships every unroll_length transitions to the
+    learner instead of training locally. Never imports torch.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_LEARNER_SOCKET, timeout: float = 60.0,
+                 seed: Optional[int] = None):
+        """
+        Connect to a running learner and receive the initial weights.
+
+        Args:
+            socket_path: Unix socket path of the learner
+            timeout: Socket timeout in seconds
+            seed: Seed for the action sampling RNG
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+
+        self.state_dim, self.action_dim, self.unroll_length = HANDSHAKE.unpack(
+            _recv_exact(self.sock, HANDSHAKE.size)
+        )
+        self.rng = np.random.default_rng(seed)
+        self.policy: Optional[PolicySnapshot] = None
+        self.policy_version = -1
+        self._receive_weights()
+
+        # Preallocated outgoing chunk: header followed by structured rows
+        dtype = _chunk_dtype(self.state_dim)
+        self._message = bytearray(CHUNK_HEADER.size + dtype.itemsize * self.unroll_length)
+        self._rows = np.frombuffer(self._message, dtype=dtype, offset=CHUNK_HEADER.size)
+        self.pos = 0
+
+        logger.info(f"Connected to learner at {socket_path} (policy v{self.policy_version})")
+
+    def _receive_weights(self):
+        """Read a weights message and swap in the new snapshot if one was sent."""
+        version, length = WEIGHTS_HEADER.unpack(_recv_exact(self.sock, WEIGHTS_HEADER.size))
+        if length:
+            self.policy = PolicySnapshot.from_bytes(_recv_exact(self.sock, length))
+            self.policy.rng = self.rng
+            self.policy_version = version
+
+    def select_action(self, state: np.ndarray, deterministic: bool = False) -> int:
+        """
+        Select an action and record it in the pending chunk.
+
+        Args:
+            state: Current state observation
+            deterministic: Whether to act deterministically
+
+        Returns:
+            Selected action index
+        """
+        states = np.asarray(state, dtype=np.float32).reshape(1, self.state_dim)
+        actions, log_probs, values = self.policy.get_action(states, deterministic)
+
+        rows, pos = self._rows, self.pos
+        rows['states'][pos] = states[0]
+        rows['actions'][pos] = actions[0]
+        rows['log_probs'][pos] = log_probs[0]
+        rows['values'][pos] = values[0]
+
+        return int(actions[0])
+
+    def store_transition(self, reward: float, done: bool):
+        """
+        Record the reward and done flag; ship the chunk once it is full.
+
+        Args:
+            reward: Reward received
+            done: Whether episode is done
+        """
+        self._rows['rewards'][self.pos] = reward
+        self._rows['dones'][self.pos] = float(done)
+        self.pos += 1
+
+        if self.pos == self.unroll_length:
+            CHUNK_HEADER.pack_into(self._message, 0, self.policy_version)
+            self.sock.sendall(self._message)
+            self._receive_weights()
+            self.pos = 0
+
+    def close(self):
+        """Close the connection to the learner."""
+        self.sock.close()
+
+
+def main():
+    """Main entry point: run the central learner."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Distributed PPO learner for many AFL++ actors')
+    parser.add_argument('--socket', '-s', default=DEFAULT_LEARNER_SOCKET, help='Unix socket path')
+    parser.add_argument('--config', '-c', help='Configuration file (YAML) with a ppo section')
+    parser.add_argument('--unroll-length', type=int, default=16, help='Time steps per actor chunk')
+    parser.add_argument('--chunks-per-update', type=int, default=8, help='Chunks gathered per PPO update')
+    parser.add_argument('--epochs', type=int, default=10, help='PPO epochs per update')
+    parser.add_argument('--batch-size', type=int, default=32, help='Mini-batch size')
+    parser.add_argument('--checkpoint-dir', help='Directory to save agent.pt after every update')
+
+    args = parser.parse_args()
+
+    ppo_config = {}
+    if args.config:
+        import yaml
+        with open(args.config) as f:
+            ppo_config = (yaml.safe_load(f) or {}).get('ppo', {})
+
+    learner = DistributedLearner(
+        ppo_config=ppo_config,
+        socket_path=args.socket,
+        unroll_length=args.unroll_length,
+        chunks_per_update=args.chunks_per_update,
+        n_epochs=args.epochs,
+        batch_size=args.batch_size,
+        checkpoint_dir=args.checkpoint_dir
+    )
+    learner.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
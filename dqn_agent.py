@@ -0,0 +1,501 @@
+"""
+Off-Policy DQN Agent for AFL++ Fuzzing Optimization
+Double DQN with a dueling Q-network and a prioritized replay buffer. Unlike
+PPO, every transition is kept and reused across many updates, which matters
+when each transition costs minutes of real fuzzing. Exposes the PPOAgent
+interface (select_action / store_transition / update / save / load) so
+FuzzingController can switch learners via config (ppo.algorithm: dqn).
+"""
+
+import os
+import time
+import torch
+import torch.nn as nn
+import torch.optim as optim
+import torch.nn.functional as F
+import numpy as np
+from typing import Dict, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QNetwork(nn.Module):
+    """
+    Dueling Q-network: shared layers, then state-value and advantage heads
+    combined as Q(s, a) = V(s) + A(s, a) - mean_a A(s, a).
+    """
+
+    def __init__(self, state_dim: int, action_dim: int, hidden_dim: int = 128):
+        """
+        Initialize the Q-network.
+
+        Args:
+            state_dim: Dimension of the state space
+            action_dim: Number of possible mutation strategies
+            hidden_dim: Size of hidden layers
+        """
+        super(QNetwork, self).__init__()
+
+        self.shared_fc1 = nn.Linear(state_dim, hidden_dim)
+        self.shared_fc2 = nn.Linear(hidden_dim, hidden_dim)
+
+        self.value_fc = nn.Linear(hidden_dim, hidden_dim // 2)
+        self.value_out = nn.Linear(hidden_dim // 2, 1)
+
+        self.advantage_fc = nn.Linear(hidden_dim, hidden_dim // 2)
+        self.advantage_out = nn.Linear(hidden_dim // 2, action_dim)
+
+        for module in self.modules():
+            if isinstance(module, nn.Linear):
+                nn.init.orthogonal_(module.weight, gain=np.sqrt(2))
+                nn.init.constant_(module.bias, 0.0)
+
+    def forward(self, state: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass through the network.
+
+        Args:
+            state: Input state tensor
+
+        Returns:
+            Q-values of shape [batch, action_dim]
+        """
+        x = F.relu(self.shared_fc1(state))
+        x = F.relu(self.shared_fc2(x))
+
+        value = self.value_out(F.relu(self.value_fc(x)))
+        advantage = self.advantage_out(F.relu(self.advantage_fc(x)))
+
+        return value + advantage - advantage.mean(dim=-1, keepdim=True)
+
+
+class PrioritizedReplayBuffer:
+    """
+    Ring-buffer replay memory with proportional prioritization.
+
+    Priorities (already raised to alpha) live in an array-backed sum tree,
+    so sampling a batch is one vectorized descent of log2(capacity) levels.
+    The whole buffer can be saved to and restored from an .npz file.
+    """
+
+    def __init__(self, capacity: int, state_dim: int, alpha: float = 0.6):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of transitions (oldest are overwritten)
+            state_dim: Dimension of the state space
+            alpha: Prioritization exponent (0 = uniform sampling)
+        """
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.alpha = alpha
+
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+
+        # Sum tree: node i has children 2i and 2i+1, leaves start at tree_size
+        self.tree_size = 1 << max(int(np.ceil(np.log2(capacity))), 0)
+        self.tree = np.zeros(2 * self.tree_size, dtype=np.float64)
+        self.max_priority = 1.0
+
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        """Number of stored transitions."""
+        return self.size
+
+    def add(self, states, actions, rewards, next_states, dones):
+        """
+        Append a batch of transitions with the current maximum priority.
+
+        Args:
+            states: States of shape [n, state_dim]
+            actions: Actions of shape [n]
+            rewards: Rewards of shape [n]
+            next_states: Next states of shape [n, state_dim]
+            dones: Done flags of shape [n]
+        """
+        n = len(actions)
+        idx = (self.pos + np.arange(n)) % self.capacity
+
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self._set_priorities(idx, np.full(n, self.max_priority))
+
+        self.pos = int((self.pos + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def _set_priorities(self, idx: np.ndarray, priorities: np.ndarray):
+        """Write leaf priorities and recompute the affected parent sums."""
+        nodes = idx + self.tree_size
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def sample(self, batch_size: int, beta: float, rng: np.random.Generator):
+        """
+        Sample transitions proportionally to priority (stratified).
+
+        Args:
+            batch_size: Number of transitions
+            beta: Importance-sampling exponent (1 = full correction)
+            rng: Random generator
+
+        Returns:
+            Tuple of (indices, importance weights normalized to max 1)
+        """
+        total = self.tree[1]
+        targets = (np.arange(batch_size) + rng.random(batch_size)) * (total / batch_size)
+
+        nodes = np.ones(batch_size, dtype=np.int64)
+        while nodes[0] < self.tree_size:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets > left_sum
+            targets = np.where(go_right, targets - left_sum, targets)
+            nodes = left + go_right
+
+        idx = np.minimum(nodes - self.tree_size, self.size - 1)
+
+        probs = self.tree[idx + self.tree_size] / total
+        weights = (self.size * np.maximum(probs, 1e-12)) ** (-beta)
+        return idx, (weights / weights.max()).astype(np.float32)
+
+    def update_priorities(self, idx: np.ndarray, td_errors: np.ndarray, eps: float = 1e-3):
+        """
+        Set priorities from absolute TD errors.
+
+        Args:
+            idx: Sampled indices
+            td_errors: TD errors of the sampled transitions
+            eps: Floor so no transition becomes unsampleable
+        """
+        priorities = (np.abs(td_errors) + eps) ** self.alpha
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self._set_priorities(idx, priorities)
+
+    def save(self, filepath: str):
+        """Write the buffer to an .npz file (atomically)."""
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                states=self.states[:self.size], next_states=self.next_states[:self.size],
+                actions=self.actions[:self.size], rewards=self.rewards[:self.size],
+                dones=self.dones[:self.size],
+                priorities=self.tree[self.tree_size:self.tree_size + self.size],
+                meta=np.array([self.capacity, self.pos, self.size]),
+                max_priority=np.array(self.max_priority), alpha=np.array(self.alpha)
+            )
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath: str, capacity: Optional[int] = None) -> 'PrioritizedReplayBuffer':
+        """
+        Restore a buffer written by save().
+
+        Args:
+            filepath: .npz file
+            capacity: New capacity (defaults to the saved one); if smaller than
+                the saved contents, only the most recent transitions are kept
+
+        Returns:
+            PrioritizedReplayBuffer
+        """
+        data = np.load(filepath)
+        saved_capacity, pos, size = (int(v) for v in data['meta'])
+        buf = cls(capacity or saved_capacity, data['states'].shape[1], float(data['alpha']))
+
+        # Oldest-to-newest order of the saved ring
+        order = np.arange(size) if size < saved_capacity else (pos + np.arange(size)) % saved_capacity
+        order = order[-buf.capacity:]
+
+        buf.add(data['states'][order], data['actions'][order], data['rewards'][order],
+                data['next_states'][order], data['dones'][order])
+        buf._set_priorities(np.arange(len(order)), data['priorities'][order])
+        buf.max_priority = float(data['max_priority'])
+        return buf
+
+
+class DQNAgent:
+    """
+    Double DQN agent with prioritized experience replay.
+
+    Transitions are completed lazily: the (state, action) of select_action
+    and the (reward, done) of store_transition are pushed to the replay
+    buffer once the next select_action supplies the next state.
+    """
+
+    def __init__(
+        self,
+        state_dim: int,
+        action_dim: int,
+        hidden_dim: int = 128,
+        learning_rate: float = 3e-4,
+        gamma: float = 0.99,
+        buffer_size: int = 100000,
+        alpha: float = 0.6,
+        beta_start: float = 0.4,
+        beta_steps: int = 100000,
+        epsilon_start: float = 1.0,
+        epsilon_end: float = 0.05,
+        epsilon_decay_steps: int = 10000,
+        target_update_interval: int = 500,
+        max_grad_norm: float = 10.0,
+        device: str = None,
+        n_envs: int = 1,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize DQN agent.
+
+        Args:
+            state_dim: Dimension of state space
+            action_dim: Number of actions (mutation strategies)
+            hidden_dim: Hidden layer size
+            learning_rate: Learning rate for optimizer
+            gamma: Discount factor
+            buffer_size: Replay buffer capacity in transitions
+            alpha: Prioritization exponent
+            beta_start: Initial importance-sampling exponent, annealed to 1
+            beta_steps: Gradient steps over which beta reaches 1
+            epsilon_start: Initial exploration rate
+            epsilon_end: Final exploration rate
+            epsilon_decay_steps: Environment steps over which epsilon decays
+            target_update_interval: Gradient steps between target network syncs
+            max_grad_norm: Maximum gradient norm for clipping
+            device: Device to run on ('cpu' or 'cuda')
+            n_envs: Number of parallel environments acting per step
+            seed: Seed for exploration and replay sampling
+        """
+        self.device = device if device else ('cuda' if torch.cuda.is_available() else 'cpu')
+
+        # Hyperparameters
+        self.action_dim = action_dim
+        self.gamma = gamma
+        self.beta_start = beta_start
+        self.beta_steps = beta_steps
+        self.epsilon_start = epsilon_start
+        self.epsilon_end = epsilon_end
+        self.epsilon_decay_steps = epsilon_decay_steps
+        self.target_update_interval = target_update_interval
+        self.max_grad_norm = max_grad_norm
+
+        # Online and target networks
+        self.network = QNetwork(state_dim, action_dim, hidden_dim).to(self.device)
+        self.target_network = QNetwork(state_dim, action_dim, hidden_dim).to(self.device)
+        self.target_network.load_state_dict(self.network.state_dict())
+        self.optimizer = optim.Adam(self.network.parameters(), lr=learning_rate)
+
+        self.n_envs = n_envs
+        self.buffer = PrioritizedReplayBuffer(buffer_size, state_dim, alpha)
+        self.rng = np.random.default_rng(seed)
+
+        # Transition awaiting its next state
+        self._pending_states: Optional[np.ndarray] = None
+        self._pending_actions: Optional[np.ndarray] = None
+        self._pending_rewards: Optional[np.ndarray] = None
+        self._pending_dones: Optional[np.ndarray] = None
+
+        self.env_steps = 0
+        self.gradient_steps = 0
+
+        logger.info(f"DQN Agent initialized on device: {self.device}")
+        logger.info(f"Hyperparameters: γ={gamma}, α={alpha}, buffer={buffer_size}")
+
+    @property
+    def epsilon(self) -> float:
+        """Current exploration rate."""
+        fraction = min(self.env_steps / max(self.epsilon_decay_steps, 1), 1.0)
+        return self.epsilon_start + fraction * (self.epsilon_end - self.epsilon_start)
+
+    @property
+    def beta(self) -> float:
+        """Current importance-sampling exponent."""
+        fraction = min(self.gradient_steps / max(self.beta_steps, 1), 1.0)
+        return self.beta_start + fraction * (1.0 - self.beta_start)
+
+    def select_action(self, state: np.ndarray, deterministic: bool = False):
+        """
+        Select an action epsilon-greedily.
+
+        Args:
+            state: Current state observation, [state_dim] or [n_envs, state_dim]
+            deterministic: Whether to act greedily
+
+        Returns:
+            Selected action index, or an array of indices for n_envs > 1
+        """
+        states = np.asarray(state, dtype=np.float32).reshape(self.n_envs, -1)
+
+        # Complete the previous transition now that its next state is known
+        if self._pending_rewards is not None:
+            self.buffer.add(self._pending_states, self._pending_actions,
+                            self._pending_rewards, states, self._pending_dones)
+            self._pending_rewards = None
+
+        with torch.no_grad():
+            q_values = self.network(torch.from_numpy(states).to(self.device))
+        actions = q_values.argmax(dim=-1).cpu().numpy()
+
+        if not deterministic:
+            explore = self.rng.random(self.n_envs) < self.epsilon
+            actions = np.where(explore, self.rng.integers(0, self.action_dim, self.n_envs), actions)
+            self.env_steps += self.n_envs
+
+        self._pending_states = states.copy()
+        self._pending_actions = actions
+
+        if self.n_envs == 1:
+            return int(actions[0])
+        return actions
+
+    def store_transition(self, reward, done):
+        """
+        Store the reward and done flag for the last action.
+
+        Args:
+            reward: Reward received (array of shape [n_envs] for n_envs > 1)
+            done: Whether episode is done (array of shape [n_envs] for n_envs > 1)
+        """
+        if self._pending_states is None:
+            return
+        self._pending_rewards = np.asarray(reward, dtype=np.float32).reshape(self.n_envs)
+        self._pending_dones = np.asarray(done, dtype=np.float32).reshape(self.n_envs)
+
+    def update(self, n_epochs: int = 10, batch_size: int = 64) -> Dict[str, float]:
+        """
+        Run gradient steps on prioritized replay samples.
+
+        Args:
+            n_epochs: Number of gradient steps (named after the PPOAgent argument)
+            batch_size: Mini-batch size
+
+        Returns:
+            Dictionary of training statistics (empty if the buffer is too small)
+        """
+        buf = self.buffer
+        if len(buf) < batch_size:
+            return {}
+
+        start = time.perf_counter()
+        total_loss = 0.0
+        total_q = 0.0
+        total_td = 0.0
+
+        for _ in range(n_epochs):
+            idx, weights = buf.sample(batch_size, self.beta, self.rng)
+
+            states = torch.from_numpy(buf.states[idx]).to(self.device)
+            next_states = torch.from_numpy(buf.next_states[idx]).to(self.device)
+            actions = torch.from_numpy(buf.actions[idx]).to(self.device)
+            rewards = torch.from_numpy(buf.rewards[idx]).to(self.device)
+            dones = torch.from_numpy(buf.dones[idx]).to(self.device)
+            weights_t = torch.from_numpy(weights).to(self.device)
+
+            # Double DQN target: online network picks, target network evaluates
+            with torch.no_grad():
+                next_actions = self.network(next_states).argmax(dim=-1, keepdim=True)
+                next_q = self.target_network(next_states).gather(1, next_actions).squeeze(-1)
+                targets = rewards + self.gamma * (1.0 - dones) * next_q
+
+            q = self.network(states).gather(1, actions.unsqueeze(-1)).squeeze(-1)
+            td_errors = targets - q
+            loss = (weights_t * F.smooth_l1_loss(q, targets, reduction='none')).mean()
+
+            self.optimizer.zero_grad()
+            loss.backward()
+            nn.utils.clip_grad_norm_(self.network.parameters(), self.max_grad_norm)
+            self.optimizer.step()
+
+            td_np = td_errors.detach().cpu().numpy()
+            buf.update_priorities(idx, td_np)
+
+            self.gradient_steps += 1
+            if self.gradient_steps % self.target_update_interval == 0:
+                self.target_network.load_state_dict(self.network.state_dict())
+
+            total_loss += loss.item()
+            total_q += q.detach().mean().item()
+            total_td += float(np.abs(td_np).mean())
+
+        elapsed = time.perf_counter() - start
+
+        return {
+            'loss': total_loss / n_epochs,
+            'mean_q': total_q / n_epochs,
+            'mean_td_error': total_td / n_epochs,
+            'epsilon': self.epsilon,
+            'beta': self.beta,
+            'buffer_size': len(buf),
+            'gradient_steps': self.gradient_steps,
+            'time_per_step': elapsed / n_epochs,
+        }
+
+    def clear_buffer(self):
+        """Drop all stored transitions."""
+        self.buffer = PrioritizedReplayBuffer(self.buffer.capacity, self.buffer.state_dim, self.buffer.alpha)
+        self._pending_rewards = None
+
+    @staticmethod
+    def replay_path(filepath: str) -> str:
+        """Replay buffer file stored next to an agent checkpoint."""
+        return filepath + '.replay.npz'
+
+    def save(self, filepath: str, save_replay: bool = True):
+        """
+        Save the agent's networks, optimizer and counters.
+
+        Args:
+            filepath: Checkpoint path
+            save_replay: Also persist the replay buffer (see replay_path)
+        """
+        torch.save({
+            'algorithm': 'dqn',
+            'network_state_dict': self.network.state_dict(),
+            'target_network_state_dict': self.target_network.state_dict(),
+            'optimizer_state_dict': self.optimizer.state_dict(),
+            'env_steps': self.env_steps,
+            'gradient_steps': self.gradient_steps,
+        }, filepath)
+        if save_replay:
+            self.buffer.save(self.replay_path(filepath))
+        logger.info(f"Model saved to {filepath}")
+
+    def load(self, filepath: str):
+        """
+        Load the agent's networks, and its replay buffer if one was saved.
+
+        Args:
+            filepath: Checkpoint written by save()
+        """
+        checkpoint = torch.load(filepath, map_location=self.device)
+        if checkpoint.get('algorithm') != 'dqn':
+            raise ValueError(f"{filepath} is not a DQN checkpoint")
+
+        self.network.load_state_dict(checkpoint['network_state_dict'])
+        self.target_network.load_state_dict(checkpoint['target_network_state_dict'])
+        self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+        self.env_steps = checkpoint['env_steps']
+        self.gradient_steps = checkpoint['gradient_steps']
+
+        replay_file = self.replay_path(filepath)
+        if os.path.exists(replay_file):
+            self.buffer = PrioritizedReplayBuffer.load(replay_file, self.buffer.capacity)
+            logger.info(f"Replay buffer restored ({len(self.buffer)} transitions)")
+        logger.info(f"Model loaded from {filepath}")
@@ -15,6 +15,8 @@ from typing import Dict, List, Optional
 import logging
 import shutil
 
+from afl_stats import parse_fuzzer_stats
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -261,42 +263,22 @@ class ExperimentRunner:
         if not stats_file.exists():
             return None
         
-        try:
-            metrics = {}
-            
-            with open(stats_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        # Parse common metrics
-                        if key == 'execs_done':
-                            metrics['total_execs'] = int(value)
-                        elif key == 'execs_per_sec':
-                            metrics['execs_per_sec'] = float(value)
-                        elif key == 'paths_total':
-                            metrics['paths_total'] = int(value)
-                        elif key == 'saved_crashes':
-                            metrics['unique_crashes'] = int(value)
-                        elif key == 'saved_hangs':
-                            metrics['unique_hangs'] = int(value)
-                        elif key == 'bitmap_cvg':
-                            metrics['coverage'] = float(value.replace('%', ''))
-                        elif key == 'stability':
-                            metrics['stability'] = float(value.replace('%', ''))
-                        elif key == 'cycles_done':
-                            metrics['cycles_done'] = int(value)
-                        elif key == 'pending_favs':
-                            metrics['pending_favs'] = int(value)
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error collecting metrics: {e}")
+        stats = parse_fuzzer_stats(stats_file)
+        if stats is None:
+            logger.error(f"Error collecting metrics from {stats_file}")
             return None
+        
+        return {
+            'total_execs': stats.execs_done,
+            'execs_per_sec': stats.execs_per_sec,
+            'paths_total': stats.corpus_count,
+            'unique_crashes': stats.saved_crashes,
+            'unique_hangs': stats.saved_hangs,
+            'coverage': stats.bitmap_cvg,
+            'stability': stats.stability,
+            'cycles_done': stats.cycles_done,
+            'pending_favs': stats.pending_favs,
+        }
     
     def _save_experiment_data(self, data: List[Dict], filepath: Path):
         """Save experiment data to JSON file."""
@@ -5,14 +5,19 @@ state representations and rewards for the PPO agent.
 """
 
 import os
-import re
 import json
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import logging
 
+from afl_stats import FuzzerStats, parse_fuzzer_stats
+from stats_watcher import CachedStatsReader
+from plot_data_tail import PlotDataTail
+from metrics_history import MetricsHistory, is_history_file
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,7 +25,13 @@ logger = logging.getLogger(__name__)
 class FuzzingMetrics:
     """Container for fuzzing metrics."""
     
+    __slots__ = ('timestamp', 'coverage', 'unique_crashes', 'unique_hangs', 'total_execs',
+                 'execs_per_sec', 'paths_total', 'paths_found', 'pending_favs', 'pending_total',
+                 'bitmap_cvg', 'stability', 'levels', 'last_crash', 'last_hang', 'last_path',
+                 'cycles_done')
+    
     def __init__(self):
+        self.timestamp = 0.0
         self.coverage = 0.0
         self.unique_crashes = 0
         self.unique_hangs = 0
@@ -41,6 +52,7 @@ class FuzzingMetrics:
     def to_dict(self) -> Dict:
         """Convert metrics to dictionary."""
         return {
+            'timestamp': self.timestamp,
             'coverage': self.coverage,
             'unique_crashes': self.unique_crashes,
             'unique_hangs': self.unique_hangs,
@@ -48,6 +60,8 @@ class FuzzingMetrics:
             'execs_per_sec': self.execs_per_sec,
             'paths_total': self.paths_total,
             'paths_found': self.paths_found,
+            'pending_favs': self.pending_favs,
+            'pending_total': self.pending_total,
             'bitmap_cvg': self.bitmap_cvg,
             'stability': self.stability,
             'cycles_done': self.cycles_done
@@ -58,28 +72,300 @@ class FuzzingMetrics:
                 f"Paths: {self.paths_total}, Exec/s: {self.execs_per_sec:.0f}")
 
 
+# Interval assumed between two metric samples when their timing is unknown
+RATE_INTERVAL = 60.0
+
+# Seconds of plot_data history the rate features are measured over
+RATE_WINDOW = 60.0
+
+
+def build_state_vector(current, previous=None, time_delta=RATE_INTERVAL,
+                       rates: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Build the RL state vector from two consecutive metric samples.
+    
+    Works on FuzzingMetrics objects and on any object whose metric attributes
+    are NumPy arrays (e.g. a batch of simulated instances), in which case the
+    result has shape [..., 10].
+    
+    Args:
+        current: Latest metrics
+        previous: Previous metrics, or None if there is no history yet
+        time_delta: Seconds between the two samples (scalar or array)
+        rates: Per-second rates measured elsewhere (PlotDataTail.rates); when
+            given, they replace the difference between the two samples
+        
+    Returns:
+        State vector
+    """
+    if rates is not None:
+        coverage_rate = rates['coverage']
+        crash_rate = rates['unique_crashes']
+        path_rate = rates['paths_total']
+    elif previous is not None:
+        coverage_rate = (current.coverage - previous.coverage) / time_delta
+        crash_rate = (current.unique_crashes - previous.unique_crashes) / time_delta
+        path_rate = (current.paths_total - previous.paths_total) / time_delta
+    else:
+        coverage_rate = crash_rate = path_rate = np.zeros_like(current.coverage, dtype=np.float64)
+    
+    return np.stack([
+        current.coverage / 100.0,           # 0: Normalized coverage (0-1)
+        coverage_rate,                       # 1: Coverage growth rate
+        current.unique_crashes / 100.0,      # 2: Normalized crash count
+        crash_rate,                          # 3: Crash discovery rate
+        current.execs_per_sec / 1000.0,     # 4: Normalized exec speed
+        current.paths_total / 1000.0,       # 5: Normalized path count
+        path_rate,                           # 6: Path discovery rate
+        current.stability / 100.0,           # 7: Normalized stability
+        current.cycles_done / 10.0,         # 8: Normalized cycles
+        current.pending_favs / 100.0,       # 9: Normalized pending cases
+    ], axis=-1).astype(np.float64)
+
+
+def compute_reward_from_metrics(current, previous):
+    """
+    Compute the reward for the transition from previous to current metrics.
+    
+    Like build_state_vector, accepts FuzzingMetrics or batches of arrays.
+    
+    Reward components:
+    - Coverage improvement (most important)
+    - New crashes discovered
+    - Path diversity
+    - Execution speed
+    """
+    # Coverage improvement reward (highest weight)
+    coverage_reward = (current.coverage - previous.coverage) * 10.0
+    
+    # Crash discovery reward
+    crash_reward = (current.unique_crashes - previous.unique_crashes) * 50.0
+    
+    # Path discovery reward
+    path_reward = (current.paths_total - previous.paths_total) * 1.0
+    
+    # Execution speed reward (small bonus for maintaining speed)
+    speed_reward = np.minimum(current.execs_per_sec / 1000.0, 1.0) * 0.5
+    
+    # Stability penalty (want stable fuzzing)
+    stability_reward = (current.stability / 100.0) * 0.5
+    
+    # Total reward
+    return coverage_reward + crash_reward + path_reward + speed_reward + stability_reward
+
+
+def metrics_from_stats(stats: FuzzerStats) -> FuzzingMetrics:
+    """Convert a parsed fuzzer_stats record into FuzzingMetrics (timestamp left unset)."""
+    metrics = FuzzingMetrics()
+    metrics.total_execs = stats.execs_done
+    metrics.execs_per_sec = stats.execs_per_sec
+    metrics.paths_total = stats.corpus_count
+    metrics.unique_crashes = stats.saved_crashes
+    metrics.unique_hangs = stats.saved_hangs
+    metrics.bitmap_cvg = stats.bitmap_cvg
+    metrics.stability = stats.stability
+    metrics.pending_favs = stats.pending_favs
+    metrics.pending_total = stats.pending_total
+    metrics.cycles_done = stats.cycles_done
+    metrics.last_crash = stats.last_crash
+    metrics.last_hang = stats.last_hang
+    metrics.last_path = stats.last_find
+    
+    # Calculate coverage as bitmap coverage percentage
+    metrics.coverage = metrics.bitmap_cvg
+    
+    # Update paths_found
+    metrics.paths_found = metrics.paths_total
+    
+    return metrics
+
+
+# Instance directory AFL++ uses when started without -M/-S
+DEFAULT_INSTANCE = "default"
+
+# Threads reading instance directories of a parallel campaign
+MAX_READ_WORKERS = 8
+
+
+def discover_instances(output_dir) -> Dict[str, Path]:
+    """
+    Find the AFL++ instance directories under an output directory.
+    
+    Covers the default layout (default/) as well as -M/-S campaigns
+    (master/slaveN, main/secN, or any other instance names).
+    
+    Returns:
+        Dictionary of instance name -> directory, for directories with a fuzzer_stats file
+    """
+    try:
+        entries = sorted(os.scandir(output_dir), key=lambda entry: entry.name)
+    except OSError:
+        return {}
+    return {entry.name: Path(entry.path) for entry in entries
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "fuzzer_stats"))}
+
+
+def read_virgin_bitmap(instance_dir) -> Optional[np.ndarray]:
+    """Read an instance's fuzz_bitmap (AFL++'s virgin map: 0xff until an edge is hit)."""
+    try:
+        bitmap = np.fromfile(Path(instance_dir) / "fuzz_bitmap", dtype=np.uint8)
+    except (OSError, ValueError):
+        return None
+    return bitmap if len(bitmap) else None
+
+
+def union_coverage(bitmaps: List[np.ndarray]) -> Optional[float]:
+    """
+    Percentage of the coverage map hit by at least one instance.
+    
+    Args:
+        bitmaps: Virgin maps from read_virgin_bitmap (maps of a different size are skipped)
+        
+    Returns:
+        Coverage percentage, or None if there is no bitmap
+    """
+    if not bitmaps:
+        return None
+    hit = bitmaps[0] != 0xff
+    for bitmap in bitmaps[1:]:
+        if len(bitmap) == len(hit):
+            hit |= bitmap != 0xff
+    return 100.0 * np.count_nonzero(hit) / len(hit)
+
+
+def aggregate_metrics(samples: List[FuzzingMetrics], coverage: Optional[float] = None) -> FuzzingMetrics:
+    """
+    Combine the metrics of the instances of a parallel campaign.
+    
+    Speeds, executions, crashes, hangs and pending inputs are summed. Every
+    instance imports the others' queue entries, so the corpus size is the
+    largest one. Coverage is the union over the instances' bitmaps when
+    known, otherwise the best instance (a lower bound of the union).
+    
+    Args:
+        samples: Metrics of each instance
+        coverage: Union coverage from union_coverage(), if available
+        
+    Returns:
+        Aggregate FuzzingMetrics
+    """
+    metrics = FuzzingMetrics()
+    metrics.timestamp = max(m.timestamp for m in samples)
+    for name in ('unique_crashes', 'unique_hangs', 'total_execs', 'execs_per_sec',
+                 'pending_favs', 'pending_total'):
+        setattr(metrics, name, sum(getattr(m, name) for m in samples))
+    for name in ('paths_total', 'paths_found', 'levels', 'last_crash', 'last_hang', 'last_path'):
+        setattr(metrics, name, max(getattr(m, name) for m in samples))
+    metrics.cycles_done = min(m.cycles_done for m in samples)
+    metrics.stability = sum(m.stability for m in samples) / len(samples)
+    
+    metrics.coverage = coverage if coverage is not None else max(m.coverage for m in samples)
+    metrics.bitmap_cvg = metrics.coverage
+    
+    return metrics
+
+
+def read_campaign_metrics(output_dir) -> Optional[FuzzingMetrics]:
+    """
+    One-off read of a whole AFL++ output directory, aggregated over its instances.
+    
+    Returns:
+        FuzzingMetrics, or None if no instance has a readable fuzzer_stats
+    """
+    samples, bitmaps = [], []
+    for directory in discover_instances(output_dir).values():
+        stats = parse_fuzzer_stats(directory / "fuzzer_stats")
+        if stats is None:
+            continue
+        samples.append(metrics_from_stats(stats))
+        bitmap = read_virgin_bitmap(directory)
+        if bitmap is not None:
+            bitmaps.append(bitmap)
+    
+    if not samples:
+        return None
+    if len(samples) == 1:
+        return samples[0]
+    return aggregate_metrics(samples, union_coverage(bitmaps))
+
+
+def history_state_vector(history: MetricsHistory, plot_tail: Optional[PlotDataTail],
+                         rate_window: float = RATE_WINDOW) -> np.ndarray:
+    """
+    State vector from the newest samples of a metrics history.
+    
+    Rate features come from the plot_data series when plot_tail is given and
+    has rows; the difference between the last two samples is the fallback.
+    """
+    if len(history) == 0:
+        # Return zero state if no metrics
+        return np.zeros(10)
+    
+    current = history[-1]
+    previous = history[-2] if len(history) >= 2 else None
+    
+    rates = None
+    if plot_tail is not None:
+        plot_tail.poll()
+        rates = plot_tail.rates(rate_window)
+    time_delta = current.timestamp - previous.timestamp if previous is not None else 0.0
+    
+    return build_state_vector(current, previous, time_delta if time_delta > 0 else RATE_INTERVAL, rates)
+
+
+class FuzzerInstance:
+    """Metrics history and plot_data reader of one AFL++ instance directory."""
+    
+    def __init__(self, name: str, directory: Path, history_size: int = 10):
+        self.name = name
+        self.directory = Path(directory)
+        self.stats_file = self.directory / "fuzzer_stats"
+        self.plot_tail = PlotDataTail(self.directory / "plot_data")
+        self.metrics_history = MetricsHistory(history_size, sample_type=FuzzingMetrics)
+    
+    def get_state_vector(self, rate_window: float = RATE_WINDOW) -> np.ndarray:
+        """State vector of this instance alone."""
+        return history_state_vector(self.metrics_history, self.plot_tail, rate_window)
+
+
 class FeedbackAnalyzer:
     """
     Analyzes AFL++ fuzzing output and generates state representations
     and rewards for reinforcement learning.
+    
+    Parallel campaigns (-M/-S instances in one output directory) are read
+    concurrently; the state and reward describe the aggregate campaign, and
+    get_instance_states() gives the state of each instance.
     """
     
-    def __init__(self, output_dir: str, history_size: int = 10):
+    def __init__(self, output_dir: str, history_size: int = 10, rate_window: float = RATE_WINDOW,
+                 history_file: Optional[str] = None, stats_bus=None):
         """
         Initialize the feedback analyzer.
         
         Args:
             output_dir: AFL++ output directory
             history_size: Number of historical states to maintain
+            rate_window: Seconds of plot_data the rate features are measured over
+            history_file: Append-only binary log of every metrics sample (optional)
+            stats_bus: stats_bus.StatsBusClient publishing this campaign (optional);
+                instances it does not publish are read from their files
         """
         self.output_dir = Path(output_dir)
         self.history_size = history_size
+        self.rate_window = rate_window
         
-        # Fuzzer stats file
-        self.fuzzer_stats_file = self.output_dir / "default" / "fuzzer_stats"
+        # Fuzzer instances, found again on every read since -S instances may
+        # start later; "default" is assumed until any instance directory exists
+        self.instances: Dict[str, FuzzerInstance] = {
+            DEFAULT_INSTANCE: FuzzerInstance(DEFAULT_INSTANCE, self.output_dir / DEFAULT_INSTANCE, history_size)
+        }
+        self.stats_reader = CachedStatsReader()
+        self.stats_bus = stats_bus
+        self._executor: Optional[ThreadPoolExecutor] = None
         
-        # Historical data
-        self.metrics_history: List[FuzzingMetrics] = []
+        # Historical data (every sample is also appended to history_file, if given)
+        self.metrics_history = MetricsHistory(history_size, sample_type=FuzzingMetrics, log_file=history_file)
         self.last_update_time = time.time()
         
         # Baseline metrics (for computing improvements)
@@ -91,59 +377,96 @@ class FeedbackAnalyzer:
         
         logger.info(f"Feedback Analyzer initialized for: {output_dir}")
     
+    @property
+    def plot_tail(self) -> Optional[PlotDataTail]:
+        """plot_data reader for the rate features (None for parallel campaigns)."""
+        if len(self.instances) == 1:
+            return next(iter(self.instances.values())).plot_tail
+        return None
+    
+    def refresh_instances(self) -> Dict[str, FuzzerInstance]:
+        """Pick up instance directories created since the last call."""
+        found = discover_instances(self.output_dir)
+        for name, directory in found.items():
+            if name not in self.instances:
+                self.instances[name] = FuzzerInstance(name, directory, self.history_size)
+                if len(found) > 1:
+                    logger.info(f"Tracking fuzzer instance {name}")
+        if found and DEFAULT_INSTANCE not in found:
+            self.instances.pop(DEFAULT_INSTANCE, None)
+        return self.instances
+    
+    def _read_instance(self, instance: FuzzerInstance, with_bitmap: bool, use_bus: bool):
+        stats = self.stats_bus.get(instance.stats_file) if use_bus else None
+        if stats is None:
+            # Re-parsed only when the file changed since the last call
+            stats = self.stats_reader.read(instance.stats_file)
+        bitmap = read_virgin_bitmap(instance.directory) if with_bitmap else None
+        return stats, bitmap
+    
+    def _refresh_bus(self) -> bool:
+        """Take a new stats bus snapshot; False if there is no usable bus."""
+        if self.stats_bus is None:
+            return False
+        try:
+            return self.stats_bus.refresh()
+        except TimeoutError as e:
+            logger.warning(f"{e}, reading stats files directly")
+            return False
+    
+    def _read_instances(self) -> Tuple[Dict[str, FuzzingMetrics], Optional[float]]:
+        """Read every instance; returns per-instance metrics and the union coverage (parallel only)."""
+        instances = list(self.refresh_instances().values())
+        parallel = len(instances) > 1
+        use_bus = self._refresh_bus()
+        
+        if parallel:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=MAX_READ_WORKERS)
+            results = list(self._executor.map(lambda i: self._read_instance(i, True, use_bus), instances))
+        else:
+            results = [self._read_instance(i, False, use_bus) for i in instances]
+        
+        now = time.time()
+        per_instance: Dict[str, FuzzingMetrics] = {}
+        bitmaps = []
+        for instance, (stats, bitmap) in zip(instances, results):
+            if stats is None:
+                logger.warning(f"Fuzzer stats file not found or unreadable: {instance.stats_file}")
+                continue
+            metrics = metrics_from_stats(stats)
+            metrics.timestamp = now
+            per_instance[instance.name] = metrics
+            if bitmap is not None:
+                bitmaps.append(bitmap)
+        
+        return per_instance, union_coverage(bitmaps) if parallel else None
+    
+    def _combine(self, per_instance: Dict[str, FuzzingMetrics], coverage: Optional[float]) -> Optional[FuzzingMetrics]:
+        if not per_instance:
+            return None
+        if len(self.instances) == 1:
+            return next(iter(per_instance.values()))
+        return aggregate_metrics(list(per_instance.values()), coverage)
+    
     def parse_fuzzer_stats(self) -> Optional[FuzzingMetrics]:
         """
-        Parse AFL++ fuzzer_stats file.
+        Parse the AFL++ fuzzer_stats file(s).
         
         Returns:
-            FuzzingMetrics object or None if parsing fails
+            FuzzingMetrics object (aggregated over all instances of a parallel
+            campaign) or None if parsing fails
         """
-        if not self.fuzzer_stats_file.exists():
-            logger.warning(f"Fuzzer stats file not found: {self.fuzzer_stats_file}")
-            return None
+        return self._combine(*self._read_instances())
+    
+    def get_instance_metrics(self) -> Dict[str, FuzzingMetrics]:
+        """
+        Get the current metrics of every fuzzer instance.
         
-        try:
-            metrics = FuzzingMetrics()
-            
-            with open(self.fuzzer_stats_file, 'r') as f:
-                content = f.read()
-            
-            # Parse key metrics using regex
-            patterns = {
-                'total_execs': r'execs_done\s*:\s*(\d+)',
-                'execs_per_sec': r'execs_per_sec\s*:\s*([\d.]+)',
-                'paths_total': r'paths_total\s*:\s*(\d+)',
-                'unique_crashes': r'saved_crashes\s*:\s*(\d+)',
-                'unique_hangs': r'saved_hangs\s*:\s*(\d+)',
-                'bitmap_cvg': r'bitmap_cvg\s*:\s*([\d.]+)%',
-                'stability': r'stability\s*:\s*([\d.]+)%',
-                'pending_favs': r'pending_favs\s*:\s*(\d+)',
-                'pending_total': r'pending_total\s*:\s*(\d+)',
-                'cycles_done': r'cycles_done\s*:\s*(\d+)',
-                'last_crash': r'last_crash\s*:\s*(\d+)',
-                'last_path': r'last_path\s*:\s*(\d+)',
-            }
-            
-            for attr, pattern in patterns.items():
-                match = re.search(pattern, content)
-                if match:
-                    value = match.group(1)
-                    if '.' in value:
-                        setattr(metrics, attr, float(value))
-                    else:
-                        setattr(metrics, attr, int(value))
-            
-            # Calculate coverage as bitmap coverage percentage
-            metrics.coverage = metrics.bitmap_cvg
-            
-            # Update paths_found
-            metrics.paths_found = metrics.paths_total
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error parsing fuzzer stats: {e}")
-            return None
+        Returns:
+            Dictionary of instance name -> FuzzingMetrics
+        """
+        return self._read_instances()[0]
     
     def get_current_metrics(self) -> Optional[FuzzingMetrics]:
         """
@@ -161,23 +484,23 @@ class FeedbackAnalyzer:
         Returns:
             True if update successful, False otherwise
         """
-        metrics = self.get_current_metrics()
+        per_instance, coverage = self._read_instances()
+        metrics = self._combine(per_instance, coverage)
         
         if metrics is None:
             return False
         
-        # Add to history
-        self.metrics_history.append(metrics)
+        for name, instance_metrics in per_instance.items():
+            self.instances[name].metrics_history.append(instance_metrics)
         
-        # Maintain history size
-        if len(self.metrics_history) > self.history_size:
-            self.metrics_history.pop(0)
+        # Add to history (the oldest sample is dropped beyond history_size)
+        self.metrics_history.append(metrics)
         
         # Set baseline if not set
         if self.baseline_metrics is None:
             self.baseline_metrics = metrics
         
-        self.last_update_time = time.time()
+        self.last_update_time = metrics.timestamp
         
         return True
     
@@ -200,40 +523,19 @@ class FeedbackAnalyzer:
         Returns:
             Normalized state vector
         """
-        if len(self.metrics_history) == 0:
-            # Return zero state if no metrics
-            return np.zeros(10)
-        
-        current = self.metrics_history[-1]
+        # Rate features from the plot_data series of a single instance; for
+        # parallel campaigns they come from the aggregate samples
+        return history_state_vector(self.metrics_history, self.plot_tail, self.rate_window)
+    
+    def get_instance_states(self) -> Dict[str, np.ndarray]:
+        """
+        Generate the state vector of every fuzzer instance.
         
-        # Calculate rates if we have history
-        if len(self.metrics_history) >= 2:
-            previous = self.metrics_history[-2]
-            time_delta = max(self.last_update_time - (self.last_update_time - 60), 1.0)  # Assume 60s interval
-            
-            coverage_rate = (current.coverage - previous.coverage) / time_delta
-            crash_rate = (current.unique_crashes - previous.unique_crashes) / time_delta
-            path_rate = (current.paths_total - previous.paths_total) / time_delta
-        else:
-            coverage_rate = 0.0
-            crash_rate = 0.0
-            path_rate = 0.0
-        
-        # Construct state vector
-        state = np.array([
-            current.coverage / 100.0,           # 0: Normalized coverage (0-1)
-            coverage_rate,                       # 1: Coverage growth rate
-            current.unique_crashes / 100.0,      # 2: Normalized crash count
-            crash_rate,                          # 3: Crash discovery rate
-            current.execs_per_sec / 1000.0,     # 4: Normalized exec speed
-            current.paths_total / 1000.0,       # 5: Normalized path count
-            path_rate,                           # 6: Path discovery rate
-            current.stability / 100.0,           # 7: Normalized stability
-            current.cycles_done / 10.0,         # 8: Normalized cycles
-            current.pending_favs / 100.0,       # 9: Normalized pending cases
-        ])
-        
-        return state
+        Returns:
+            Dictionary of instance name -> state vector
+        """
+        return {name: instance.get_state_vector(self.rate_window)
+                for name, instance in self.instances.items()}
     
     def compute_reward(self) -> float:
         """
@@ -254,25 +556,7 @@ class FeedbackAnalyzer:
         current = self.metrics_history[-1]
         previous = self.metrics_history[-2]
         
-        # Coverage improvement reward (highest weight)
-        coverage_reward = (current.coverage - previous.coverage) * 10.0
-        
-        # Crash discovery reward
-        crash_reward = (current.unique_crashes - previous.unique_crashes) * 50.0
-        
-        # Path discovery reward
-        path_reward = (current.paths_total - previous.paths_total) * 1.0
-        
-        # Execution speed reward (small bonus for maintaining speed)
-        speed_reward = min(current.execs_per_sec / 1000.0, 1.0) * 0.5
-        
-        # Stability penalty (want stable fuzzing)
-        stability_reward = (current.stability / 100.0) * 0.5
-        
-        # Total reward
-        reward = coverage_reward + crash_reward + path_reward + speed_reward + stability_reward
-        
-        return reward
+        return float(compute_reward_from_metrics(current, previous))
     
     def get_state_and_reward(self) -> Tuple[np.ndarray, float]:
         """
@@ -325,6 +609,11 @@ class FeedbackAnalyzer:
             'baseline_set': self.baseline_metrics is not None,
         }
         
+        if len(self.instances) > 1:
+            summary['instances'] = {name: instance.metrics_history[-1].to_dict()
+                                    for name, instance in self.instances.items()
+                                    if len(instance.metrics_history) > 0}
+        
         if self.baseline_metrics:
             summary['improvement'] = {
                 'coverage': current.coverage - self.baseline_metrics.coverage,
@@ -334,28 +623,65 @@ class FeedbackAnalyzer:
         
         return summary
     
+    def close(self):
+        """Shut down the reader threads, detach from the stats bus and close the metrics log."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.stats_bus is not None:
+            self.stats_bus.close()
+            self.stats_bus = None
+        self.metrics_history.close()
+    
     def save_history(self, filepath: str):
-        """Save metrics history to file."""
-        history_data = [m.to_dict() for m in self.metrics_history]
-        
-        with open(filepath, 'w') as f:
-            json.dump(history_data, f, indent=2)
+        """Save metrics history to a binary history file (see metrics_history.load_history_file)."""
+        self.metrics_history.save(filepath)
         
         logger.info(f"Metrics history saved to {filepath}")
     
     def load_history(self, filepath: str):
-        """Load metrics history from file."""
+        """Load metrics history from a binary history file or a legacy JSON list."""
+        if is_history_file(filepath):
+            self.metrics_history.load(filepath)
+        else:
+            with open(filepath, 'r') as f:
+                history_data = json.load(f)
+            
+            self.metrics_history.clear()
+            for data in history_data[-self.history_size:]:
+                self.metrics_history.append(self._metrics_from_dict(data), log=False)
+        
+        logger.info(f"Metrics history loaded from {filepath}")
+    
+    @staticmethod
+    def _metrics_from_dict(data: Dict) -> FuzzingMetrics:
+        metrics = FuzzingMetrics()
+        for key, value in data.items():
+            if key in FuzzingMetrics.__slots__:
+                setattr(metrics, key, value)
+        return metrics
+    
+    def save_state(self, filepath: str):
+        """Save metrics history and baseline, for resuming a campaign."""
+        state = {
+            'history': self.metrics_history.to_dicts(),
+            'baseline': self.baseline_metrics.to_dict() if self.baseline_metrics else None,
+        }
+        with open(filepath, 'w') as f:
+            json.dump(state, f, indent=2)
+    
+    def load_state(self, filepath: str):
+        """Restore metrics history and baseline written by save_state()."""
         with open(filepath, 'r') as f:
-            history_data = json.load(f)
+            state = json.load(f)
         
         self.metrics_history.clear()
-        for data in history_data:
-            metrics = FuzzingMetrics()
-            for key, value in data.items():
-                setattr(metrics, key, value)
-            self.metrics_history.append(metrics)
+        for data in state['history'][-self.history_size:]:
+            self.metrics_history.append(self._metrics_from_dict(data), log=False)
+        baseline = state.get('baseline')
+        self.baseline_metrics = self._metrics_from_dict(baseline) if baseline else None
         
-        logger.info(f"Metrics history loaded from {filepath}")
+        logger.info(f"Analyzer state loaded from {filepath} ({len(self.metrics_history)} samples)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+"""
+Fuzzing Environments
+Gym-style reset/step wrappers around live AFL++ output directories, built
+on FeedbackAnalyzer (state and reward) and MutationStrategySelector
+(action -> mutation strategy). VecFuzzEnv steps many instances concurrently
+and returns batched arrays, so a learner or an offline evaluation can treat
+N campaigns as one [N, state_dim] batch.
+"""
+
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from feedback_analyzer import FeedbackAnalyzer
+from mutation_selector import MutationStrategySelector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+STATE_DIM = 10  # As defined in FeedbackAnalyzer.get_state_vector
+
+
+class FuzzEnv:
+    """
+    Single AFL++ instance as a reinforcement learning environment.
+
+    A fuzzing campaign cannot be restarted per episode, so 'done' only marks
+    an episode boundary (FeedbackAnalyzer.is_done); the environment keeps
+    running and does not need to be reset afterwards.
+    """
+
+    def __init__(self, output_dir: str, history_size: int = 10, step_interval: float = 0.0):
+        """
+        Initialize the environment.
+
+        Args:
+            output_dir: AFL++ output directory
+            history_size: Number of historical states kept by the analyzer
+            step_interval: Seconds to let the chosen strategy run before observing
+        """
+        self.output_dir = Path(output_dir)
+        self.step_interval = step_interval
+        self.analyzer = FeedbackAnalyzer(str(self.output_dir), history_size=history_size)
+        self.selector = MutationStrategySelector()
+
+        self.observation_dim = STATE_DIM
+        self.num_actions = self.selector.get_num_actions()
+
+    def reset(self) -> np.ndarray:
+        """
+        Take an initial observation.
+
+        Returns:
+            State vector (zeros if the fuzzer has not written stats yet)
+        """
+        self.analyzer.update()
+        return self.analyzer.get_state_vector()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, Dict]:
+        """
+        Apply a mutation strategy and observe its effect.
+
+        Args:
+            action: Action index from the agent
+
+        Returns:
+            Tuple of (state, reward, done, info)
+        """
+        strategy = self.selector.select_strategy(action)
+
+        if self.step_interval > 0:
+            time.sleep(self.step_interval)
+
+        valid = self.analyzer.update()
+        state, reward = self.analyzer.get_state_and_reward()
+        done = self.analyzer.is_done()
+
+        history = self.analyzer.metrics_history
+        if valid and len(history) >= 2:
+            current, previous = history[-1], history[-2]
+            self.selector.update_strategy_stats(
+                coverage_gain=current.coverage - previous.coverage,
+                crashes=current.unique_crashes - previous.unique_crashes,
+                paths=current.paths_total - previous.paths_total
+            )
+
+        info = {
+            'strategy': strategy.name,
+            'valid': valid,
+            'afl_config': self.selector.get_afl_mutation_config(strategy),
+        }
+
+        return state, (reward if valid else 0.0), done, info
+
+    def close(self):
+        """Release the analyzer's reader threads, stats bus handle and metrics log."""
+        self.analyzer.close()
+
+
+class VecFuzzEnv:
+    """
+    Batch of FuzzEnv instances stepped concurrently.
+
+    Observations, rewards and dones are written into preallocated arrays of
+    shape [num_envs, ...]; the returned arrays are reused by the next call,
+    so copy them if they must be kept.
+    """
+
+    def __init__(
+        self,
+        output_dirs: List[str],
+        history_size: int = 10,
+        step_interval: float = 0.0,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the vectorized environment.
+
+        Args:
+            output_dirs: AFL++ output directories, one environment each
+            history_size: Number of historical states kept per analyzer
+            step_interval: Seconds to let the chosen strategies run before observing
+            max_workers: Maximum concurrent environment steps (default: one per env)
+        """
+        self.envs = [FuzzEnv(d, history_size=history_size) for d in output_dirs]
+        self.num_envs = len(self.envs)
+        self.step_interval = step_interval
+        self.observation_dim = STATE_DIM
+        self.num_actions = self.envs[0].num_actions if self.envs else 0
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(self.num_envs, 1))
+
+        self.observations = np.zeros((self.num_envs, STATE_DIM), dtype=np.float32)
+        self.rewards = np.zeros(self.num_envs, dtype=np.float32)
+        self.dones = np.zeros(self.num_envs, dtype=bool)
+
+        logger.info(f"Vectorized fuzzing environment with {self.num_envs} instances")
+
+    @classmethod
+    def from_parent_dir(cls, parent_dir: str, **kwargs) -> 'VecFuzzEnv':
+        """
+        Create one environment per AFL++ output directory found under parent_dir.
+
+        An output directory is any directory containing default/fuzzer_stats.
+        """
+        output_dirs = sorted(str(p.parent.parent) for p in Path(parent_dir).glob("*/default/fuzzer_stats"))
+        return cls(output_dirs, **kwargs)
+
+    def reset(self) -> np.ndarray:
+        """
+        Take an initial observation from every environment.
+
+        Returns:
+            Observations of shape [num_envs, state_dim]
+        """
+        for i, state in enumerate(self.executor.map(lambda env: env.reset(), self.envs)):
+            self.observations[i] = state
+        return self.observations
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Apply one action per environment and observe all of them.
+
+        Args:
+            actions: Action indices of shape [num_envs]
+
+        Returns:
+            Tuple of (observations [N, state_dim], rewards [N], dones [N], infos)
+        """
+        actions = np.asarray(actions).reshape(self.num_envs)
+
+        if self.step_interval > 0:
+            time.sleep(self.step_interval)
+
+        results = self.executor.map(lambda pair: pair[0].step(int(pair[1])), zip(self.envs, actions))
+
+        infos = []
+        for i, (state, reward, done, info) in enumerate(results):
+            self.observations[i] = state
+            self.rewards[i] = reward
+            self.dones[i] = done
+            infos.append(info)
+
+        return self.observations, self.rewards, self.dones, infos
+
+    def close(self):
+        """Shut down the worker threads and close every environment."""
+        self.executor.shutdown(wait=True)
+        for env in self.envs:
+            env.close()
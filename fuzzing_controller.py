@@ -10,6 +10,8 @@ import time
 import signal
 import subprocess
 import json
+import pickle
+import random
 import numpy as np
 from pathlib import Path
 from typing import Optional, Dict
@@ -17,9 +19,8 @@ import logging
 from datetime import datetime
 
 # Import our modules
-from ppo_agent import PPOAgent
 from feedback_analyzer import FeedbackAnalyzer
-from mutation_selector import MutationStrategySelector
+from mutation_selector import CONTROL_ENV, CURSOR_ENV, MutationStrategySelector, MutatorControl
 
 logging.basicConfig(
     level=logging.INFO,
@@ -75,27 +76,123 @@ class FuzzingController:
         self.mutation_selector = MutationStrategySelector()
         self.action_dim = self.mutation_selector.get_num_actions()
         
-        self.agent = PPOAgent(
-            state_dim=self.state_dim,
-            action_dim=self.action_dim,
-            hidden_dim=ppo_config.get('hidden_dim', 128),
-            learning_rate=ppo_config.get('learning_rate', 3e-4),
-            gamma=ppo_config.get('gamma', 0.99),
-            gae_lambda=ppo_config.get('gae_lambda', 0.95),
-            clip_epsilon=ppo_config.get('clip_epsilon', 0.2),
-            value_coef=ppo_config.get('value_coef', 0.5),
-            entropy_coef=ppo_config.get('entropy_coef', 0.01),
-        )
+        # A shared policy server, a NumPy policy snapshot or a distributed
+        # learner replaces the local network (and torch) entirely; this
+        # controller then does not train locally.
+        self.distributed = bool(ppo_config.get('learner'))
+        self.algorithm = ppo_config.get('algorithm', 'ppo')  # 'ppo' or off-policy 'dqn'
+        self.actor_only = bool(ppo_config.get('policy_server') or ppo_config.get('policy_snapshot')
+                               or self.distributed)
+        self.policy_library = None
+        
+        if self.distributed:
+            from distributed_ppo import DistributedActor
+            self.agent = DistributedActor(ppo_config['learner'])
+        elif ppo_config.get('policy_server'):
+            from policy_server import PolicyClient
+            self.agent = PolicyClient(ppo_config['policy_server'])
+        elif ppo_config.get('policy_snapshot'):
+            from policy_snapshot import PolicySnapshot
+            self.agent = PolicySnapshot.load(ppo_config['policy_snapshot'])
+        elif self.algorithm == 'dqn':
+            from dqn_agent import DQNAgent
+            self.agent = DQNAgent(
+                state_dim=self.state_dim,
+                action_dim=self.action_dim,
+                hidden_dim=ppo_config.get('hidden_dim', 128),
+                learning_rate=ppo_config.get('learning_rate', 3e-4),
+                gamma=ppo_config.get('gamma', 0.99),
+                buffer_size=ppo_config.get('replay_size', 100000),
+                alpha=ppo_config.get('priority_alpha', 0.6),
+                epsilon_decay_steps=ppo_config.get('epsilon_decay_steps', 200),
+                target_update_interval=ppo_config.get('target_update_interval', 100),
+            )
+        else:
+            from ppo_agent import PPOAgent
+            self.agent = PPOAgent(
+                state_dim=self.state_dim,
+                action_dim=self.action_dim,
+                hidden_dim=ppo_config.get('hidden_dim', 128),
+                learning_rate=ppo_config.get('learning_rate', 3e-4),
+                gamma=ppo_config.get('gamma', 0.99),
+                gae_lambda=ppo_config.get('gae_lambda', 0.95),
+                clip_epsilon=ppo_config.get('clip_epsilon', 0.2),
+                value_coef=ppo_config.get('value_coef', 0.5),
+                entropy_coef=ppo_config.get('entropy_coef', 0.01),
+                target_kl=ppo_config.get('target_kl'),
+            )
+        
+        if not self.actor_only:
+            # Warm start: explicit checkpoint first, else closest library match
+            if ppo_config.get('policy_library'):
+                from policy_library import PolicyLibrary, target_fingerprint
+                self.policy_library = PolicyLibrary(
+                    ppo_config['policy_library'],
+                    max_entries=ppo_config.get('library_max_entries', 64),
+                    max_bytes=ppo_config.get('library_max_mb', 512) * 1024 * 1024
+                )
+                self.fingerprint = target_fingerprint(
+                    str(self.binary_path),
+                    benchmark=experiment_config.get('benchmark'),
+                    input_dir=str(self.input_dir),
+                    input_type=experiment_config.get('input_type')
+                )
+                self.fingerprint['algorithm'] = self.algorithm
+                self.fingerprint['hidden_dim'] = ppo_config.get('hidden_dim', 128)
+            # PPO can act with a scripted or quantized variant (loaded with the weights)
+            variant = ppo_config.get('inference_variant', 'eager') if self.algorithm == 'ppo' else 'eager'
+            load_kwargs = {'variant': variant} if variant != 'eager' else {}
+            warm_start = None
+            if ppo_config.get('pretrained'):
+                # Weights from replay_simulator.py pretraining
+                warm_start = ppo_config['pretrained']
+            elif self.policy_library is not None:
+                warm_start = self.policy_library.lookup(self.fingerprint)
+            if warm_start is not None:
+                try:
+                    self.agent.load(str(warm_start), **load_kwargs)
+                except (RuntimeError, KeyError, OSError) as e:
+                    # Incompatible or unreadable checkpoint: cold start with fresh weights
+                    logger.warning(f"Could not warm start from {warm_start}: {e}; starting from scratch")
+                    warm_start = None
+            if warm_start is None and variant != 'eager':
+                self.agent.set_inference_variant(variant)
+        
+        # Update schedule (tunable with hyperparameter_sweep.py)
+        self.n_epochs = ppo_config.get('n_epochs', 10)
+        self.batch_size = ppo_config.get('batch_size', 32)
+        
+        # Optional background learner: PPO epochs run in a thread while the
+        # control loop keeps polling stats and acting with the previous weights
+        self.learner = None
+        if not self.actor_only and self.algorithm == 'ppo' and ppo_config.get('async_update', False):
+            from ppo_agent import AsyncLearner
+            self.learner = AsyncLearner(self.agent, n_epochs=self.n_epochs, batch_size=self.batch_size)
+        
+        # Stats published by a stats_bus collector replace direct fuzzer_stats reads
+        stats_bus = None
+        if experiment_config.get('stats_bus'):
+            from stats_bus import attach_stats_bus
+            stats_bus = attach_stats_bus(experiment_config['stats_bus'])
         
         self.feedback_analyzer = FeedbackAnalyzer(
             output_dir=str(self.output_dir),
-            history_size=experiment_config.get('history_size', 10)
+            history_size=experiment_config.get('history_size', 10),
+            history_file=str(self.output_dir / "metrics_log.bin"),
+            stats_bus=stats_bus
         )
         
         # Fuzzing process
         self.fuzzer_process: Optional[subprocess.Popen] = None
         self.running = False
         
+        # Optional in-process AFL++ custom mutator (afl_mutator.py) that follows
+        # the selected strategy through a shared-memory control block
+        self.mutator_control: Optional[MutatorControl] = None
+        self.custom_mutator_only = bool(experiment_config.get('custom_mutator_only', False))
+        if experiment_config.get('custom_mutator', False):
+            self.mutator_control = MutatorControl(create=True)
+        
         # Training parameters
         self.update_interval = experiment_config.get('update_interval', 300)  # 5 minutes
         self.max_duration = experiment_config.get('duration_hours', 8) * 3600  # Convert to seconds
@@ -103,6 +200,8 @@ class FuzzingController:
         
         # Statistics
         self.start_time = None
+        self.resumed_elapsed = 0.0  # Campaign time before a --resume
+        self.resumed = False
         self.episodes = 0
         self.total_updates = 0
         self.training_stats = []
@@ -125,10 +224,11 @@ class FuzzingController:
             True if started successfully
         """
         try:
-            # Build AFL++ command
+            # Build AFL++ command; '-i -' resumes from the existing output dir
+            resume_afl = self.resumed and (self.output_dir / "default" / "fuzzer_stats").exists()
             afl_cmd = [
                 'afl-fuzz',
-                '-i', str(self.input_dir),
+                '-i', '-' if resume_afl else str(self.input_dir),
                 '-o', str(self.output_dir),
                 '-Q',  # QEMU mode
                 '-m', 'none',  # No memory limit
@@ -136,11 +236,24 @@ class FuzzingController:
             
             logger.info(f"Starting AFL++: {' '.join(afl_cmd)}")
             
+            env = os.environ.copy()
+            if self.mutator_control is not None:
+                repo_dir = str(Path(__file__).resolve().parent)
+                env['PYTHONPATH'] = os.pathsep.join(filter(None, [repo_dir, env.get('PYTHONPATH')]))
+                env['AFL_PYTHON_MODULE'] = 'afl_mutator'
+                env[CONTROL_ENV] = self.mutator_control.name
+                # Deterministic stage cursors live with the campaign so a resumed run continues them
+                env[CURSOR_ENV] = str(self.output_dir / "deterministic_cursors.bin")
+                if self.custom_mutator_only:
+                    env['AFL_CUSTOM_MUTATOR_ONLY'] = '1'
+                logger.info(f"Custom mutator enabled (control block {self.mutator_control.name})")
+            
             # Start fuzzer in background
             self.fuzzer_process = subprocess.Popen(
                 afl_cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
+                env=env,
                 preexec_fn=os.setsid  # Create new process group
             )
             
@@ -199,13 +312,16 @@ class FuzzingController:
         # Select action
         action = self.agent.select_action(state)
         
-        # Apply mutation strategy
+        # Apply mutation strategy (takes effect in the running afl-fuzz via the custom mutator)
         strategy = self.mutation_selector.select_strategy(action)
         logger.info(f"Selected mutation strategy: {strategy.name}")
+        if self.mutator_control is not None:
+            self.mutator_control.publish(strategy, self.mutation_selector.get_afl_mutation_config(strategy))
         
         # Store transition
         done = self.feedback_analyzer.is_done()
-        self.agent.store_transition(reward, done)
+        if not self.actor_only or self.distributed:
+            self.agent.store_transition(reward, done)
         
         # Update strategy stats
         current_metrics = self.feedback_analyzer.get_current_metrics()
@@ -219,14 +335,13 @@ class FuzzingController:
         
         # Perform PPO update if we have enough data
         update_stats = {}
-        if len(self.agent.states) >= 32:  # Minimum batch size
-            update_stats = self.agent.update(n_epochs=10, batch_size=32)
-            self.total_updates += 1
-            logger.info(f"PPO update #{self.total_updates} completed")
-            if update_stats:
-                logger.info(f"  Policy loss: {update_stats['policy_loss']:.4f}")
-                logger.info(f"  Value loss: {update_stats['value_loss']:.4f}")
-                logger.info(f"  Mean return: {update_stats['mean_return']:.4f}")
+        if self.learner is not None:
+            update_stats = self.poll_learner()
+            if (self.learner.retry_pending or len(self.agent.buffer) >= 32) and self.learner.submit():  # Minimum batch size
+                logger.info("Background PPO update started")
+        elif not self.actor_only and len(self.agent.buffer) >= 32:  # Minimum batch size
+            update_stats = self.agent.update(n_epochs=self.n_epochs, batch_size=self.batch_size)
+            self._log_update(update_stats)
         
         stats = {
             'episode': self.episodes,
@@ -246,6 +361,36 @@ class FuzzingController:
         
         return stats
     
+    def _log_update(self, update_stats: Dict):
+        """Count and log a completed agent update."""
+        self.total_updates += 1
+        logger.info(f"{self.algorithm.upper()} update #{self.total_updates} completed")
+        if update_stats and self.algorithm == 'dqn':
+            logger.info(f"  TD loss: {update_stats['loss']:.4f}")
+            logger.info(f"  Mean Q: {update_stats['mean_q']:.4f}")
+            logger.info(f"  Replay: {update_stats['buffer_size']} transitions, "
+                       f"ε={update_stats['epsilon']:.3f}")
+        elif update_stats:
+            logger.info(f"  Policy loss: {update_stats['policy_loss']:.4f}")
+            logger.info(f"  Value loss: {update_stats['value_loss']:.4f}")
+            logger.info(f"  Mean return: {update_stats['mean_return']:.4f}")
+            logger.info(f"  Epochs: {update_stats['epochs_run']} "
+                       f"({update_stats['time_per_epoch']*1000:.1f} ms/epoch, "
+                       f"approx KL {update_stats['approx_kl']:.4f})")
+    
+    def poll_learner(self) -> Dict:
+        """
+        Collect the result of a finished background update, if any.
+        
+        Returns:
+            Training statistics of the finished update, or an empty dictionary
+        """
+        update_stats = self.learner.poll()
+        if update_stats is None:
+            return {}
+        self._log_update(update_stats)
+        return update_stats
+    
     def save_checkpoint(self, suffix: str = ""):
         """
         Save a checkpoint of the current state.
@@ -258,11 +403,23 @@ class FuzzingController:
         checkpoint_path = self.checkpoint_dir / checkpoint_name
         checkpoint_path.mkdir(exist_ok=True)
         
-        # Save agent
-        self.agent.save(str(checkpoint_path / "agent.pt"))
+        # Save agent (after any running background update, so weights and
+        # optimizer state are consistent)
+        if self.learner is not None:
+            self.learner.wait()
+        if not self.actor_only:
+            self.agent.save(str(checkpoint_path / "agent.pt"))
+            if self.algorithm == 'ppo':
+                self.agent.buffer.save(str(checkpoint_path / "rollout.npz"))
+            if suffix == "_final" and self.policy_library is not None:
+                self.policy_library.add(
+                    str(checkpoint_path / "agent.pt"),
+                    self.fingerprint,
+                    metrics=self.feedback_analyzer.get_summary().get('current_metrics', {})
+                )
         
         # Save feedback history
-        self.feedback_analyzer.save_history(str(checkpoint_path / "metrics_history.json"))
+        self.feedback_analyzer.save_history(str(checkpoint_path / "metrics_history.bin"))
         
         # Save strategy stats
         strategy_stats = {
@@ -276,8 +433,103 @@ class FuzzingController:
         with open(checkpoint_path / "training_stats.json", 'w') as f:
             json.dump(self.training_stats, f, indent=2)
         
+        # Resume state: analyzer baseline, raw selector stats, RNGs, counters
+        self.feedback_analyzer.save_state(str(checkpoint_path / "analyzer_state.json"))
+        self.mutation_selector.save_state(str(checkpoint_path / "selector_state.json"))
+        with open(checkpoint_path / "rng_state.pkl", 'wb') as f:
+            pickle.dump(self._rng_state(), f)
+        
+        # Written last: marks the checkpoint as complete for --resume
+        elapsed = self.resumed_elapsed + (time.time() - self.start_time if self.start_time else 0.0)
+        with open(checkpoint_path / "controller_state.json", 'w') as f:
+            json.dump({
+                'elapsed_time': elapsed,
+                'episodes': self.episodes,
+                'total_updates': self.total_updates,
+                'algorithm': self.algorithm,
+            }, f, indent=2)
+        
         logger.info(f"Checkpoint saved: {checkpoint_path}")
     
+    def _rng_state(self) -> Dict:
+        """Capture the Python, NumPy, torch and agent RNG states."""
+        state = {
+            'python': random.getstate(),
+            'numpy': np.random.get_state(),
+        }
+        if 'torch' in sys.modules:
+            import torch
+            state['torch'] = torch.get_rng_state()
+        if isinstance(getattr(self.agent, 'rng', None), np.random.Generator):
+            state['agent'] = self.agent.rng.bit_generator.state
+        return state
+    
+    def _set_rng_state(self, state: Dict):
+        """Restore RNG states captured by _rng_state()."""
+        random.setstate(state['python'])
+        np.random.set_state(state['numpy'])
+        if 'torch' in state:
+            import torch
+            torch.set_rng_state(state['torch'])
+        if 'agent' in state and isinstance(getattr(self.agent, 'rng', None), np.random.Generator):
+            self.agent.rng.bit_generator.state = state['agent']
+    
+    def latest_checkpoint(self) -> Optional[Path]:
+        """Most recent complete checkpoint in the checkpoint directory, if any."""
+        complete = [p.parent for p in self.checkpoint_dir.glob("checkpoint_*/controller_state.json")]
+        return max(complete, key=lambda p: p.name) if complete else None
+    
+    def resume(self, checkpoint_path: Optional[str] = None) -> bool:
+        """
+        Restore a campaign from a checkpoint before run().
+        
+        Restores the agent (network, optimizer, pending rollout or replay
+        buffer), RNG states, analyzer history and baseline, selector stats
+        and counters; run() then relaunches AFL++ with '-i -' so it resumes
+        from the existing output directory.
+        
+        Args:
+            checkpoint_path: Checkpoint directory (default: latest complete one)
+            
+        Returns:
+            True if a checkpoint was restored
+        """
+        path = Path(checkpoint_path) if checkpoint_path else self.latest_checkpoint()
+        if path is None or not (path / "controller_state.json").exists():
+            logger.warning(f"No complete checkpoint to resume from in {self.checkpoint_dir}")
+            return False
+        
+        with open(path / "controller_state.json") as f:
+            controller_state = json.load(f)
+        if controller_state.get('algorithm', 'ppo') != self.algorithm:
+            raise ValueError(f"Checkpoint {path} was written by a {controller_state['algorithm']} agent")
+        
+        if not self.actor_only and (path / "agent.pt").exists():
+            if self.algorithm == 'ppo':
+                self.agent.load(str(path / "agent.pt"), variant=self.agent.inference_variant)
+            else:
+                self.agent.load(str(path / "agent.pt"))
+            if self.algorithm == 'ppo' and (path / "rollout.npz").exists():
+                self.agent.buffer.load(str(path / "rollout.npz"))
+        
+        self.feedback_analyzer.load_state(str(path / "analyzer_state.json"))
+        self.mutation_selector.load_state(str(path / "selector_state.json"))
+        with open(path / "rng_state.pkl", 'rb') as f:
+            self._set_rng_state(pickle.load(f))
+        training_stats_file = path / "training_stats.json"
+        if training_stats_file.exists():
+            with open(training_stats_file) as f:
+                self.training_stats = json.load(f)
+        
+        self.resumed_elapsed = controller_state['elapsed_time']
+        self.episodes = controller_state['episodes']
+        self.total_updates = controller_state['total_updates']
+        self.resumed = True
+        
+        logger.info(f"Resumed from {path} ({self.resumed_elapsed/3600:.2f} hours, "
+                   f"{self.total_updates} updates)")
+        return True
+    
     def run(self):
         """
         Main training loop: run AFL++ with PPO optimization.
@@ -289,9 +541,11 @@ class FuzzingController:
             logger.error("Failed to start fuzzer")
             return
         
-        self.start_time = time.time()
-        last_update = self.start_time
-        last_checkpoint = self.start_time
+        # Elapsed time includes the campaign time before a resume
+        self.start_time = time.time() - self.resumed_elapsed
+        self.resumed_elapsed = 0.0
+        last_update = time.time()
+        last_checkpoint = last_update
         
         try:
             while self.running:
@@ -341,6 +595,10 @@ class FuzzingController:
             
             # Print final summary
             self.print_summary()
+            self.feedback_analyzer.close()
+            if self.mutator_control is not None:
+                self.mutator_control.close()
+                self.mutator_control = None
     
     def print_summary(self):
         """Print final summary of the fuzzing session."""
@@ -384,6 +642,13 @@ def main():
     parser.add_argument('--config', '-c', help='Configuration file (YAML/JSON)')
     parser.add_argument('--duration', '-d', type=float, default=8.0, help='Duration in hours')
     parser.add_argument('--update-interval', '-u', type=int, default=300, help='Update interval in seconds')
+    parser.add_argument('--policy-server', help='Unix socket of a shared policy server (act only, no local training)')
+    parser.add_argument('--policy-snapshot', help='NumPy policy snapshot (.npz) to act with, without torch')
+    parser.add_argument('--learner', help='Unix socket of a distributed PPO learner to stream trajectories to')
+    parser.add_argument('--pretrained', help='Agent checkpoint to start from (e.g. from replay_simulator.py)')
+    parser.add_argument('--resume', nargs='?', const='latest', default=None,
+                        help='Resume from a checkpoint directory (default: latest in the output dir)')
+    parser.add_argument('--policy-library', help='Policy library directory for warm starts (see policy_library.py)')
     
     args = parser.parse_args()
     
@@ -401,6 +666,17 @@ def main():
             loaded_config = yaml.safe_load(f)
             config.update(loaded_config)
     
+    if args.policy_server:
+        config.setdefault('ppo', {})['policy_server'] = args.policy_server
+    if args.policy_snapshot:
+        config.setdefault('ppo', {})['policy_snapshot'] = args.policy_snapshot
+    if args.learner:
+        config.setdefault('ppo', {})['learner'] = args.learner
+    if args.pretrained:
+        config.setdefault('ppo', {})['pretrained'] = args.pretrained
+    if args.policy_library:
+        config.setdefault('ppo', {})['policy_library'] = args.policy_library
+    
     # Create controller
     controller = FuzzingController(
         binary_path=args.binary,
@@ -409,6 +685,9 @@ def main():
         config=config
     )
     
+    if args.resume:
+        controller.resume(None if args.resume == 'latest' else args.resume)
+    
     # Run fuzzing
     controller.run()
 
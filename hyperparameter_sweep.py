@@ -0,0 +1,418 @@
+"""
+Hyperparameter Sweep / Population-Based Training
+Evaluates many PPOAgent configurations in parallel worker processes (one
+per core, pinned) against recorded traces via ReplaySimulator, or against
+short live FuzzingController campaigns. With more than one generation the
+population is evolved with PBT: after each generation the worst members
+copy weights and hyperparameters from the best (exploit) and perturb them
+(explore). Writes a ranked results table and the best configuration, both
+as a FuzzingController 'ppo' section and as complete_framework1_fixed.py
+Config keys.
+"""
+
+import os
+import json
+import shutil
+import multiprocessing as mp
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# name: ('log', low, high) | ('linear', low, high) | ('choice', [values])
+SEARCH_SPACE = {
+    'learning_rate': ('log', 1e-5, 1e-2),
+    'gamma': ('linear', 0.9, 0.999),
+    'gae_lambda': ('linear', 0.8, 0.99),
+    'clip_epsilon': ('linear', 0.05, 0.4),
+    'entropy_coef': ('log', 1e-4, 5e-2),
+    'batch_size': ('choice', [64, 128, 256, 512, 1024]),
+    'n_epochs': ('choice', [2, 4, 8, 10, 16]),
+}
+
+# Sweep parameter -> complete_framework1_fixed.py Config.DEFAULTS key
+FRAMEWORK_KEYS = {
+    'learning_rate': 'ppo_learning_rate',
+    'batch_size': 'ppo_batch_size',
+    'n_epochs': 'ppo_epochs',
+}
+
+# Trial settings handed to each worker once (by _init_worker) instead of with every task
+WORKER_KWARGS = ('traces', 'strategy_response')
+
+
+def sample_params(rng: np.random.Generator) -> Dict:
+    """Draw one configuration from SEARCH_SPACE."""
+    params = {}
+    for name, (kind, *spec) in SEARCH_SPACE.items():
+        if kind == 'log':
+            params[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+        elif kind == 'linear':
+            params[name] = float(rng.uniform(spec[0], spec[1]))
+        else:
+            params[name] = spec[0][rng.integers(len(spec[0]))]
+    return params
+
+
+def perturb_params(params: Dict, rng: np.random.Generator, factor: float = 1.2,
+                   resample_prob: float = 0.25) -> Dict:
+    """
+    PBT explore step: scale numeric parameters by factor or 1/factor (clipped
+    to the search space) and move choices to a neighbouring value.
+    """
+    perturbed = dict(params)
+    for name, (kind, *spec) in SEARCH_SPACE.items():
+        if kind == 'choice':
+            values = spec[0]
+            if rng.random() < resample_prob:
+                i = values.index(params[name]) + rng.choice([-1, 1])
+                perturbed[name] = values[int(np.clip(i, 0, len(values) - 1))]
+        elif name == 'gamma':
+            # Perturb the horizon 1/(1-gamma) rather than gamma itself
+            scale = factor if rng.random() < 0.5 else 1 / factor
+            perturbed[name] = float(np.clip(1 - (1 - params[name]) * scale, spec[0], spec[1]))
+        else:
+            scale = factor if rng.random() < 0.5 else 1 / factor
+            perturbed[name] = float(np.clip(params[name] * scale, spec[0], spec[1]))
+    return perturbed
+
+
+def to_framework_config(params: Dict) -> Dict:
+    """Map sweep parameters to complete_framework1_fixed.py Config keys."""
+    return {FRAMEWORK_KEYS[k]: v for k, v in params.items() if k in FRAMEWORK_KEYS}
+
+
+# Per-worker state set by _init_worker
+_worker = {}
+
+
+def _init_worker(cores, traces, strategy_response):
+    """Pin the worker to a free core and keep the traces for all of its trials."""
+    core = cores.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {core})
+
+    import torch
+    torch.set_num_threads(1)
+
+    _worker.update(core=core, traces=traces, strategy_response=strategy_response)
+
+
+def _run_trace_trial(task: Dict) -> float:
+    """Train on the replay simulator (continuing from a checkpoint) and score greedily."""
+    from ppo_agent import PPOAgent
+    from replay_simulator import ReplaySimulator, pretrain, evaluate_policy
+
+    params = task['params']
+    traces, response = _worker['traces'], _worker['strategy_response']
+
+    simulator = ReplaySimulator(traces, response, n_envs=task['n_envs'], seed=task['seed'])
+    agent = PPOAgent(
+        state_dim=10,
+        action_dim=simulator.num_actions,
+        learning_rate=params['learning_rate'],
+        gamma=params['gamma'],
+        gae_lambda=params['gae_lambda'],
+        clip_epsilon=params['clip_epsilon'],
+        entropy_coef=params['entropy_coef'],
+        device='cpu',
+        n_envs=task['n_envs'],
+        buffer_size=task['rollout_length'],
+    )
+    if task.get('checkpoint'):
+        agent.load(task['checkpoint'])
+        for group in agent.optimizer.param_groups:
+            group['lr'] = params['learning_rate']
+
+    pretrain(agent, simulator, task['steps'], rollout_length=task['rollout_length'],
+             n_epochs=params['n_epochs'], batch_size=params['batch_size'])
+    agent.save(task['save_to'])
+
+    return evaluate_policy(agent.network, traces, response, steps=task['eval_steps'])
+
+
+def _run_live_trial(task: Dict) -> float:
+    """Run a short FuzzingController campaign and score it by final coverage."""
+    from fuzzing_controller import FuzzingController
+
+    ppo_config = dict(task['params'])
+    if task.get('checkpoint'):
+        ppo_config['pretrained'] = task['checkpoint']
+
+    output_dir = Path(task['output_dir'])
+    controller = FuzzingController(
+        binary_path=task['binary'],
+        input_dir=task['input_dir'],
+        output_dir=str(output_dir),
+        config={
+            'ppo': ppo_config,
+            'experiment': {
+                'duration_hours': task['minutes'] / 60.0,
+                'update_interval': task['update_interval'],
+                'checkpoint_interval': task['minutes'] * 60 + 1,
+            },
+        },
+        afl_args=['-b', str(_worker['core'])]  # Bind AFL++ to the worker's core
+    )
+    controller.run()
+
+    checkpoints = sorted((output_dir / "checkpoints").glob("*_final/agent.pt"))
+    if checkpoints:
+        shutil.copyfile(checkpoints[-1], task['save_to'])
+
+    metrics = controller.feedback_analyzer.get_current_metrics()
+    return metrics.coverage if metrics else 0.0
+
+
+def run_trial(task: Dict) -> Dict:
+    """
+    Worker entry point: train and score one population member for one generation.
+
+    Args:
+        task: Trial description (see PopulationSweep._tasks)
+
+    Returns:
+        The task's identifying fields plus 'score' (None if the trial failed),
+        'failed' and 'core'
+    """
+    try:
+        if task['mode'] == 'live':
+            score = _run_live_trial(task)
+        else:
+            score = _run_trace_trial(task)
+    except Exception as e:
+        logger.error(f"Trial {task['member']} (generation {task['generation']}) failed: {e}", exc_info=True)
+        score = None
+    if score is not None and not np.isfinite(score):
+        logger.error(f"Trial {task['member']} (generation {task['generation']}) scored {score}")
+        score = None
+
+    return {
+        'member': task['member'],
+        'generation': task['generation'],
+        'params': task['params'],
+        'score': score,
+        'failed': score is None,
+        'core': _worker.get('core'),
+    }
+
+
+def _rank_key(result: Dict) -> float:
+    """Sort key of a trial result; failed trials rank last."""
+    return float('-inf') if result['failed'] else result['score']
+
+
+class PopulationSweep:
+    """
+    Random search (one generation) or population-based training (several).
+
+    Each member keeps an agent checkpoint in work_dir across generations, so
+    under PBT training continues from the inherited weights.
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        population_size: int = 16,
+        n_workers: Optional[int] = None,
+        exploit_fraction: float = 0.25,
+        seed: Optional[int] = None,
+        mode: str = 'traces',
+        **trial_kwargs
+    ):
+        """
+        Initialize the sweep.
+
+        Args:
+            work_dir: Directory for checkpoints and results
+            population_size: Number of configurations evaluated per generation
+            n_workers: Worker processes (default: one per available core)
+            exploit_fraction: Fraction of the population replaced by PBT each generation
+            seed: Seed for sampling and perturbation
+            mode: 'traces' (replay simulator) or 'live' (FuzzingController campaigns)
+            **trial_kwargs: Per-trial settings passed to the workers
+                (traces: steps, n_envs, rollout_length, eval_steps;
+                live: binary, input_dir, minutes, update_interval)
+        """
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.population_size = population_size
+        self.cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+        self.n_workers = min(n_workers or len(self.cores), len(self.cores), population_size)
+        self.exploit_fraction = exploit_fraction
+        self.rng = np.random.default_rng(seed)
+        self.mode = mode
+        self.trial_kwargs = trial_kwargs
+
+        self.population = [sample_params(self.rng) for _ in range(population_size)]
+        self.has_checkpoint = [False] * population_size
+        self.lineage = [[i] for i in range(population_size)]
+        self.history: List[Dict] = []
+
+    def _checkpoint(self, member: int) -> str:
+        return str(self.work_dir / f"member_{member}.pt")
+
+    def _tasks(self, generation: int) -> List[Dict]:
+        tasks = []
+        for member, params in enumerate(self.population):
+            task = {
+                'mode': self.mode,
+                'member': member,
+                'generation': generation,
+                'params': params,
+                'checkpoint': self._checkpoint(member) if self.has_checkpoint[member] else None,
+                'save_to': self._checkpoint(member),
+                'seed': int(self.rng.integers(2**31)),
+                'output_dir': str(self.work_dir / f"gen{generation}_member{member}"),
+            }
+            task.update((k, v) for k, v in self.trial_kwargs.items() if k not in WORKER_KWARGS)
+            tasks.append(task)
+        return tasks
+
+    def _exploit_explore(self, results: List[Dict]):
+        """Replace the worst members with perturbed copies of the best."""
+        ranked = sorted(results, key=_rank_key, reverse=True)
+        n_replace = max(int(len(ranked) * self.exploit_fraction), 1)
+        top, bottom = ranked[:n_replace], ranked[-n_replace:]
+
+        for loser in bottom:
+            winner = top[self.rng.integers(len(top))]
+            src, dst = winner['member'], loser['member']
+            if src == dst:
+                continue
+            if os.path.exists(self._checkpoint(src)):
+                shutil.copyfile(self._checkpoint(src), self._checkpoint(dst))
+                self.has_checkpoint[dst] = True
+            self.population[dst] = perturb_params(self.population[src], self.rng)
+            self.lineage[dst] = self.lineage[src] + [dst]
+            logger.info(f"PBT: member {dst} ({_rank_key(loser):.4f}) <- member {src} ({_rank_key(winner):.4f})")
+
+    def run(self, generations: int = 1) -> List[Dict]:
+        """
+        Run the sweep.
+
+        Args:
+            generations: Number of generations (1 = plain random search)
+
+        Returns:
+            Results of the final generation, ranked best first
+        """
+        ctx = mp.get_context('spawn')
+        cores = ctx.Queue()
+        for core in self.cores[:self.n_workers]:
+            cores.put(core)
+
+        init_args = (cores, *(self.trial_kwargs.get(k) for k in WORKER_KWARGS))
+        logger.info(f"Sweep: population {self.population_size}, {generations} generation(s), "
+                   f"{self.n_workers} workers on cores {self.cores[:self.n_workers]}")
+
+        with ctx.Pool(self.n_workers, initializer=_init_worker, initargs=init_args) as pool:
+            for generation in range(generations):
+                results = pool.map(run_trial, self._tasks(generation), chunksize=1)
+                for r in results:
+                    r['lineage'] = list(self.lineage[r['member']])
+                    self.has_checkpoint[r['member']] = os.path.exists(self._checkpoint(r['member']))
+                self.history.extend(results)
+
+                best = max(results, key=_rank_key)
+                logger.info(f"Generation {generation}: best score {_rank_key(best):.4f} (member {best['member']})")
+
+                if generation < generations - 1:
+                    self._exploit_explore(results)
+
+        ranked = sorted(results, key=_rank_key, reverse=True)
+        self.write_results(ranked)
+        return ranked
+
+    def write_results(self, ranked: List[Dict]):
+        """Write the ranked table, the full history and the best configuration."""
+        names = list(SEARCH_SPACE)
+        header = f"{'rank':>4} {'member':>6} {'score':>10} " + " ".join(f"{n:>13}" for n in names)
+        lines = [header]
+        for rank, r in enumerate(ranked, 1):
+            values = " ".join(
+                f"{r['params'][n]:>13.3g}" if isinstance(r['params'][n], float) else f"{r['params'][n]:>13}"
+                for n in names
+            )
+            score = 'failed' if r['failed'] else f"{r['score']:.4f}"
+            lines.append(f"{rank:>4} {r['member']:>6} {score:>10} {values}")
+        table = "\n".join(lines)
+
+        (self.work_dir / "sweep_results.txt").write_text(table + "\n")
+        with open(self.work_dir / "sweep_history.json", 'w') as f:
+            json.dump(self.history, f, indent=2, allow_nan=False)
+
+        best = ranked[0]
+        with open(self.work_dir / "best_config.json", 'w') as f:
+            json.dump({
+                'score': best['score'],
+                'failed': best['failed'],
+                'ppo': best['params'],
+                'framework': to_framework_config(best['params']),
+            }, f, indent=2, allow_nan=False)
+        if os.path.exists(self._checkpoint(best['member'])):
+            shutil.copyfile(self._checkpoint(best['member']), self.work_dir / "best_agent.pt")
+
+        print(table)
+        logger.info(f"Results written to {self.work_dir}")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parallel PPO hyperparameter sweep / population-based training')
+    parser.add_argument('--work-dir', '-o', default='sweep', help='Output directory')
+    parser.add_argument('--population', type=int, default=16, help='Configurations per generation')
+    parser.add_argument('--generations', type=int, default=1, help='Generations (>1 enables PBT)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    traces_parser = subparsers.add_parser('traces', help='Train and score on the replay simulator')
+    traces_parser.add_argument('traces', nargs='+', help='plot_data / metrics_history.json / metrics_log.bin files or directories')
+    traces_parser.add_argument('--strategy-stats', nargs='*', default=[], help='Checkpoint strategy_stats.json files')
+    traces_parser.add_argument('--steps', type=int, default=200_000, help='Simulated steps per member and generation')
+    traces_parser.add_argument('--envs', type=int, default=64, help='Simulated instances per member')
+    traces_parser.add_argument('--rollout-length', type=int, default=64, help='Time steps per PPO update')
+    traces_parser.add_argument('--eval-steps', type=int, default=50, help='Greedy evaluation steps')
+    traces_parser.add_argument('--interval', type=float, default=300.0, help='Seconds between metrics_history samples')
+
+    live_parser = subparsers.add_parser('live', help='Score by short FuzzingController campaigns')
+    live_parser.add_argument('binary', help='Path to target binary')
+    live_parser.add_argument('--input', '-i', required=True, help='Input corpus directory')
+    live_parser.add_argument('--minutes', type=float, default=30.0, help='Campaign length per member and generation')
+    live_parser.add_argument('--update-interval', type=int, default=60, help='Controller update interval in seconds')
+
+    args = parser.parse_args()
+
+    if args.mode == 'traces':
+        from replay_simulator import load_traces, load_strategy_response
+        trial_kwargs = {
+            'traces': load_traces(args.traces, args.interval),
+            'strategy_response': load_strategy_response(args.strategy_stats),
+            'steps': args.steps,
+            'n_envs': args.envs,
+            'rollout_length': args.rollout_length,
+            'eval_steps': args.eval_steps,
+        }
+    else:
+        trial_kwargs = {
+            'binary': str(Path(args.binary).resolve()),
+            'input_dir': str(Path(args.input).resolve()),
+            'minutes': args.minutes,
+            'update_interval': args.update_interval,
+        }
+
+    sweep = PopulationSweep(args.work_dir, population_size=args.population, n_workers=args.workers,
+                            seed=args.seed, mode=args.mode, **trial_kwargs)
+    sweep.run(args.generations)
+
+
+if __name__ == "__main__":
+    main()
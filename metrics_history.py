@@ -0,0 +1,231 @@
+"""
+Columnar Metrics History
+Time-indexed store for FuzzingMetrics samples: one fixed-width float64 column
+per metric plus a timestamp column, kept in a mirrored ring buffer so appends
+are O(1) and any window of recent samples is a contiguous view (no copies).
+Samples can also be streamed to an append-only binary file that
+load_history_file() memory-maps as a NumPy record array.
+"""
+
+import os
+import json
+import struct
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Columns of the store, in file order
+HISTORY_FIELDS = ('timestamp', 'coverage', 'unique_crashes', 'unique_hangs', 'total_execs',
+                  'execs_per_sec', 'paths_total', 'paths_found', 'pending_favs', 'pending_total',
+                  'bitmap_cvg', 'stability', 'cycles_done')
+
+# Binary file layout: magic, header length, JSON header, padding to 8 bytes, float64 records
+HISTORY_MAGIC = b'FZMHIST1'
+_HEADER_LEN = struct.Struct('<I')
+
+
+def history_dtype(fields=HISTORY_FIELDS) -> np.dtype:
+    """Record dtype of one sample in the binary history format."""
+    return np.dtype([(name, '<f8') for name in fields])
+
+
+def _encode_header(fields) -> bytes:
+    header = json.dumps({'fields': list(fields)}).encode()
+    header += b' ' * (-(len(HISTORY_MAGIC) + _HEADER_LEN.size + len(header)) % 8)
+    return HISTORY_MAGIC + _HEADER_LEN.pack(len(header)) + header
+
+
+def _read_header(f) -> Optional[tuple]:
+    """Return (fields, data offset) of a binary history file, or None if it is not one."""
+    if f.read(len(HISTORY_MAGIC)) != HISTORY_MAGIC:
+        return None
+    (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+    header = json.loads(f.read(length))
+    return tuple(header['fields']), len(HISTORY_MAGIC) + _HEADER_LEN.size + length
+
+
+def is_history_file(filepath: Union[str, Path]) -> bool:
+    """Whether a file is in the binary history format."""
+    with open(filepath, 'rb') as f:
+        return f.read(len(HISTORY_MAGIC)) == HISTORY_MAGIC
+
+
+def load_history_file(filepath: Union[str, Path]) -> np.ndarray:
+    """
+    Memory-map a binary history file.
+
+    A record torn by a crash mid-append at the end of the file is ignored.
+
+    Args:
+        filepath: File written by MetricsHistory.save or a MetricsHistory log
+
+    Returns:
+        Read-only record array of shape [N] with one field per column
+    """
+    with open(filepath, 'rb') as f:
+        header = _read_header(f)
+    if header is None:
+        raise ValueError(f"{filepath} is not a metrics history file")
+
+    fields, offset = header
+    dtype = history_dtype(fields)
+    n_records = (os.path.getsize(filepath) - offset) // dtype.itemsize
+    if n_records == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(filepath, dtype=dtype, mode='r', offset=offset, shape=(n_records,))
+
+
+class MetricsHistory:
+    """
+    Ring buffer of metric samples, stored column-wise.
+
+    Every sample is written twice, at i and i + capacity, so the newest n
+    samples (n <= capacity) always form one contiguous slice. Indexing
+    (history[-1]) returns a sample object for code that works per sample;
+    window(), since() and column() return read-only views.
+    """
+
+    def __init__(self, capacity: int, sample_type: Optional[Callable[[], Any]] = None,
+                 log_file: Optional[Union[str, Path]] = None):
+        """
+        Initialize the history.
+
+        Args:
+            capacity: Number of samples kept in memory
+            sample_type: Class instantiated by indexing (FuzzingMetrics); a dict if None
+            log_file: Optional append-only binary file receiving every sample
+        """
+        self.capacity = capacity
+        self.fields = HISTORY_FIELDS
+        self.sample_type = sample_type
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._data = np.zeros((len(self.fields), 2 * capacity))
+        self._pos = 0
+        self._count = 0
+
+        self._log = None
+        if log_file is not None:
+            self._open_log(Path(log_file))
+
+    def _open_log(self, path: Path):
+        if path.exists() and path.stat().st_size > 0:
+            with open(path, 'rb') as f:
+                header = _read_header(f)
+            if header is None or header[0] != self.fields:
+                raise ValueError(f"{path} has a different history format")
+            # Drop a torn trailing record so appends stay aligned
+            offset = header[1]
+            record_size = 8 * len(self.fields)
+            aligned = offset + (path.stat().st_size - offset) // record_size * record_size
+            if aligned != path.stat().st_size:
+                os.truncate(path, aligned)
+            self._log = open(path, 'ab')
+        else:
+            self._log = open(path, 'wb')
+            self._log.write(_encode_header(self.fields))
+            self._log.flush()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, sample, timestamp: Optional[float] = None, log: bool = True):
+        """
+        Add a sample (O(1); the oldest sample is dropped when full).
+
+        Args:
+            sample: Object with the HISTORY_FIELDS metric attributes (e.g. FuzzingMetrics)
+            timestamp: Sample time; defaults to sample.timestamp, or now if that is unset
+            log: Also write the sample to the log file (False when restoring samples)
+        """
+        if timestamp is None:
+            timestamp = getattr(sample, 'timestamp', 0.0) or time.time()
+        values = [timestamp] + [getattr(sample, name) for name in self.fields[1:]]
+        self.append_values(values, log)
+
+    def append_values(self, values, log: bool = True):
+        """Add one sample given as a sequence of HISTORY_FIELDS values."""
+        self._data[:, self._pos] = values
+        self._data[:, self._pos + self.capacity] = values
+        self._pos = (self._pos + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+        if log and self._log is not None:
+            self._log.write(np.asarray(values, dtype='<f8').tobytes())
+            self._log.flush()
+
+    def clear(self):
+        """Drop all in-memory samples (the log file is left untouched)."""
+        self._pos = 0
+        self._count = 0
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        The newest n samples (all if None), oldest first.
+
+        Returns:
+            Read-only view of shape [len(HISTORY_FIELDS), n]
+        """
+        n = self._count if n is None else min(n, self._count)
+        end = self._pos + self.capacity
+        view = self._data[:, end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def since(self, seconds: float) -> np.ndarray:
+        """Samples from the last `seconds` seconds (view, like window())."""
+        view = self.window()
+        if view.shape[1] == 0:
+            return view
+        timestamps = view[0]
+        start = np.searchsorted(timestamps, timestamps[-1] - seconds, side='left')
+        return view[:, start:]
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of one metric over the newest n samples."""
+        return self.window(n)[self._index[name]]
+
+    def __getitem__(self, i: int):
+        if not -self._count <= i < self._count:
+            raise IndexError("metrics history index out of range")
+        values = self.window()[:, i]
+        if self.sample_type is None:
+            return dict(zip(self.fields, values.tolist()))
+        sample = self.sample_type()
+        for name, value in zip(self.fields, values.tolist()):
+            # Counters come back as ints if the sample type defaults them to ints
+            setattr(sample, name, int(value) if type(getattr(sample, name, None)) is int else value)
+        return sample
+
+    def to_dicts(self) -> List[Dict[str, float]]:
+        """All in-memory samples as dictionaries, oldest first."""
+        window = self.window()
+        return [dict(zip(self.fields, window[:, i].tolist())) for i in range(window.shape[1])]
+
+    def save(self, filepath: Union[str, Path]):
+        """Write the in-memory samples to a binary history file (atomically)."""
+        records = np.ascontiguousarray(self.window().T).astype('<f8')
+        tmp_file = f"{filepath}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_encode_header(self.fields))
+            f.write(records.tobytes())
+        os.replace(tmp_file, filepath)
+
+    def load(self, filepath: Union[str, Path]):
+        """Replace the in-memory samples with the newest ones of a binary history file."""
+        records = load_history_file(filepath)
+        self.clear()
+        for record in records[-self.capacity:]:
+            self.append_values([float(record[name]) if name in records.dtype.names else 0.0
+                                for name in self.fields], log=False)
+
+    def close(self):
+        """Close the log file."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
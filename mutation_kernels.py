@@ -0,0 +1,250 @@
+"""
+Vectorized Mutation Kernels
+NumPy implementations of the AFL++ mutation operators behind each
+MutationStrategy: bit and byte flips, arithmetic, interesting values,
+stacked havoc and splicing. Every kernel applies n mutations at once to a
+uint8 array (np.frombuffer of the input) with index arithmetic and
+ufunc.at scatters instead of per-byte Python loops, drawing all random
+numbers from one reusable Generator.
+"""
+
+from functools import partial
+from typing import Optional
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# AFL++ constants (config.h)
+ARITH_MAX = 35
+HAVOC_BLK_SMALL = 32
+HAVOC_BLK_MEDIUM = 128
+HAVOC_BLK_LARGE = 1500
+HAVOC_STACK_POW2 = 7
+
+# Interesting values (interesting_8/16/32 in AFL++'s config.h), per word width in bytes
+INTERESTING_8 = np.array([-128, -1, 0, 1, 16, 32, 64, 100, 127], dtype=np.int64)
+INTERESTING_16 = np.concatenate([INTERESTING_8, [-32768, -129, 128, 255, 256, 512, 1000, 1024, 4096, 32767]])
+INTERESTING_32 = np.concatenate([INTERESTING_16, [-2147483648, -100663046, -32769, 32768, 65535, 65536,
+                                                  100663045, 2147483647]])
+INTERESTING = {1: INTERESTING_8, 2: INTERESTING_16, 4: INTERESTING_32}
+
+WIDTHS = (1, 2, 4)
+
+
+def as_buffer(data) -> np.ndarray:
+    """Writable uint8 copy of bytes / bytearray / memoryview input."""
+    return np.frombuffer(data, dtype=np.uint8).copy()
+
+
+def _width(rng: np.random.Generator, width: Optional[int], limit: int) -> int:
+    """The given width, or a random one of WIDTHS no larger than limit."""
+    if width is not None:
+        return width
+    fitting = [w for w in WIDTHS if w <= limit] or [WIDTHS[0]]
+    return fitting[rng.integers(len(fitting))]
+
+
+def _word_offsets(width: int, big_endian: np.ndarray) -> np.ndarray:
+    """Bit shift of each byte of an n x width word matrix (per-row endianness)."""
+    shifts = 8 * np.arange(width, dtype=np.int64)
+    return np.where(big_endian[:, None], shifts[::-1], shifts)
+
+
+# Positional operators: mutation i at buf[idx[i]] (bit index for xor_bits).
+# The random kernels below and the deterministic stages share them.
+
+def xor_bits(buf: np.ndarray, bits: np.ndarray, width: int):
+    """Flip the width bits starting at each bit index in bits."""
+    bits = (bits[:, None] + np.arange(width)).ravel()
+    np.bitwise_xor.at(buf, bits >> 3, (128 >> (bits & 7)).astype(np.uint8))
+
+
+def xor_bytes(buf: np.ndarray, idx: np.ndarray, width: int):
+    """Invert the width bytes starting at each index in idx."""
+    np.bitwise_xor.at(buf, (idx[:, None] + np.arange(width)).ravel(), np.uint8(0xff))
+
+
+def set_words(buf: np.ndarray, idx: np.ndarray, values: np.ndarray, width: int, big_endian: np.ndarray):
+    """Write width-byte words (truncated to width) at each index in idx."""
+    positions = idx[:, None] + np.arange(width)
+    buf[positions] = (values[:, None] >> _word_offsets(width, big_endian)) & 0xff
+
+
+def read_words(buf: np.ndarray, idx: np.ndarray, width: int, big_endian: np.ndarray) -> np.ndarray:
+    """Unsigned value of the width-byte word at each index in idx."""
+    words = buf[idx[:, None] + np.arange(width)].astype(np.int64)
+    return (words << _word_offsets(width, big_endian)).sum(axis=1)
+
+
+def add_words(buf: np.ndarray, idx: np.ndarray, delta: np.ndarray, width: int, big_endian: np.ndarray):
+    """
+    Add delta (mod 2**(8 * width)) to the width-byte word at each index in idx.
+
+    All words are read before any is written back, so where two of them
+    overlap the later write wins.
+    """
+    set_words(buf, idx, read_words(buf, idx, width, big_endian) + delta, width, big_endian)
+
+
+def _endianness(rng: np.random.Generator, n: int, width: int) -> np.ndarray:
+    return rng.random(n) < 0.5 if width > 1 else np.zeros(n, dtype=bool)
+
+
+def flip_bits(buf: np.ndarray, rng: np.random.Generator, n: int = 1, width: Optional[int] = None,
+              max_size: int = 0) -> np.ndarray:
+    """Flip n runs of 1, 2 or 4 consecutive bits (AFL++ bitflip 1/1, 2/1, 4/1)."""
+    n_bits = buf.size * 8
+    width = _width(rng, width, n_bits)
+    if n_bits < width:
+        return buf
+    xor_bits(buf, rng.integers(0, n_bits - width + 1, n), width)
+    return buf
+
+
+def flip_bytes(buf: np.ndarray, rng: np.random.Generator, n: int = 1, width: Optional[int] = None,
+               max_size: int = 0) -> np.ndarray:
+    """Invert n runs of 1, 2 or 4 bytes (AFL++ bitflip 8/8, 16/8, 32/8)."""
+    width = _width(rng, width, buf.size)
+    if buf.size < width:
+        return buf
+    xor_bytes(buf, rng.integers(0, buf.size - width + 1, n), width)
+    return buf
+
+
+def arith(buf: np.ndarray, rng: np.random.Generator, n: int = 1, width: Optional[int] = None,
+          max_size: int = 0) -> np.ndarray:
+    """Add or subtract 1..ARITH_MAX to n 8/16/32-bit words of random endianness."""
+    width = _width(rng, width, buf.size)
+    if buf.size < width:
+        return buf
+    idx = rng.integers(0, buf.size - width + 1, n)
+    delta = rng.integers(1, ARITH_MAX + 1, n) * np.where(rng.random(n) < 0.5, -1, 1)
+    add_words(buf, idx, delta, width, _endianness(rng, n, width))
+    return buf
+
+
+def interesting(buf: np.ndarray, rng: np.random.Generator, n: int = 1, width: Optional[int] = None,
+                max_size: int = 0) -> np.ndarray:
+    """Overwrite n 8/16/32-bit words with interesting values of random endianness."""
+    width = _width(rng, width, buf.size)
+    if buf.size < width:
+        return buf
+    idx = rng.integers(0, buf.size - width + 1, n)
+    values = INTERESTING[width][rng.integers(0, len(INTERESTING[width]), n)]
+    set_words(buf, idx, values, width, _endianness(rng, n, width))
+    return buf
+
+
+def random_bytes(buf: np.ndarray, rng: np.random.Generator, n: int = 1, max_size: int = 0) -> np.ndarray:
+    """XOR n random bytes with a random non-zero value."""
+    if buf.size == 0:
+        return buf
+    np.bitwise_xor.at(buf, rng.integers(0, buf.size, n), rng.integers(1, 256, n, dtype=np.uint8))
+    return buf
+
+
+def choose_block_len(rng: np.random.Generator, limit: int) -> int:
+    """Block length for havoc's block operations (AFL++ choose_block_len, at most limit)."""
+    low, high = ((1, HAVOC_BLK_SMALL), (HAVOC_BLK_SMALL, HAVOC_BLK_MEDIUM),
+                 (HAVOC_BLK_MEDIUM, HAVOC_BLK_LARGE))[rng.integers(3)]
+    if low >= limit:
+        low = 1
+    return int(rng.integers(low, min(high, limit) + 1))
+
+
+def delete_blocks(buf: np.ndarray, rng: np.random.Generator, n: int = 1, max_size: int = 0) -> np.ndarray:
+    """Delete n blocks (never the whole input)."""
+    for _ in range(n):
+        if buf.size < 2:
+            break
+        length = choose_block_len(rng, buf.size - 1)
+        start = int(rng.integers(0, buf.size - length + 1))
+        buf = np.concatenate([buf[:start], buf[start + length:]])
+    return buf
+
+
+def insert_blocks(buf: np.ndarray, rng: np.random.Generator, n: int = 1, max_size: int = 0) -> np.ndarray:
+    """Insert n blocks, cloned from the input (75%) or filled with one byte, up to max_size."""
+    for _ in range(n):
+        clone = buf.size > 0 and rng.random() < 0.75
+        length = choose_block_len(rng, buf.size if clone else HAVOC_BLK_LARGE)
+        if max_size and buf.size + length > max_size:
+            break
+        if clone:
+            src = int(rng.integers(0, buf.size - length + 1))
+            block = buf[src:src + length]
+        else:
+            block = np.full(length, rng.integers(0, 256), dtype=np.uint8)
+        pos = int(rng.integers(0, buf.size + 1))
+        buf = np.concatenate([buf[:pos], block, buf[pos:]])
+    return buf
+
+
+def overwrite_blocks(buf: np.ndarray, rng: np.random.Generator, n: int = 1, max_size: int = 0) -> np.ndarray:
+    """Overwrite n blocks with another part of the input (75%) or one repeated byte."""
+    for _ in range(n):
+        if buf.size < 2:
+            break
+        length = choose_block_len(rng, buf.size - 1)
+        dst = int(rng.integers(0, buf.size - length + 1))
+        if rng.random() < 0.75:
+            src = int(rng.integers(0, buf.size - length + 1))
+            buf[dst:dst + length] = buf[src:src + length].copy()
+        else:
+            buf[dst:dst + length] = rng.integers(0, 256)
+    return buf
+
+
+# Havoc operators, each picked with equal probability per stacked mutation
+HAVOC_OPS = (
+    partial(flip_bits, width=1),
+    partial(interesting, width=1),
+    partial(interesting, width=2),
+    partial(interesting, width=4),
+    partial(arith, width=1),
+    partial(arith, width=2),
+    partial(arith, width=4),
+    random_bytes,
+    partial(flip_bytes, width=1),
+    delete_blocks,
+    delete_blocks,
+    insert_blocks,
+    overwrite_blocks,
+)
+
+
+def havoc(buf: np.ndarray, rng: np.random.Generator, stack_pow: int = HAVOC_STACK_POW2,
+          max_size: int = 0) -> np.ndarray:
+    """
+    Stacked havoc: 2..2**stack_pow random operators applied to one input.
+
+    The number of stacked mutations follows AFL++ (1 << (1 + rand(stack_pow))).
+    Mutations of the same operator are applied in one vectorized call.
+    """
+    stack = 1 << (1 + int(rng.integers(max(stack_pow, 1))))
+    counts = np.bincount(rng.integers(0, len(HAVOC_OPS), stack), minlength=len(HAVOC_OPS))
+    for op in rng.permutation(np.flatnonzero(counts)):
+        buf = HAVOC_OPS[op](buf, rng, n=int(counts[op]), max_size=max_size)
+    return buf
+
+
+def splice(buf: np.ndarray, other, rng: np.random.Generator, stack_pow: int = HAVOC_STACK_POW2,
+           max_size: int = 0) -> np.ndarray:
+    """
+    Splice with another input, then havoc (AFL++ splicing stage).
+
+    The two inputs are joined at a random point between their first and
+    last differing byte; if they do not differ in at least two places the
+    input is only havoc'ed.
+    """
+    if other is not None and buf.size >= 2 and len(other) >= 2:
+        other = np.frombuffer(other, dtype=np.uint8)
+        common = min(buf.size, other.size)
+        diff = np.flatnonzero(buf[:common] != other[:common])
+        if diff.size >= 2:
+            split = int(rng.integers(diff[0], diff[-1]))
+            buf = np.concatenate([buf[:split], other[split:]])
+    return havoc(buf, rng, stack_pow, max_size)
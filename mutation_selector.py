@@ -4,11 +4,19 @@ This module maps PPO agent actions to AFL++ mutation strategies
 and manages the dynamic selection of mutation techniques.
 """
 
+import os
+import json
+import mmap
+import struct
 import numpy as np
 from enum import IntEnum
-from typing import Dict, List, Optional
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
 import logging
 
+import mutation_kernels
+from deterministic_stages import DeterministicStages, seed_id
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -54,6 +62,10 @@ class MutationStrategySelector:
         self.current_strategy = None
         self.strategy_history = []
         
+        # Optional distilled decision tree (see policy_distill.py)
+        self.distilled_policy = None
+        self.policy_action = None
+        
         logger.info(f"Mutation Strategy Selector initialized with {self.num_strategies} strategies")
     
     def get_num_actions(self) -> int:
@@ -85,6 +97,38 @@ class MutationStrategySelector:
         
         return strategy
     
+    def load_distilled_policy(self, filepath: str):
+        """
+        Load a decision tree distilled from a trained agent.
+        
+        Afterwards policy_action(state) returns an action index for a
+        FeedbackAnalyzer state vector in well under a microsecond, for use
+        in per-testcase decisions where network inference is too slow.
+        
+        Args:
+            filepath: .npz file written by policy_distill.py
+        """
+        from policy_distill import DistilledPolicy
+        
+        self.distilled_policy = DistilledPolicy.load(filepath)
+        self.policy_action = self.distilled_policy.act
+        logger.info(f"Distilled policy loaded from {filepath} "
+                   f"({self.distilled_policy.n_nodes} nodes, depth {self.distilled_policy.depth})")
+    
+    def select_strategy_for_state(self, state: np.ndarray) -> MutationStrategy:
+        """
+        Select a mutation strategy with the distilled policy.
+        
+        Args:
+            state: State vector from FeedbackAnalyzer
+            
+        Returns:
+            Selected MutationStrategy
+        """
+        if self.policy_action is None:
+            raise RuntimeError("No distilled policy loaded")
+        return self.select_strategy(self.policy_action(state))
+    
     def get_afl_mutation_config(self, strategy: MutationStrategy) -> Dict:
         """
         Generate AFL++ mutation configuration for the selected strategy.
@@ -288,6 +332,38 @@ class MutationStrategySelector:
         self.strategy_history.clear()
         logger.info("Strategy statistics reset")
     
+    def save_state(self, filepath: str):
+        """
+        Save raw strategy statistics and selection history, for resuming a campaign.
+        
+        Args:
+            filepath: JSON file to write
+        """
+        state = {
+            'strategy_stats': {strategy.name: stats for strategy, stats in self.strategy_stats.items()},
+            'current_strategy': self.current_strategy.name if self.current_strategy is not None else None,
+            'strategy_history': [strategy.name for strategy in self.strategy_history],
+        }
+        with open(filepath, 'w') as f:
+            json.dump(state, f)
+    
+    def load_state(self, filepath: str):
+        """
+        Restore statistics written by save_state().
+        
+        Args:
+            filepath: JSON file to read
+        """
+        with open(filepath) as f:
+            state = json.load(f)
+        
+        for name, stats in state['strategy_stats'].items():
+            self.strategy_stats[MutationStrategy[name]] = dict(stats)
+        current = state.get('current_strategy')
+        self.current_strategy = MutationStrategy[current] if current else None
+        self.strategy_history = [MutationStrategy[name] for name in state.get('strategy_history', [])]
+        logger.info(f"Strategy statistics loaded from {filepath}")
+    
     def get_summary(self) -> str:
         """
         Get a summary of strategy selection and performance.
@@ -317,17 +393,197 @@ class MutationStrategySelector:
         return "\n".join(lines)
 
 
+# Environment variable naming the control block the AFL++ mutator attaches to
+CONTROL_ENV = "FUZZMASTER_MUTATOR_CONTROL"
+
+# Environment variable naming the deterministic stage cursor log of the AFL++ mutator
+CURSOR_ENV = "FUZZMASTER_DETERMINISTIC_CURSORS"
+
+
+class MutatorControl:
+    """
+    Shared-memory control block carrying the current strategy into afl-fuzz.
+    
+    The controller creates the block and publish()es every strategy change;
+    the custom mutator running inside afl-fuzz attaches by name and calls
+    poll() before each mutation, which costs one 8-byte read while nothing
+    changed. Writes are guarded by a seqlock (odd sequence number while the
+    payload is being written); a reader gives up after MAX_SPINS retries, so
+    a writer that died mid-publish cannot hang afl-fuzz.
+    """
+    
+    MAGIC = b'FZMUTCT1'
+    SIZE = 64
+    MAX_SPINS = 256
+    _SEQ = struct.Struct('<Q')          # at offset 8
+    _PAYLOAD = struct.Struct('<IIIIfB')  # at offset 16: strategy, deterministic, havoc_cycles,
+                                         # splice_cycles, splice_probability, havoc_stack_pow
+    
+    def __init__(self, name: Optional[str] = None, create: bool = False):
+        """
+        Create or attach to a control block.
+        
+        Args:
+            name: Shared-memory name (generated when creating without one)
+            create: Create the block (controller side) instead of attaching (mutator side)
+        """
+        self._shm = None
+        self._mmap = None
+        self._seen = 0
+        self._stall_logged = False
+        
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=self.SIZE)
+            self.name = self._shm.name
+            self._buf = self._shm.buf
+            self._buf[:8] = self.MAGIC
+        else:
+            # Mapped directly rather than through SharedMemory, whose resource
+            # tracker would start a helper process inside afl-fuzz
+            self.name = name
+            fd = os.open(os.path.join('/dev/shm', name.lstrip('/')), os.O_RDONLY)
+            try:
+                self._mmap = mmap.mmap(fd, self.SIZE, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+            self._buf = self._mmap
+            if self._buf[:8] != self.MAGIC:
+                self.close()
+                raise ValueError(f"{name} is not a mutator control block")
+    
+    def publish(self, strategy: MutationStrategy, config: Dict):
+        """
+        Make a strategy (and its AFL++ configuration) current.
+        
+        Args:
+            strategy: Strategy chosen by the agent
+            config: MutationStrategySelector.get_afl_mutation_config(strategy)
+        """
+        seq = self._SEQ.unpack_from(self._buf, 8)[0]
+        self._SEQ.pack_into(self._buf, 8, seq + 1)
+        self._PAYLOAD.pack_into(self._buf, 16, int(strategy), bool(config.get('deterministic_mode')),
+                                config.get('havoc_cycles', 0), config.get('splice_cycles', 0),
+                                config.get('splice_probability', 0.0), config.get('havoc_stack_pow', 0))
+        self._SEQ.pack_into(self._buf, 8, seq + 2)
+    
+    def poll(self) -> Optional[Tuple[MutationStrategy, Dict]]:
+        """
+        Read the block if it changed since the last poll.
+        
+        Returns:
+            (strategy, config) after a change, otherwise None (also when no
+            consistent copy could be read; the current strategy is kept)
+        """
+        seq = self._SEQ.unpack_from(self._buf, 8)[0]
+        if seq == self._seen:
+            return None
+        for _ in range(self.MAX_SPINS):
+            if not seq & 1:
+                payload = self._PAYLOAD.unpack_from(self._buf, 16)
+                if self._SEQ.unpack_from(self._buf, 8)[0] == seq:
+                    break
+            seq = self._SEQ.unpack_from(self._buf, 8)[0]
+        else:
+            if not self._stall_logged:
+                logger.debug(f"Control block {self.name} stuck mid-publish (seq {seq}); keeping the current strategy")
+                self._stall_logged = True
+            return None
+        self._seen = seq
+        self._stall_logged = False
+        
+        strategy, deterministic, havoc_cycles, splice_cycles, splice_probability, stack_pow = payload
+        config = {
+            'deterministic_mode': bool(deterministic),
+            'skip_deterministic': not deterministic,
+            'havoc_cycles': havoc_cycles,
+            'splice_cycles': splice_cycles,
+        }
+        if splice_probability:
+            config['splice_probability'] = round(splice_probability, 6)
+        if stack_pow:
+            config['havoc_stack_pow'] = stack_pow
+        return MutationStrategy(strategy), config
+    
+    def close(self):
+        """Detach; the creating side also removes the block."""
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._mmap is not None:
+            self._buf = None
+            self._mmap.close()
+            self._mmap = None
+
+
 # AFL++ Custom Mutator Interface (for integration)
 class AFLCustomMutator:
     """
-    Custom mutator interface for AFL++.
-    This would be loaded as a shared library by AFL++.
+    Custom mutator for AFL++, loaded through afl_mutator.py
+    (AFL_PYTHON_MODULE=afl_mutator).
+    
+    The strategy is set directly with set_strategy(), or follows the
+    MutatorControl block the controller writes, so the agent's choice
+    reaches afl-fuzz without restarting it.
+    
+    fuzz() serves mutants from batches built by mutate_batch(), so the
+    per-testcase Python overhead is spread over up to BATCH_SIZE mutants.
+    
+    Deterministic strategies walk their DeterministicStages group over each
+    seed in order and resume from the seed's cursor, so no deterministic
+    mutation is made twice; a seed whose group is done gets havoc instead.
     """
     
-    def __init__(self):
-        """Initialize the custom mutator."""
+    # Mutants generated per mutate_batch() call from fuzz()
+    BATCH_SIZE = 256
+    
+    # Deterministic fuzz() calls per queue entry visit (the walk resumes on the next visit)
+    DETERMINISTIC_CALLS = 1024
+    
+    # Stage group walked by each deterministic strategy
+    DETERMINISTIC_GROUPS = {
+        MutationStrategy.BITFLIP: 'bitflip',
+        MutationStrategy.BYTEFLIP: 'byteflip',
+        MutationStrategy.ARITHMETIC: 'arith',
+        MutationStrategy.INTERESTING: 'interesting',
+    }
+    
+    def __init__(self, control: Optional[str] = None, seed: Optional[int] = None,
+                 cursor_file: Optional[str] = None):
+        """
+        Initialize the custom mutator.
+        
+        Args:
+            control: Name of a MutatorControl block to follow (optional)
+            seed: Random seed (AFL++ passes its own to init())
+            cursor_file: Deterministic stage cursor log, kept across restarts (optional)
+        """
         self.selector = MutationStrategySelector()
+        self.rng = np.random.default_rng(seed)
+        self.strategy: Optional[MutationStrategy] = None
         self.current_config = None
+        self.stages = DeterministicStages(cursor_file)
+        
+        # Batch output arena: mutant i is arena[offsets[i]:offsets[i] + lengths[i]]
+        self.arena = bytearray()
+        self._arena_array = np.frombuffer(self.arena, dtype=np.uint8)
+        self.offsets = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self._batch: List[memoryview] = []
+        self._batch_next = 0
+        self._batch_source: Optional[Tuple[bytes, int, Optional[MutationStrategy]]] = None
+        self._batch_fill: Optional[tuple] = None
+        self._pending = 0
+        self._out = bytearray()
+        
+        self.control = None
+        if control:
+            try:
+                self.control = MutatorControl(control)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Mutator control block {control} unavailable: {e}")
+        
         logger.info("AFL++ Custom Mutator initialized")
     
     def set_strategy(self, action: int):
@@ -338,45 +594,204 @@ class AFLCustomMutator:
             action: Action from PPO agent
         """
         strategy = self.selector.select_strategy(action)
+        self.strategy = strategy
         self.current_config = self.selector.get_afl_mutation_config(strategy)
         logger.info(f"Mutation strategy set to: {strategy.name}")
     
-    def mutate(self, data: bytes, max_size: int) -> bytes:
+    def sync(self) -> bool:
+        """Pick up a strategy change from the control block; returns True if it changed."""
+        if self.control is None:
+            return False
+        update = self.control.poll()
+        if update is None:
+            return False
+        # The block carries the numbers the controller set; the rest (focus_on) is per strategy
+        self.strategy = update[0]
+        self.current_config = {**self.selector.get_afl_mutation_config(update[0]), **update[1]}
+        logger.debug(f"Mutation strategy switched to: {self.strategy.name}")
+        return True
+    
+    def fuzz_count(self, data: bytes) -> int:
+        """
+        Number of fuzz() calls AFL++ makes for one queue entry.
+        
+        Havoc and splice strategies get their configured cycles; deterministic
+        ones the mutations left in their stage group (at most
+        DETERMINISTIC_CALLS), which is 0 once the group is done for data.
+        The count covers the whole input; if fuzz() then gets a smaller
+        max_size, those calls are havoc (see _stage_group).
+        """
+        self.sync()
+        group = self.DETERMINISTIC_GROUPS.get(self.strategy)
+        if self.current_config is None:
+            count = 1
+        elif group is not None:
+            count = min(self.stages.remaining(seed_id(data), group, len(data)), self.DETERMINISTIC_CALLS)
+        else:
+            count = max(1, self.current_config.get('havoc_cycles', 0) + self.current_config.get('splice_cycles', 0))
+        self._pending = count
+        return count
+    
+    def fuzz(self, data: bytearray, add_buf: Optional[bytearray], max_size: int) -> bytearray:
+        """
+        AFL++ fuzz() callback: the next mutant of the current batch.
+        
+        A new batch (sized to the calls left from fuzz_count()) is made when
+        the batch runs out, the queue entry or max_size changes, or the
+        strategy changes; a batch splices with the add_buf of its first call.
+        Control block updates are picked up by fuzz_count(), between queue
+        entries, so a deterministic batch is not dropped half used.
+        
+        Args:
+            data: Queue entry being fuzzed
+            add_buf: Another queue entry (for splicing), may be None
+            max_size: Maximum size of the result
+            
+        Returns:
+            Mutated input, in a bytearray reused by the next call (afl-fuzz
+            copies it right away)
+        """
+        source = self._batch_source
+        if (self._batch_next >= len(self._batch) or source is None
+                or source[1:] != (max_size, self.strategy) or source[0] != data):
+            self._drop_batch()
+            n = min(self.BATCH_SIZE, max(self._pending, 1))
+            self._batch = self.mutate_batch(data, n, max_size, add_buf)
+            self._batch_source = (bytes(data), max_size, self.strategy)
+            if self._stage_group(data, max_size) is not None:
+                self._batch_fill = self.stages.last_fill
+        
+        self._out[:] = self._batch[self._batch_next]
+        self._batch_next += 1
+        self._pending -= 1
+        return self._out
+    
+    def _drop_batch(self):
+        """Discard the current batch; deterministic mutants it never served go back to the walk."""
+        if self._batch_fill is not None:
+            self.stages.rewind(self._batch_fill, self._batch_next)
+        self._batch = []
+        self._batch_next = 0
+        self._batch_fill = None
+    
+    def _stage_group(self, data: bytes, max_size: int) -> Optional[str]:
+        """
+        Stage group the current strategy walks over data, if any.
+        
+        Cursors are kept in coordinates of the whole input, so an input that
+        would be cut to max_size is not walked (its mutants are havoc);
+        walking the cut copy would move the cursor past positions never run.
+        """
+        if len(data) > max_size:
+            return None
+        return self.DETERMINISTIC_GROUPS.get(self.strategy)
+    
+    def describe(self, max_description_length: int) -> str:
+        """AFL++ describe() callback: name used in queue file names."""
+        name = f"ppo-{self.strategy.name.lower()}" if self.strategy is not None else "ppo"
+        return name[:max_description_length]
+    
+    def mutate(self, data: bytes, max_size: int, add_buf: Optional[bytes] = None) -> bytes:
         """
         Mutate input data according to current strategy.
         
         Args:
             data: Input data to mutate
             max_size: Maximum size of mutated data
+            add_buf: Second input for splicing (optional)
             
         Returns:
             Mutated data
         """
-        # This is a simplified example - actual implementation would
-        # interface with AFL++'s mutation functions
-        
         if self.current_config is None:
-            return data
-        
-        mutated = bytearray(data)
+            return bytes(data[:max_size])
+        
+        group = self._stage_group(data, max_size)
+        if group is not None:
+            buf = mutation_kernels.as_buffer(data)
+            if self.stages.fill(buf.reshape(1, -1), seed_id(data), group):
+                return buf.tobytes()
+        return self._havoc_buffer(data, max_size, add_buf)[:max_size].tobytes()
+    
+    def _havoc_buffer(self, data: bytes, max_size: int, add_buf: Optional[bytes]) -> np.ndarray:
+        buf = mutation_kernels.as_buffer(data)
+        # Havoc strategies splice for the share of calls AFL++ would spend in its splice stage
+        havoc_cycles = self.current_config.get('havoc_cycles', 0)
+        splice_cycles = self.current_config.get('splice_cycles', 0)
+        splice_probability = self.current_config.get(
+            'splice_probability', splice_cycles / max(havoc_cycles + splice_cycles, 1))
+        stack_pow = self.current_config.get('havoc_stack_pow', mutation_kernels.HAVOC_STACK_POW2)
+        if add_buf is not None and self.rng.random() < splice_probability:
+            return mutation_kernels.splice(buf, add_buf, self.rng, stack_pow, max_size)
+        return mutation_kernels.havoc(buf, self.rng, stack_pow, max_size)
+    
+    def _reserve(self, size: int, keep: int = 0):
+        """Make the arena hold at least size bytes, keeping its first keep bytes."""
+        if len(self.arena) >= size:
+            return
+        # A new bytearray rather than a resize: views from earlier batches keep the old one alive
+        arena = bytearray(max(size, 2 * len(self.arena)))
+        arena[:keep] = self.arena[:keep]
+        self.arena = arena
+        self._arena_array = np.frombuffer(arena, dtype=np.uint8)
+    
+    def mutate_batch(self, data: bytes, n: int, max_size: int,
+                     add_buf: Optional[bytes] = None) -> List[memoryview]:
+        """
+        Write n mutants of data into the reusable output arena.
         
-        # Apply mutations based on strategy
-        # (This is placeholder logic - actual mutations would use AFL++ internals)
-        if self.current_config.get('deterministic_mode'):
-            # Deterministic mutations
-            for i in range(min(len(mutated), max_size)):
-                if np.random.random() < 0.1:
-                    mutated[i] ^= (1 << np.random.randint(0, 8))
-        else:
-            # Havoc mutations
-            num_mutations = self.current_config.get('havoc_cycles', 256)
-            for _ in range(num_mutations):
-                if len(mutated) == 0:
-                    break
-                idx = np.random.randint(0, len(mutated))
-                mutated[idx] = np.random.randint(0, 256)
+        Deterministic strategies mutate n copies of the input laid out as an
+        [n, len] block with the next steps of their stage group, one
+        vectorized call per stage; havoc and splice mutants (and those past
+        the end of a finished group) are generated one by one and packed
+        back to back.
+        The arena, offsets and lengths are reused by the next call, which
+        overwrites the mutants in place.
         
-        return bytes(mutated[:max_size])
+        Args:
+            data: Input data to mutate
+            n: Number of mutants
+            max_size: Maximum size of each mutant
+            add_buf: Second input for splicing (optional)
+            
+        Returns:
+            n memoryview slices of the arena, one per mutant
+        """
+        if len(self.offsets) < n:
+            self.offsets = np.zeros(n, dtype=np.int64)
+            self.lengths = np.zeros(n, dtype=np.int64)
+        offsets, lengths = self.offsets[:n], self.lengths[:n]
+        
+        group = self._stage_group(data, max_size)
+        done = pos = 0
+        if self.current_config is None or group is not None:
+            size = min(len(data), max_size)
+            self._reserve(n * size)
+            rows = self._arena_array[:n * size].reshape(n, size)
+            rows[:] = np.frombuffer(data, dtype=np.uint8, count=size)
+            done = n if group is None else self.stages.fill(rows, seed_id(data), group)
+            offsets[:done] = np.arange(done) * size
+            lengths[:done] = size
+            pos = done * size
+        
+        for i in range(done, n):
+            buf = self._havoc_buffer(data, max_size, add_buf)[:max_size]
+            self._reserve(pos + buf.size, keep=pos)
+            self._arena_array[pos:pos + buf.size] = buf
+            offsets[i] = pos
+            lengths[i] = buf.size
+            pos += buf.size
+        
+        view = memoryview(self.arena)
+        return [view[offset:offset + length] for offset, length in zip(offsets.tolist(), lengths.tolist())]
+    
+    def close(self):
+        """Detach from the control block and close the cursor log."""
+        if self.control is not None:
+            self.control.close()
+            self.control = None
+        self._drop_batch()
+        self.stages.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+Micro-benchmarks for the hot paths of the PPO fuzzing framework.
+
+Usage:
+    python perf_benchmarks.py gae [--steps 10000 50000] [--envs 1 8]
+    python perf_benchmarks.py policy [--iterations 5000]
+    python perf_benchmarks.py replay [--envs 256 1024] [--steps 2000000]
+    python perf_benchmarks.py sample-efficiency [--steps 2000] [--envs 2]
+    python perf_benchmarks.py stats [--iterations 20000]
+    python perf_benchmarks.py bus [--instances 16 128]
+    python perf_benchmarks.py mutate [--sizes 64 1024 16384]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+from typing import Callable, Dict, List
+
+
+def _time_call(fn: Callable, repeats: int) -> float:
+    """Return the best wall time of fn() over several repeats, in seconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _gae_loop(rewards, values, dones, next_value, gamma, gae_lambda):
+    """Reference per-step GAE loop (the original PPOAgent.compute_gae)."""
+    advantages = np.zeros_like(rewards)
+    last_gae = np.zeros(rewards.shape[1:], dtype=rewards.dtype)
+    next_value_t = next_value
+
+    for t in reversed(range(len(rewards))):
+        next_non_terminal = 1.0 - dones[t]
+        delta = rewards[t] + gamma * next_value_t * next_non_terminal - values[t]
+        advantages[t] = last_gae = delta + gamma * gae_lambda * next_non_terminal * last_gae
+        next_value_t = values[t]
+
+    return advantages, advantages + values
+
+
+def bench_gae(steps: List[int], envs: List[int], repeats: int = 3) -> List[Dict]:
+    """Compare the per-step GAE loop against the vectorized scan."""
+    from ppo_agent import compute_gae_batch
+
+    rng = np.random.default_rng(0)
+    results = []
+
+    for n_envs in envs:
+        for n_steps in steps:
+            rewards = rng.standard_normal((n_steps, n_envs)).astype(np.float32)
+            values = rng.standard_normal((n_steps, n_envs)).astype(np.float32)
+            dones = (rng.random((n_steps, n_envs)) < 0.01).astype(np.float32)
+            next_value = rng.standard_normal(n_envs).astype(np.float32)
+
+            loop_adv, _ = _gae_loop(rewards, values, dones, next_value, 0.99, 0.95)
+            scan_adv, _ = compute_gae_batch(rewards, values, dones, next_value, 0.99, 0.95)
+            max_err = float(np.abs(loop_adv - scan_adv).max())
+
+            loop_time = _time_call(
+                lambda: _gae_loop(rewards, values, dones, next_value, 0.99, 0.95), repeats)
+            scan_time = _time_call(
+                lambda: compute_gae_batch(rewards, values, dones, next_value, 0.99, 0.95), repeats)
+
+            results.append({
+                'steps': n_steps,
+                'envs': n_envs,
+                'loop_ms': loop_time * 1000,
+                'scan_ms': scan_time * 1000,
+                'speedup': loop_time / scan_time,
+                'max_abs_err': max_err,
+            })
+
+    print(f"{'steps':>8} {'envs':>5} {'loop ms':>10} {'scan ms':>10} {'speedup':>8} {'max err':>10}")
+    for r in results:
+        print(f"{r['steps']:>8} {r['envs']:>5} {r['loop_ms']:>10.2f} {r['scan_ms']:>10.2f} "
+              f"{r['speedup']:>7.1f}x {r['max_abs_err']:>10.2e}")
+
+    return results
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def _bench_policy_variant(variant: str, iterations: int) -> Dict:
+    """Measure per-call action selection latency for one policy variant."""
+    if variant == 'numpy':
+        from policy_snapshot import PolicySnapshot
+        # Random weights with PPONetwork's shapes, so torch is never imported
+        shapes = {'shared_fc1': (128, 10), 'shared_fc2': (128, 128), 'actor_fc': (64, 128),
+                  'actor_out': (8, 64), 'critic_fc': (64, 128), 'critic_out': (1, 64)}
+        rng = np.random.default_rng(0)
+        weights = {}
+        for name, shape in shapes.items():
+            weights[f'{name}.weight'] = rng.standard_normal(shape).astype(np.float32) * 0.1
+            weights[f'{name}.bias'] = np.zeros(shape[0], dtype=np.float32)
+        snapshot = PolicySnapshot(weights, seed=0)
+        states = np.random.randn(iterations, 10).astype(np.float32)
+
+        def act(i):
+            return snapshot.select_action(states[i])
+    elif variant == 'distilled':
+        from policy_distill import fit_decision_tree
+        # Depth-8 tree fitted to a random linear policy, so torch is never imported
+        rng = np.random.default_rng(0)
+        train_states = rng.standard_normal((20000, 10)).astype(np.float32)
+        tree = fit_decision_tree(train_states, np.argmax(train_states @ rng.standard_normal((10, 8)), axis=1), 8)
+        states = np.random.randn(iterations, 10).astype(np.float32)
+        policy_act = tree.act
+
+        def act(i):
+            return policy_act(states[i])
+    else:
+        import torch
+        from torch.distributions import Categorical
+        from ppo_agent import PPONetwork
+        from policy_export import build_variant
+        torch.set_num_threads(1)
+        policy = build_variant(PPONetwork(10, 8).eval(), variant)
+        states = torch.randn(iterations, 1, 10)
+
+        def act(i):
+            with torch.no_grad():
+                logits, value = policy(states[i])
+                dist = Categorical(logits=logits)
+                action = dist.sample()
+                return action.item(), dist.log_prob(action).item(), value.item()
+
+    for i in range(min(iterations, 200)):
+        act(i)
+
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        act(i)
+        latencies[i] = time.perf_counter() - start
+
+    return {
+        'variant': variant,
+        'p50_us': float(np.percentile(latencies, 50) * 1e6),
+        'p99_us': float(np.percentile(latencies, 99) * 1e6),
+        'rss_mb': _rss_mb(),
+    }
+
+
+def bench_policy(variants: List[str], iterations: int) -> List[Dict]:
+    """
+    Compare get_action latency and RSS of the policy inference variants.
+
+    Each variant runs in a fresh interpreter so RSS reflects only what that
+    variant loads.
+    """
+    results = []
+    for variant in variants:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'policy',
+             '--variant', variant, '--iterations', str(iterations), '--json'],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'variant':>10} {'p50 us':>10} {'p99 us':>10} {'RSS MB':>10}")
+    for r in results:
+        print(f"{r['variant']:>10} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f} {r['rss_mb']:>10.1f}")
+
+    return results
+
+
+def _synthetic_traces(n_traces: int, length: int, seed: int = 0) -> List[np.ndarray]:
+    """Saturating coverage/path/crash growth curves shaped like real campaigns."""
+    from replay_simulator import TRACE_FIELDS, TIME, COVERAGE, PATHS, CRASHES, EXECS, STABILITY, CYCLES
+
+    rng = np.random.default_rng(seed)
+    traces = []
+    for _ in range(n_traces):
+        t = np.arange(length) * 5.0
+        rate = rng.uniform(1e-4, 1e-3)
+        trace = np.zeros((length, len(TRACE_FIELDS)))
+        trace[:, TIME] = t
+        trace[:, COVERAGE] = rng.uniform(5, 40) * (1 - np.exp(-rate * t))
+        trace[:, PATHS] = rng.uniform(100, 3000) * (1 - np.exp(-rate * t))
+        trace[:, CRASHES] = np.floor(rng.uniform(0, 20) * (1 - np.exp(-rate * t)))
+        trace[:, EXECS] = rng.uniform(200, 5000)
+        trace[:, STABILITY] = 100.0
+        trace[:, CYCLES] = np.floor(t / 3600)
+        traces.append(trace)
+    return traces
+
+
+def bench_replay(envs: List[int], total_steps: int) -> List[Dict]:
+    """Replay simulator throughput, alone and with PPOAgent acting and training."""
+    from replay_simulator import ReplaySimulator, pretrain
+    from ppo_agent import PPOAgent
+
+    traces = _synthetic_traces(32, 2000)
+    results = []
+
+    for n_envs in envs:
+        sim = ReplaySimulator(traces, n_envs=n_envs, seed=0)
+        sim.reset()
+        actions = np.random.default_rng(0).integers(0, sim.num_actions, (64, n_envs))
+        n_iters = max(total_steps // n_envs, 1)
+        start = time.perf_counter()
+        for i in range(n_iters):
+            sim.step(actions[i % 64])
+        sim_rate = n_iters * n_envs / (time.perf_counter() - start)
+
+        agent = PPOAgent(state_dim=10, action_dim=sim.num_actions, n_envs=n_envs, buffer_size=64)
+        start = time.perf_counter()
+        pretrain(agent, sim, total_steps, rollout_length=64, n_epochs=4, batch_size=max(n_envs * 16, 256))
+        train_rate = total_steps / (time.perf_counter() - start)
+
+        results.append({'envs': n_envs, 'sim_steps_per_sec': sim_rate, 'train_steps_per_sec': train_rate})
+
+    print(f"{'envs':>6} {'sim steps/s':>14} {'pretrain steps/s':>18}")
+    for r in results:
+        print(f"{r['envs']:>6} {r['sim_steps_per_sec']:>14,.0f} {r['train_steps_per_sec']:>18,.0f}")
+
+    return results
+
+
+def _evaluate_constant(traces, response, n_envs: int = 64, steps: int = 50) -> np.ndarray:
+    """Mean per-step reward of always playing each strategy (upper reference)."""
+    from replay_simulator import ReplaySimulator
+
+    results = np.zeros(len(response))
+    for action in range(len(response)):
+        sim = ReplaySimulator(traces, response, n_envs=n_envs, seed=1234)
+        sim.reset()
+        actions = np.full(n_envs, action)
+        results[action] = np.mean([sim.step(actions)[1].mean() for _ in range(steps)])
+    return results
+
+
+def bench_sample_efficiency(total_steps: int, n_envs: int, eval_every: int, seed: int = 0) -> Dict[str, List]:
+    """
+    Greedy-policy reward versus environment steps for PPO and DQN on the
+    replay simulator, i.e. how many (real-world expensive) transitions each
+    learner needs.
+    """
+    import torch
+    from replay_simulator import ReplaySimulator, evaluate_policy
+    from ppo_agent import PPOAgent
+    from dqn_agent import DQNAgent
+
+    torch.manual_seed(seed)
+    traces = _synthetic_traces(32, 2000, seed=seed)
+    # Strategies differ in how much of the trace's progress they achieve
+    response = np.random.default_rng(seed).lognormal(0.0, 0.75, (8, 3))
+
+    rollout_length = 32
+    learners = {
+        'ppo': PPOAgent(state_dim=10, action_dim=8, n_envs=n_envs, buffer_size=rollout_length),
+        'dqn': DQNAgent(state_dim=10, action_dim=8, n_envs=n_envs, buffer_size=total_steps,
+                        epsilon_decay_steps=total_steps // 4, target_update_interval=100,
+                        learning_rate=1e-3, seed=seed),
+    }
+    eval_steps = list(range(0, total_steps + 1, eval_every))
+    curves = {'steps': eval_steps}
+
+    for name, agent in learners.items():
+        sim = ReplaySimulator(traces, response, n_envs=n_envs, seed=seed)
+        obs = sim.reset()
+        curve = [evaluate_policy(agent.network, traces, response)]
+        steps, next_eval = 0, eval_every
+
+        while steps < total_steps:
+            actions = agent.select_action(obs)
+            obs, rewards, dones, _ = sim.step(actions)
+            agent.store_transition(rewards, dones)
+            steps += n_envs
+
+            if name == 'ppo' and len(agent.buffer) == rollout_length:
+                agent.update(n_epochs=4, batch_size=64)
+            elif name == 'dqn' and len(agent.buffer) >= 64:
+                agent.update(n_epochs=1, batch_size=64)
+
+            if steps >= next_eval:
+                curve.append(evaluate_policy(agent.network, traces, response))
+                next_eval += eval_every
+
+        curves[name] = curve
+
+    best = float(_evaluate_constant(traces, response).max())
+    print(f"Greedy reward per step (best constant strategy: {best:.4f})")
+    print(f"{'env steps':>10} {'PPO':>10} {'DQN':>10}")
+    for i, step in enumerate(eval_steps):
+        print(f"{step:>10} {curves['ppo'][i]:>10.4f} {curves['dqn'][i]:>10.4f}")
+
+    return curves
+
+
+# fuzzer_stats as written by AFL++ 4.x
+SAMPLE_FUZZER_STATS = """\
+start_time        : 1718000000
+last_update       : 1718003600
+run_time          : 3600
+fuzzer_pid        : 41234
+cycles_done       : 12
+cycles_wo_finds   : 3
+time_wo_finds     : 412
+execs_done        : 18734521
+execs_per_sec     : 5203.48
+execs_ps_last_min : 4981.20
+corpus_count      : 1873
+corpus_favored    : 214
+corpus_found      : 1801
+corpus_imported   : 0
+corpus_variable   : 0
+max_depth         : 17
+cur_item          : 1022
+pending_favs      : 12
+pending_total     : 611
+stability         : 99.87%
+bitmap_cvg        : 7.42%
+saved_crashes     : 4
+saved_hangs       : 1
+last_find         : 1718003188
+last_crash        : 1718002201
+last_hang         : 1718001010
+execs_since_crash : 2290141
+exec_timeout      : 40
+slowest_exec_ms   : 38
+peak_rss_mb       : 24
+cpu_affinity      : 2
+edges_found       : 4862
+total_edges       : 65536
+var_byte_count    : 0
+havoc_expansion   : 2
+auto_dict_entries : 7
+testcache_size    : 4391742
+testcache_count   : 1873
+testcache_evict   : 0
+afl_banner        : xmllint
+afl_version       : ++4.09c
+target_mode       : shmem_testcase default
+command_line      : afl-fuzz -i seeds -o out -- ./xmllint @@
+"""
+
+
+def _regex_parse(content: str) -> Dict:
+    """Reference parser: the original one-regex-per-metric FeedbackAnalyzer code."""
+    import re
+    patterns = {
+        'total_execs': r'execs_done\s*:\s*(\d+)',
+        'execs_per_sec': r'execs_per_sec\s*:\s*([\d.]+)',
+        'paths_total': r'paths_total\s*:\s*(\d+)',
+        'unique_crashes': r'saved_crashes\s*:\s*(\d+)',
+        'unique_hangs': r'saved_hangs\s*:\s*(\d+)',
+        'bitmap_cvg': r'bitmap_cvg\s*:\s*([\d.]+)%',
+        'stability': r'stability\s*:\s*([\d.]+)%',
+        'pending_favs': r'pending_favs\s*:\s*(\d+)',
+        'pending_total': r'pending_total\s*:\s*(\d+)',
+        'cycles_done': r'cycles_done\s*:\s*(\d+)',
+        'last_crash': r'last_crash\s*:\s*(\d+)',
+        'last_path': r'last_path\s*:\s*(\d+)',
+    }
+    metrics = {}
+    for attr, pattern in patterns.items():
+        match = re.search(pattern, content)
+        if match:
+            value = match.group(1)
+            metrics[attr] = float(value) if '.' in value else int(value)
+    return metrics
+
+
+# Fields the regex parser extracts (and FeedbackAnalyzer reads), by current AFL++ name
+REGEX_FIELDS = ('execs_done', 'execs_per_sec', 'corpus_count', 'saved_crashes', 'saved_hangs',
+                'bitmap_cvg', 'stability', 'pending_favs', 'pending_total', 'cycles_done',
+                'last_crash', 'last_find')
+
+
+def bench_stats(iterations: int) -> List[Dict]:
+    """
+    Parses/sec of the original regex parser (12 whole-file searches, AFL++ 3.x
+    key names only) versus the shared single-pass parser (every field, with
+    key aliases), on a realistic AFL++ 4.x fuzzer_stats file. The single-pass
+    parser converts values on first read, so it is timed both on its own and
+    followed by reading the fields the regex parser extracts.
+    """
+    import tempfile
+    from afl_stats import parse_stats_text, parse_fuzzer_stats
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stats_file = os.path.join(tmp_dir, 'fuzzer_stats')
+        with open(stats_file, 'w') as f:
+            f.write(SAMPLE_FUZZER_STATS)
+
+        def regex_from_file():
+            with open(stats_file) as f:
+                _regex_parse(f.read())
+
+        regex_fields = len(_regex_parse(SAMPLE_FUZZER_STATS))
+        parsed = parse_stats_text(SAMPLE_FUZZER_STATS)
+        single_fields = len(parsed.to_dict()) - len(parsed.extras)
+
+        def single_pass_read(stats):
+            return [getattr(stats, field) for field in REGEX_FIELDS]
+
+        cases = [
+            ('regex (text)', regex_fields, lambda: _regex_parse(SAMPLE_FUZZER_STATS)),
+            ('single-pass (text)', single_fields, lambda: parse_stats_text(SAMPLE_FUZZER_STATS)),
+            ('single-pass + read', len(REGEX_FIELDS),
+             lambda: single_pass_read(parse_stats_text(SAMPLE_FUZZER_STATS))),
+            ('regex (file)', regex_fields, regex_from_file),
+            ('single-pass (file)', single_fields, lambda: parse_fuzzer_stats(stats_file)),
+        ]
+
+        results = []
+        for name, n_fields, fn in cases:
+            elapsed = _time_call(lambda: [fn() for _ in range(iterations)], repeats=3)
+            results.append({'parser': name, 'fields': n_fields,
+                            'parses_per_sec': iterations / elapsed,
+                            'us_per_parse': elapsed / iterations * 1e6,
+                            'fields_per_sec': n_fields * iterations / elapsed})
+
+    print(f"{'parser':>20} {'fields':>7} {'parses/sec':>12} {'us/parse':>10} {'fields/sec':>12}")
+    for r in results:
+        print(f"{r['parser']:>20} {r['fields']:>7} {r['parses_per_sec']:>12.0f} "
+              f"{r['us_per_parse']:>10.2f} {r['fields_per_sec']:>12.0f}")
+
+    return results
+
+
+def bench_bus(instances: List[int], polls: int) -> List[Dict]:
+    """
+    Cost of one consumer poll over N instances: parsing every fuzzer_stats
+    file, the stat()-keyed cache (no file changed), and a stats bus snapshot
+    plus lookup of every instance. The collector's tick is paid once however
+    many consumers attach.
+    """
+    import tempfile
+    from afl_stats import parse_fuzzer_stats
+    from stats_bus import StatsCollector, StatsBusClient
+    from stats_watcher import CachedStatsReader
+
+    results = []
+    for n in instances:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = []
+            for i in range(n):
+                instance_dir = os.path.join(tmp_dir, f'campaign{i // 8}', f'sec{i % 8}')
+                os.makedirs(instance_dir)
+                files.append(os.path.join(instance_dir, 'fuzzer_stats'))
+                with open(files[-1], 'w') as f:
+                    f.write(SAMPLE_FUZZER_STATS)
+
+            collector = StatsCollector([tmp_dir], name=f'bench_bus_{os.getpid()}', capacity=n)
+            collector.tick()
+            client = StatsBusClient(collector.name)
+            reader = CachedStatsReader()
+
+            def bus_poll():
+                client.refresh()
+                for path in files:
+                    client.get(path)
+
+            cases = [
+                ('parse all', lambda: [parse_fuzzer_stats(path) for path in files]),
+                ('stat cache', lambda: [reader.read(path) for path in files]),
+                ('bus', bus_poll),
+                ('collector tick', collector.tick),
+            ]
+            for name, fn in cases:
+                fn()
+                elapsed = _time_call(lambda: [fn() for _ in range(polls)], repeats=3)
+                results.append({'instances': n, 'reader': name, 'us_per_poll': elapsed / polls * 1e6})
+
+            client.close()
+            collector.close()
+
+    print(f"{'instances':>10} {'reader':>16} {'us/poll':>12}")
+    for r in results:
+        print(f"{r['instances']:>10} {r['reader']:>16} {r['us_per_poll']:>12.1f}")
+
+    return results
+
+
+def _loop_mutate(config: Dict, data: bytes, max_size: int) -> bytes:
+    """Reference per-byte loop (the original AFLCustomMutator.mutate)."""
+    mutated = bytearray(data)
+    if config.get('deterministic_mode'):
+        for i in range(min(len(mutated), max_size)):
+            if np.random.random() < 0.1:
+                mutated[i] ^= (1 << np.random.randint(0, 8))
+    else:
+        for _ in range(config.get('havoc_cycles', 256)):
+            if len(mutated) == 0:
+                break
+            idx = np.random.randint(0, len(mutated))
+            mutated[idx] = np.random.randint(0, 256)
+    return bytes(mutated[:max_size])
+
+
+def _rate(fn: Callable, min_time: float) -> float:
+    """Calls of fn per second, timed over at least min_time seconds."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def bench_mutate(sizes: List[int], min_time: float) -> List[Dict]:
+    """
+    Mutations/sec per strategy and input size: the original per-byte loop
+    versus the vectorized kernels, one mutant per call (AFLCustomMutator.mutate)
+    and a fuzz()-sized batch per call into the output arena (mutate_batch).
+    Deterministic strategies restart their stage walk on every call.
+    """
+    from mutation_selector import AFLCustomMutator, MutationStrategy
+
+    mutator = AFLCustomMutator(seed=0)
+    rng = np.random.default_rng(0)
+    results = []
+    for size in sizes:
+        data = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+        other = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+        max_size = max(2 * size, 1024)
+        for strategy in MutationStrategy:
+            mutator.set_strategy(int(strategy))
+            config = mutator.current_config
+            loop = _rate(lambda: _loop_mutate(config, data, max_size), min_time)
+
+            # Restart the deterministic walk each call so it never runs out
+            def single():
+                mutator.stages.cursors.clear()
+                mutator.mutate(data, max_size, other)
+
+            # Batches as fuzz() makes them: at most the calls fuzz_count() allows
+            mutator.stages.cursors.clear()
+            batch_size = min(mutator.BATCH_SIZE, max(mutator.fuzz_count(data), 1))
+
+            def batched():
+                mutator.stages.cursors.clear()
+                mutator.mutate_batch(data, batch_size, max_size, other)
+
+            vectorized = _rate(single, min_time)
+            batch = batch_size * _rate(batched, min_time)
+            results.append({'strategy': strategy.name, 'size': size, 'loop_per_sec': loop,
+                            'vectorized_per_sec': vectorized, 'batch_per_sec': batch,
+                            'speedup': vectorized / loop, 'batch_speedup': batch / loop})
+
+    print(f"{'strategy':>14} {'size':>7} {'loop/s':>10} {'vectorized/s':>13} {'speedup':>8} "
+          f"{'batch/s':>10} {'speedup':>8}")
+    for r in results:
+        print(f"{r['strategy']:>14} {r['size']:>7} {r['loop_per_sec']:>10.0f} "
+              f"{r['vectorized_per_sec']:>13.0f} {r['speedup']:>7.1f}x "
+              f"{r['batch_per_sec']:>10.0f} {r['batch_speedup']:>7.1f}x")
+
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Performance benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    gae_parser = subparsers.add_parser('gae', help='Vectorized GAE vs per-step loop')
+    gae_parser.add_argument('--steps', type=int, nargs='+', default=[1000, 10000, 50000])
+    gae_parser.add_argument('--envs', type=int, nargs='+', default=[1, 8])
+    gae_parser.add_argument('--repeats', type=int, default=3)
+
+    policy_parser = subparsers.add_parser('policy', help='Policy inference latency and RSS per variant')
+    policy_parser.add_argument('--variant', nargs='+', default=['eager', 'scripted', 'quantized', 'numpy', 'distilled'])
+    policy_parser.add_argument('--iterations', type=int, default=5000)
+    policy_parser.add_argument('--json', action='store_true', help='Run one variant in-process and print JSON')
+
+    replay_parser = subparsers.add_parser('replay', help='Replay simulator and pretraining throughput')
+    replay_parser.add_argument('--envs', type=int, nargs='+', default=[256, 1024])
+    replay_parser.add_argument('--steps', type=int, default=2_000_000)
+
+    efficiency_parser = subparsers.add_parser('sample-efficiency', help='PPO vs DQN reward per environment step')
+    efficiency_parser.add_argument('--steps', type=int, default=2000)
+    efficiency_parser.add_argument('--envs', type=int, default=2)
+    efficiency_parser.add_argument('--eval-every', type=int, default=200)
+    efficiency_parser.add_argument('--seed', type=int, default=0)
+
+    stats_parser = subparsers.add_parser('stats', help='fuzzer_stats parses per second')
+    stats_parser.add_argument('--iterations', type=int, default=20000)
+
+    bus_parser = subparsers.add_parser('bus', help='Per-consumer poll cost: files vs shared-memory stats bus')
+    bus_parser.add_argument('--instances', type=int, nargs='+', default=[16, 128])
+    bus_parser.add_argument('--polls', type=int, default=200)
+
+    mutate_parser = subparsers.add_parser('mutate', help='Mutations/sec per strategy and input size')
+    mutate_parser.add_argument('--sizes', type=int, nargs='+', default=[64, 1024, 16384])
+    mutate_parser.add_argument('--min-time', type=float, default=0.2, help='Seconds timed per case')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'gae':
+        bench_gae(args.steps, args.envs, args.repeats)
+    elif args.benchmark == 'policy':
+        if args.json:
+            print(json.dumps(_bench_policy_variant(args.variant[0], args.iterations)))
+        else:
+            bench_policy(args.variant, args.iterations)
+    elif args.benchmark == 'replay':
+        bench_replay(args.envs, args.steps)
+    elif args.benchmark == 'sample-efficiency':
+        bench_sample_efficiency(args.steps, args.envs, args.eval_every, args.seed)
+    elif args.benchmark == 'stats':
+        bench_stats(args.iterations)
+    elif args.benchmark == 'bus':
+        bench_bus(args.instances, args.polls)
+    elif args.benchmark == 'mutate':
+        bench_mutate(args.sizes, args.min_time)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
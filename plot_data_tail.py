@@ -0,0 +1,245 @@
+"""
+Incremental plot_data Reader
+Tails an AFL/AFL++ plot_data file: remembers the byte offset, parses only the
+rows appended since the last poll and keeps them in a NumPy ring buffer with
+wall-clock timestamps. Truncation or replacement of the file (an AFL restart)
+is detected and reading starts over on the new file.
+"""
+
+import os
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import logging
+
+from afl_stats import parse_fuzzer_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# plot_data header names across AFL and AFL++ versions
+PLOT_DATA_ALIASES = {
+    'time': ('relative_time', 'unix_time'),
+    'coverage': ('map_size',),
+    'paths_total': ('corpus_count', 'paths_total'),
+    'unique_crashes': ('saved_crashes', 'unique_crashes'),
+    'execs_per_sec': ('execs_per_sec',),
+    'cycles_done': ('cycles_done',),
+    'pending_favs': ('pending_favs',),
+}
+
+# Columns of the ring buffer
+PLOT_FIELDS = tuple(PLOT_DATA_ALIASES)
+TIME = PLOT_FIELDS.index('time')
+
+# Header AFL++ 4.x writes, used if a file is picked up without its header line
+DEFAULT_HEADER = ("# relative_time, cycles_done, cur_item, corpus_count, pending_total, "
+                  "pending_favs, map_size, saved_crashes, saved_hangs, max_depth, "
+                  "execs_per_sec, total_execs, edges_found")
+
+
+def parse_header(header: str) -> List[str]:
+    """Column names of a plot_data header line."""
+    return [c.strip() for c in header.lstrip('#').split(',')]
+
+
+def column_map(columns: List[str]) -> List[int]:
+    """Source column of each PLOT_FIELDS entry in a plot_data row (-1 if absent)."""
+    mapping = []
+    for aliases in PLOT_DATA_ALIASES.values():
+        mapping.append(next((columns.index(a) for a in aliases if a in columns), -1))
+    return mapping
+
+
+class PlotDataTail:
+    """
+    Tail reader for one plot_data file.
+
+    Each poll() stats the file and reads only the bytes appended since the
+    previous poll (up to the last complete line). Timestamps are converted
+    to Unix time: AFL++ writes seconds since the fuzzer started, which is
+    offset by start_time from the fuzzer_stats next to plot_data.
+    """
+
+    def __init__(self, plot_data_file: Union[str, Path], capacity: int = 4096):
+        """
+        Initialize the reader.
+
+        Args:
+            plot_data_file: Path to plot_data (need not exist yet)
+            capacity: Number of rows kept in the ring buffer
+        """
+        self.path = Path(plot_data_file)
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(PLOT_FIELDS)))
+        self._count = 0
+        self._next = 0
+
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._columns: Optional[List[int]] = None
+        self._n_columns = 0
+        self._relative_time = False
+        self._time_base: Optional[float] = None
+        self.restarts = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _reset(self):
+        """Forget the current file; the next read starts at its beginning."""
+        self._offset = 0
+        self._columns = None
+        self._time_base = None
+        self._count = 0
+        self._next = 0
+
+    def _set_header(self, line: str):
+        columns = parse_header(line)
+        self._columns = column_map(columns)
+        self._n_columns = len(columns)
+        self._relative_time = 'relative_time' in columns
+
+        self._time_base = 0.0
+        if self._relative_time:
+            stats = parse_fuzzer_stats(self.path.parent / "fuzzer_stats")
+            # Resolved from the newest row on the first flush if unknown
+            self._time_base = float(stats.start_time) if stats is not None and stats.start_time else None
+
+    def poll(self) -> int:
+        """
+        Read rows appended since the last poll.
+
+        Returns:
+            Number of new rows added to the ring buffer
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+
+        if self._inode is not None and (st.st_ino != self._inode or st.st_size < self._offset):
+            logger.info(f"{self.path} was truncated or replaced, reading it from the start")
+            self._reset()
+            self.restarts += 1
+        self._inode = st.st_ino
+
+        if st.st_size == self._offset:
+            return 0
+
+        with open(self.path, 'rb') as f:
+            # The byte before the offset ends the last row read; anything else means
+            # the file was truncated and has since grown past the old offset
+            f.seek(max(self._offset - 1, 0))
+            chunk = f.read()
+            if self._offset > 0:
+                if chunk[:1] != b'\n':
+                    logger.info(f"{self.path} was rewritten, reading it from the start")
+                    self._reset()
+                    self.restarts += 1
+                    f.seek(0)
+                    chunk = f.read()
+                else:
+                    chunk = chunk[1:]
+
+        # Leave a partially written last line for the next poll
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            return 0
+        self._offset += end + 1
+
+        added = 0
+        rows: List[List[str]] = []
+        for line in chunk[:end].decode(errors='replace').splitlines():
+            if line.startswith('#'):
+                added += self._flush(rows)
+                rows = []
+                self._set_header(line)
+                continue
+            if not line.strip():
+                continue
+            if self._columns is None:
+                self._set_header(DEFAULT_HEADER)
+            parts = line.replace('%', '').split(',')
+            if len(parts) == self._n_columns:
+                rows.append(parts)
+
+        return added + self._flush(rows)
+
+    def _flush(self, rows: List[List[str]]) -> int:
+        """Convert parsed rows with the current header and append them to the ring."""
+        if not rows:
+            return 0
+        try:
+            data = np.array(rows, dtype=np.float64)
+        except ValueError:
+            valid = []
+            for row in rows:
+                try:
+                    valid.append([float(v) for v in row])
+                except ValueError:
+                    continue
+            if not valid:
+                return 0
+            data = np.array(valid)
+
+        out = np.zeros((len(data), len(PLOT_FIELDS)))
+        for j, col in enumerate(self._columns):
+            if col >= 0:
+                out[:, j] = data[:, col]
+
+        if self._time_base is None:
+            self._time_base = time.time() - out[-1, TIME]
+        out[:, TIME] += self._time_base
+
+        self._append(out)
+        return len(out)
+
+    def _append(self, rows: np.ndarray):
+        n = len(rows)
+        if n >= self.capacity:
+            self.buffer[:] = rows[-self.capacity:]
+            self._next = 0
+            self._count = self.capacity
+            return
+        idx = (self._next + np.arange(n)) % self.capacity
+        self.buffer[idx] = rows
+        self._next = (self._next + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def series(self) -> np.ndarray:
+        """Buffered rows, oldest first, as an array of shape [N, len(PLOT_FIELDS)]."""
+        if self._count < self.capacity:
+            return self.buffer[:self._count].copy()
+        return np.concatenate([self.buffer[self._next:], self.buffer[:self._next]])
+
+    def window(self, seconds: float) -> np.ndarray:
+        """
+        Rows covering the last `seconds` seconds.
+
+        Includes the newest row older than the window, so a window that
+        holds a single row still spans a measurable interval.
+        """
+        rows = self.series()
+        if len(rows) == 0:
+            return rows
+        start = np.searchsorted(rows[:, TIME], rows[-1, TIME] - seconds, side='left')
+        return rows[max(start - 1, 0):]
+
+    def rates(self, window: float = 60.0) -> Optional[Dict[str, float]]:
+        """
+        Per-second change of every field over the last `window` seconds.
+
+        Returns:
+            Dictionary of field -> rate, or None if fewer than two rows span the window
+        """
+        rows = self.window(window)
+        if len(rows) < 2:
+            return None
+        elapsed = rows[-1, TIME] - rows[0, TIME]
+        if elapsed <= 0:
+            return None
+        change = (rows[-1] - rows[0]) / elapsed
+        return {field: float(change[j]) for j, field in enumerate(PLOT_FIELDS) if j != TIME}
@@ -0,0 +1,399 @@
+"""
+Policy Distillation
+Fits a compact decision tree to the greedy actions of a trained PPONetwork
+(or DQN QNetwork) over the FeedbackAnalyzer state space, so a learned
+policy can be queried in the mutation hot path. The tree is stored as flat
+NumPy arrays and compiled into nested Python comparisons for sub-microsecond
+single-state lookups; MutationStrategySelector.load_distilled_policy()
+loads it.
+"""
+
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+LEAF = -1
+
+
+def _best_split(X: np.ndarray, y: np.ndarray, n_actions: int, min_samples_leaf: int,
+                max_thresholds: int) -> Optional[Tuple[int, float, float]]:
+    """
+    Find the Gini-optimal split of a node.
+
+    Candidate thresholds are midpoints between distinct sorted values,
+    subsampled to at most max_thresholds per feature.
+
+    Returns:
+        (feature, threshold, impurity decrease) or None if no valid split exists
+    """
+    n = len(y)
+    onehot = np.eye(n_actions, dtype=np.float64)[y]
+    total_counts = onehot.sum(axis=0)
+    parent_impurity = n - (total_counts ** 2).sum() / n
+
+    best = None
+    best_impurity = parent_impurity - 1e-9
+
+    for feature in range(X.shape[1]):
+        order = np.argsort(X[:, feature], kind='stable')
+        values = X[order, feature]
+
+        # Split after position i (left = first i+1 samples)
+        positions = np.nonzero(values[1:] != values[:-1])[0]
+        positions = positions[(positions + 1 >= min_samples_leaf) & (n - positions - 1 >= min_samples_leaf)]
+        if len(positions) == 0:
+            continue
+        if len(positions) > max_thresholds:
+            positions = positions[np.linspace(0, len(positions) - 1, max_thresholds).astype(np.int64)]
+
+        left_counts = np.cumsum(onehot[order], axis=0)[positions]
+        right_counts = total_counts - left_counts
+        n_left = (positions + 1).astype(np.float64)
+        n_right = n - n_left
+
+        impurity = n - (left_counts ** 2).sum(axis=1) / n_left - (right_counts ** 2).sum(axis=1) / n_right
+        i = int(np.argmin(impurity))
+        if impurity[i] < best_impurity:
+            best_impurity = impurity[i]
+            p = positions[i]
+            best = (feature, float((values[p] + values[p + 1]) / 2), parent_impurity - impurity[i])
+
+    return best
+
+
+def fit_decision_tree(
+    states: np.ndarray,
+    actions: np.ndarray,
+    n_actions: int,
+    max_depth: int = 8,
+    min_samples_leaf: int = 5,
+    max_thresholds: int = 64
+) -> 'DistilledPolicy':
+    """
+    Fit a classification tree (CART, Gini) mapping states to actions.
+
+    Args:
+        states: States of shape [n, state_dim]
+        actions: Teacher actions of shape [n]
+        n_actions: Number of actions
+        max_depth: Maximum tree depth
+        min_samples_leaf: Minimum samples per leaf
+        max_thresholds: Candidate thresholds per feature and node
+
+    Returns:
+        DistilledPolicy
+    """
+    states = np.asarray(states, dtype=np.float64)
+    actions = np.asarray(actions, dtype=np.int64)
+
+    feature: List[int] = []
+    threshold: List[float] = []
+    left: List[int] = []
+    right: List[int] = []
+    value: List[int] = []
+
+    def new_node() -> int:
+        feature.append(LEAF)
+        threshold.append(0.0)
+        left.append(LEAF)
+        right.append(LEAF)
+        value.append(0)
+        return len(feature) - 1
+
+    def build(node: int, idx: np.ndarray, depth: int):
+        y = actions[idx]
+        counts = np.bincount(y, minlength=n_actions)
+        value[node] = int(np.argmax(counts))
+
+        if depth >= max_depth or counts.max() == len(y) or len(y) < 2 * min_samples_leaf:
+            return
+        split = _best_split(states[idx], y, n_actions, min_samples_leaf, max_thresholds)
+        if split is None:
+            return
+
+        f, t, _ = split
+        go_left = states[idx, f] <= t
+        left_node, right_node = new_node(), new_node()
+        build(left_node, idx[go_left], depth + 1)
+        build(right_node, idx[~go_left], depth + 1)
+
+        # Collapse splits whose two leaves predict the same action
+        if (feature[left_node] == LEAF and feature[right_node] == LEAF
+                and value[left_node] == value[right_node]):
+            return
+        feature[node], threshold[node] = f, t
+        left[node], right[node] = left_node, right_node
+
+    build(new_node(), np.arange(len(actions)), 0)
+
+    # Renumber reachable nodes depth-first so collapsed subtrees are dropped
+    old_to_new: Dict[int, int] = {}
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        old_to_new[node] = len(old_to_new)
+        if feature[node] != LEAF:
+            stack.extend([right[node], left[node]])
+
+    keep = sorted(old_to_new, key=old_to_new.get)
+    internal = [feature[n] != LEAF for n in keep]
+
+    return DistilledPolicy(
+        feature=np.array([feature[n] for n in keep], dtype=np.int64),
+        threshold=np.array([threshold[n] for n in keep], dtype=np.float64),
+        left=np.array([old_to_new[left[n]] if i else LEAF for n, i in zip(keep, internal)], dtype=np.int64),
+        right=np.array([old_to_new[right[n]] if i else LEAF for n, i in zip(keep, internal)], dtype=np.int64),
+        value=np.array([value[n] for n in keep], dtype=np.int64),
+    )
+
+
+class DistilledPolicy:
+    """
+    Decision tree policy stored as flat arrays (node 0 is the root).
+
+    Internal nodes send a state left when state[feature] <= threshold;
+    leaves (feature == -1) hold the action. act() is generated Python code
+    specialized to the tree, predict() a vectorized batch traversal.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray):
+        """
+        Initialize the policy and compile act().
+
+        Args:
+            feature: Split feature per node (-1 for leaves)
+            threshold: Split threshold per node
+            left: Left child per node (-1 for leaves)
+            right: Right child per node (-1 for leaves)
+            value: Action per node (used at leaves)
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.act = self._compile()
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def depth(self) -> int:
+        depths = np.zeros(self.n_nodes, dtype=np.int64)
+        for node in range(self.n_nodes):
+            if self.feature[node] != LEAF:
+                depths[self.left[node]] = depths[self.right[node]] = depths[node] + 1
+        return int(depths.max())
+
+    def _compile(self):
+        """Generate act(state) as nested if/else over the tree."""
+        lines = [
+            "def act(s):",
+            "    if s.__class__ is _ndarray:",
+            "        s = s.tolist()",
+        ]
+
+        def emit(node: int, indent: str):
+            if self.feature[node] == LEAF:
+                lines.append(f"{indent}return {int(self.value[node])}")
+                return
+            lines.append(f"{indent}if s[{int(self.feature[node])}] <= {float(self.threshold[node])!r}:")
+            emit(int(self.left[node]), indent + "    ")
+            lines.append(f"{indent}else:")
+            emit(int(self.right[node]), indent + "    ")
+
+        emit(0, "    ")
+        namespace = {'_ndarray': np.ndarray}
+        exec(compile("\n".join(lines), "<distilled_policy>", "exec"), namespace)
+        return namespace['act']
+
+    def predict(self, states: np.ndarray) -> np.ndarray:
+        """
+        Actions for a batch of states.
+
+        Args:
+            states: States of shape [n, state_dim]
+
+        Returns:
+            Actions of shape [n]
+        """
+        states = np.asarray(states)
+        nodes = np.zeros(len(states), dtype=np.int64)
+        rows = np.arange(len(states))
+        while True:
+            internal = self.feature[nodes] != LEAF
+            if not internal.any():
+                return self.value[nodes]
+            f = np.where(internal, self.feature[nodes], 0)
+            go_left = states[rows, f] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, self.left[nodes], self.right[nodes]), nodes)
+
+    def agreement(self, states: np.ndarray, teacher_actions: np.ndarray) -> float:
+        """Fraction of states on which the tree picks the teacher's action."""
+        return float(np.mean(self.predict(states) == teacher_actions))
+
+    def save(self, filepath: str):
+        """Save the tree arrays to an .npz file."""
+        np.savez(filepath, feature=self.feature, threshold=self.threshold,
+                 left=self.left, right=self.right, value=self.value)
+        logger.info(f"Distilled policy saved to {filepath} ({self.n_nodes} nodes, depth {self.depth})")
+
+    @classmethod
+    def load(cls, filepath: str) -> 'DistilledPolicy':
+        """Load a tree written by save()."""
+        data = np.load(filepath)
+        return cls(data['feature'], data['threshold'], data['left'], data['right'], data['value'])
+
+
+def teacher_actions(network, states: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    """
+    Greedy actions of a PPONetwork (argmax logits) or QNetwork (argmax Q).
+
+    Args:
+        network: Trained torch network
+        states: States of shape [n, state_dim]
+        batch_size: States per forward pass
+
+    Returns:
+        Actions of shape [n]
+    """
+    import torch
+
+    actions = np.empty(len(states), dtype=np.int64)
+    with torch.no_grad():
+        for start in range(0, len(states), batch_size):
+            batch = torch.from_numpy(np.ascontiguousarray(states[start:start + batch_size], dtype=np.float32))
+            output = network(batch)
+            scores = output[0] if isinstance(output, tuple) else output
+            actions[start:start + batch_size] = scores.argmax(dim=-1).numpy()
+    return actions
+
+
+def sample_states(traces: List[np.ndarray], n_states: int, n_envs: int = 256,
+                  seed: Optional[int] = None) -> np.ndarray:
+    """
+    Collect FeedbackAnalyzer-style states by replaying traces with random strategies.
+
+    Args:
+        traces: Trace arrays (see replay_simulator.load_traces)
+        n_states: Number of states to collect
+        n_envs: Simulated instances per step
+        seed: Random seed
+
+    Returns:
+        States of shape [n_states, 10]
+    """
+    from replay_simulator import ReplaySimulator
+
+    sim = ReplaySimulator(traces, n_envs=n_envs, seed=seed)
+    rng = np.random.default_rng(seed)
+
+    states = np.empty((n_states, sim.observation_dim), dtype=np.float32)
+    obs = sim.reset()
+    filled = 0
+    while filled < n_states:
+        take = min(n_envs, n_states - filled)
+        states[filled:filled + take] = obs[:take]
+        filled += take
+        obs, _, _, _ = sim.step(rng.integers(0, sim.num_actions, n_envs))
+    return states
+
+
+def distill(network, states: np.ndarray, n_actions: int, max_depth: int = 8,
+            min_samples_leaf: int = 5, holdout: float = 0.2,
+            seed: Optional[int] = None) -> Tuple[DistilledPolicy, Dict]:
+    """
+    Distill a network into a decision tree and report how faithful it is.
+
+    Args:
+        network: Trained PPONetwork or QNetwork
+        states: States to label with the network's greedy actions
+        n_actions: Number of actions
+        max_depth: Maximum tree depth
+        min_samples_leaf: Minimum samples per leaf
+        holdout: Fraction of states held out for the agreement estimate
+        seed: Seed for the train/holdout split
+
+    Returns:
+        Tuple of (policy, report)
+    """
+    labels = teacher_actions(network, states)
+
+    order = np.random.default_rng(seed).permutation(len(states))
+    n_test = int(len(states) * holdout)
+    test, train = order[:n_test], order[n_test:]
+
+    start = time.perf_counter()
+    policy = fit_decision_tree(states[train], labels[train], n_actions, max_depth, min_samples_leaf)
+    fit_time = time.perf_counter() - start
+
+    sample = states[0]
+    iterations = 100000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        policy.act(sample)
+    act_ns = (time.perf_counter() - start) / iterations * 1e9
+
+    report = {
+        'train_agreement': policy.agreement(states[train], labels[train]),
+        'holdout_agreement': policy.agreement(states[test], labels[test]) if n_test else float('nan'),
+        'n_nodes': policy.n_nodes,
+        'depth': policy.depth,
+        'fit_seconds': fit_time,
+        'act_ns': act_ns,
+    }
+    return policy, report
+
+
+def main():
+    """Main entry point: distill an agent checkpoint into a decision tree."""
+    import argparse
+    import torch
+
+    parser = argparse.ArgumentParser(description='Distill a trained agent into a decision tree')
+    parser.add_argument('agent', help='Agent checkpoint (agent.pt from PPOAgent or DQNAgent)')
+    parser.add_argument('traces', nargs='+', help='plot_data / metrics_history.json / metrics_log.bin files or directories')
+    parser.add_argument('--output', '-o', default='distilled_policy.npz', help='Where to save the tree')
+    parser.add_argument('--states', type=int, default=200000, help='States to sample')
+    parser.add_argument('--max-depth', type=int, default=8, help='Maximum tree depth')
+    parser.add_argument('--min-samples-leaf', type=int, default=5, help='Minimum samples per leaf')
+    parser.add_argument('--hidden-dim', type=int, default=128, help='Hidden size of the agent network')
+    parser.add_argument('--interval', type=float, default=300.0, help='Seconds between metrics_history samples')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+
+    args = parser.parse_args()
+
+    from replay_simulator import load_traces
+    from mutation_selector import MutationStrategy
+
+    n_actions = len(MutationStrategy)
+    checkpoint = torch.load(args.agent, map_location='cpu')
+    if checkpoint.get('algorithm') == 'dqn':
+        from dqn_agent import QNetwork
+        network = QNetwork(10, n_actions, args.hidden_dim)
+    else:
+        from ppo_agent import PPONetwork
+        network = PPONetwork(10, n_actions, args.hidden_dim)
+    network.load_state_dict(checkpoint['network_state_dict'])
+    network.eval()
+
+    states = sample_states(load_traces(args.traces, args.interval), args.states, seed=args.seed)
+    policy, report = distill(network, states, n_actions, args.max_depth, args.min_samples_leaf, seed=args.seed)
+
+    logger.info(f"Agreement: {report['train_agreement']*100:.2f}% train, "
+               f"{report['holdout_agreement']*100:.2f}% held out")
+    logger.info(f"Tree: {report['n_nodes']} nodes, depth {report['depth']}, "
+               f"fitted in {report['fit_seconds']:.1f}s, act() {report['act_ns']:.0f} ns")
+
+    policy.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Policy Export Pipeline
+Builds CPU-optimized inference variants of PPONetwork:
+
+- eager:     the PPONetwork module itself
+- scripted:  TorchScript-compiled and frozen (weights folded into the graph)
+- quantized: int8 dynamically quantized Linear layers, then scripted and frozen
+
+Every variant maps a state batch to (action_logits, state_value), so callers
+can swap them behind PPOAgent.select_action. PPOAgent.save exports the
+variant an agent acts with next to its checkpoint (exported_path), and
+PPOAgent.load(variant=...) acts from that file instead of rebuilding it.
+"""
+
+import copy
+import warnings
+from pathlib import Path
+from typing import Dict, Sequence, Union
+
+import torch
+import torch.nn as nn
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+VARIANTS = ('eager', 'scripted', 'quantized')
+
+
+def _script_and_freeze(module: nn.Module) -> torch.jit.ScriptModule:
+    """Compile a module with TorchScript and freeze its parameters."""
+    with warnings.catch_warnings():
+        # torch.jit is deprecated in recent releases but still the lightest
+        # ahead-of-time path for small CPU models
+        warnings.simplefilter('ignore', FutureWarning)
+        warnings.simplefilter('ignore', DeprecationWarning)
+        scripted = torch.jit.script(module.eval())
+        return torch.jit.freeze(scripted)
+
+
+def quantize_network(network: nn.Module) -> nn.Module:
+    """
+    Return an int8 dynamically quantized copy of the network.
+
+    Only Linear layers are quantized; activations are quantized on the fly.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        warnings.simplefilter('ignore', UserWarning)
+        return torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(network).cpu().eval(), {nn.Linear}, dtype=torch.qint8
+        )
+
+
+def build_variant(network: nn.Module, variant: str = 'eager') -> nn.Module:
+    """
+    Build an inference variant of a PPONetwork.
+
+    Args:
+        network: Source PPONetwork (left unchanged)
+        variant: One of 'eager', 'scripted', 'quantized'
+
+    Returns:
+        Module whose forward returns (action_logits, state_value)
+    """
+    if variant == 'eager':
+        return network
+    if variant == 'scripted':
+        return _script_and_freeze(copy.deepcopy(network).cpu())
+    if variant == 'quantized':
+        return _script_and_freeze(quantize_network(network))
+
+    raise ValueError(f"Unknown policy variant '{variant}', expected one of {VARIANTS}")
+
+
+def exported_path(checkpoint: Union[str, Path], variant: str) -> Path:
+    """File export_policy writes a variant to, next to an agent checkpoint (agent.pt -> agent_<variant>.pt)."""
+    checkpoint = Path(checkpoint)
+    return checkpoint.with_name(f"{checkpoint.stem}_{variant}.pt")
+
+
+def export_policy(network: nn.Module, output_dir: str, variants: Sequence[str] = ('scripted', 'quantized'),
+                  stem: str = 'policy') -> Dict[str, Path]:
+    """
+    Write scripted and/or quantized variants of a network to disk.
+
+    Args:
+        network: Source PPONetwork
+        output_dir: Directory to write <stem>_<variant>.pt files into
+        variants: Variants to export
+        stem: File name prefix (the checkpoint's stem for exported_path)
+
+    Returns:
+        Dictionary mapping variant name to file path
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {}
+    for variant in variants:
+        path = output_dir / f"{stem}_{variant}.pt"
+        module = build_variant(network, variant)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            torch.jit.save(module, str(path))
+        paths[variant] = path
+        logger.info(f"Exported {variant} policy to {path}")
+
+    return paths
+
+
+def load_exported(filepath: str) -> torch.jit.ScriptModule:
+    """Load a policy written by export_policy (CPU only)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        return torch.jit.load(str(filepath), map_location='cpu')
@@ -0,0 +1,269 @@
+"""
+Policy Warm-Start Library
+Stores trained agents (agent.pt) indexed by target fingerprint (binary hash,
+benchmark name, input type) so new campaigns on the same or similar targets
+start from the closest previously trained policy instead of random weights.
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+GENERIC_ID = "generic"
+
+# Match score per fingerprint field; the highest-scoring entry wins
+MATCH_WEIGHTS = {
+    'binary_hash': 4,
+    'benchmark': 2,
+    'input_type': 1,
+}
+
+# Fingerprint fields describing the network; entries that disagree on one cannot be loaded
+SHAPE_FIELDS = ('hidden_dim',)
+
+
+def hash_file(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detect_input_type(input_dir: str) -> str:
+    """
+    Guess the input type of a seed corpus from its file extensions.
+
+    Returns:
+        The most common extension (without the dot), or 'raw' if seeds have none
+    """
+    counts: Dict[str, int] = {}
+    for path in Path(input_dir).iterdir():
+        if path.is_file():
+            suffix = path.suffix.lstrip('.').lower() or 'raw'
+            counts[suffix] = counts.get(suffix, 0) + 1
+    if not counts:
+        return 'raw'
+    return max(counts, key=counts.get)
+
+
+def target_fingerprint(binary_path: str, benchmark: Optional[str] = None,
+                       input_dir: Optional[str] = None, input_type: Optional[str] = None) -> Dict[str, str]:
+    """
+    Build the fingerprint of a fuzzing target.
+
+    Args:
+        binary_path: Path to the target binary
+        benchmark: Benchmark name (defaults to the binary's file name)
+        input_dir: Seed corpus, used to detect the input type
+        input_type: Explicit input type (overrides detection)
+
+    Returns:
+        Dictionary with binary_hash, benchmark and input_type
+    """
+    if input_type is None:
+        input_type = detect_input_type(input_dir) if input_dir else 'raw'
+
+    return {
+        'binary_hash': hash_file(binary_path),
+        'benchmark': benchmark or Path(binary_path).name,
+        'input_type': input_type,
+    }
+
+
+class PolicyLibrary:
+    """
+    On-disk library of trained agents keyed by target fingerprint.
+
+    Layout: <root>/index.json plus one <entry id>.pt per stored agent.
+    The index is guarded by an flock so concurrent controllers can share
+    a library. The least recently used entries are evicted beyond
+    max_entries or max_bytes; generic priors are never evicted.
+    """
+
+    def __init__(self, root_dir: str, max_entries: int = 64, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the library.
+
+        Args:
+            root_dir: Library directory (created if missing)
+            max_entries: Maximum number of stored agents, excluding generic priors
+            max_bytes: Maximum total size of stored agents, excluding generic priors
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.root_dir / "index.json"
+        self.lock_file = self.root_dir / ".lock"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the library while reading/writing the index."""
+        with open(self.lock_file, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self) -> Dict[str, Dict]:
+        if not self.index_file.exists():
+            return {}
+        with open(self.index_file) as f:
+            return json.load(f)
+
+    def _write_index(self, index: Dict[str, Dict]):
+        tmp_file = self.index_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_file, self.index_file)
+
+    def entries(self) -> List[Dict]:
+        """Return all index entries."""
+        with self._locked():
+            return list(self._read_index().values())
+
+    @staticmethod
+    def _entry_id(fingerprint: Dict[str, str]) -> str:
+        key = '|'.join(f"{k}={fingerprint.get(k, '')}" for k in sorted(MATCH_WEIGHTS))
+        if fingerprint.get('algorithm', 'ppo') != 'ppo':
+            key += f"|algorithm={fingerprint['algorithm']}"
+        for field in SHAPE_FIELDS:
+            if field in fingerprint:
+                key += f"|{field}={fingerprint[field]}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _generic_id(algorithm: str) -> str:
+        return GENERIC_ID if algorithm == 'ppo' else f"{GENERIC_ID}_{algorithm}"
+
+    def add(self, agent_path: str, fingerprint: Dict[str, str], metrics: Optional[Dict] = None) -> str:
+        """
+        Store an agent under a fingerprint, replacing any entry with the same fingerprint.
+
+        Args:
+            agent_path: Path to an agent.pt written by PPOAgent.save
+            fingerprint: Target fingerprint (see target_fingerprint)
+            metrics: Optional summary of the campaign that produced the agent
+
+        Returns:
+            Entry id
+        """
+        entry_id = self._entry_id(fingerprint)
+        return self._store(entry_id, agent_path, fingerprint, metrics)
+
+    def set_generic(self, agent_path: str, metrics: Optional[Dict] = None, algorithm: str = 'ppo',
+                    hidden_dim: Optional[int] = None) -> str:
+        """Store the generic prior used when nothing matches (one per learning algorithm)."""
+        fingerprint = {'algorithm': algorithm}
+        if hidden_dim is not None:
+            fingerprint['hidden_dim'] = hidden_dim
+        return self._store(self._generic_id(algorithm), agent_path, fingerprint, metrics)
+
+    def _store(self, entry_id: str, agent_path: str, fingerprint: Dict[str, str],
+               metrics: Optional[Dict]) -> str:
+        dest = self.root_dir / f"{entry_id}.pt"
+
+        with self._locked():
+            tmp_dest = dest.with_suffix('.tmp')
+            shutil.copyfile(agent_path, tmp_dest)
+            os.replace(tmp_dest, dest)
+
+            now = time.time()
+            index = self._read_index()
+            index[entry_id] = {
+                'id': entry_id,
+                'fingerprint': fingerprint,
+                'path': dest.name,
+                'size': dest.stat().st_size,
+                'created': now,
+                'last_used': now,
+                'metrics': metrics or {},
+            }
+            self._evict(index)
+            self._write_index(index)
+
+        logger.info(f"Stored policy {entry_id} in library ({fingerprint.get('benchmark', 'generic')})")
+        return entry_id
+
+    def _evict(self, index: Dict[str, Dict]):
+        """Drop least recently used entries beyond the count and size limits (lock held)."""
+        candidates = sorted((e for e in index.values() if not e['id'].startswith(GENERIC_ID)),
+                            key=lambda e: e['last_used'])
+        total_bytes = sum(e['size'] for e in candidates)
+
+        while candidates and (len(candidates) > self.max_entries or total_bytes > self.max_bytes):
+            victim = candidates.pop(0)
+            total_bytes -= victim['size']
+            del index[victim['id']]
+            (self.root_dir / victim['path']).unlink(missing_ok=True)
+            logger.info(f"Evicted policy {victim['id']} from library")
+
+    @staticmethod
+    def match_score(entry_fingerprint: Dict[str, str], fingerprint: Dict[str, str]) -> int:
+        """Weighted number of fingerprint fields that agree."""
+        return sum(weight for field, weight in MATCH_WEIGHTS.items()
+                   if entry_fingerprint.get(field) and entry_fingerprint.get(field) == fingerprint.get(field))
+
+    @staticmethod
+    def shape_matches(entry_fingerprint: Dict, fingerprint: Dict) -> bool:
+        """Whether the network shape fields recorded in both fingerprints agree."""
+        return all(entry_fingerprint[field] == fingerprint[field] for field in SHAPE_FIELDS
+                   if field in entry_fingerprint and field in fingerprint)
+
+    def lookup(self, fingerprint: Dict[str, str]) -> Optional[Path]:
+        """
+        Find the closest stored agent for a fingerprint.
+
+        Only agents of the same learning algorithm and network shape are
+        considered. The entry with the highest match score wins (most recent
+        on ties); if nothing matches, the generic prior is returned if one
+        exists.
+
+        Args:
+            fingerprint: Target fingerprint, optionally with an 'algorithm' key
+                (default 'ppo') and SHAPE_FIELDS
+
+        Returns:
+            Path to the agent checkpoint, or None if the library has nothing usable
+        """
+        algorithm = fingerprint.get('algorithm', 'ppo')
+
+        with self._locked():
+            index = self._read_index()
+
+            best, best_key = None, (0, 0.0)
+            for entry in index.values():
+                if (entry['id'].startswith(GENERIC_ID)
+                        or entry['fingerprint'].get('algorithm', 'ppo') != algorithm
+                        or not self.shape_matches(entry['fingerprint'], fingerprint)):
+                    continue
+                key = (self.match_score(entry['fingerprint'], fingerprint), entry['created'])
+                if key[0] > 0 and key > best_key:
+                    best, best_key = entry, key
+
+            if best is None:
+                best = index.get(self._generic_id(algorithm))
+                if best is not None and not self.shape_matches(best['fingerprint'], fingerprint):
+                    best = None
+            if best is None:
+                return None
+
+            best['last_used'] = time.time()
+            self._write_index(index)
+
+        logger.info(f"Policy library match: {best['id']} (score {best_key[0]})")
+        return self.root_dir / best['path']
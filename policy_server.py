@@ -0,0 +1,357 @@
+"""
+Batched Policy Inference Server
+Hosts a single PPONetwork for many fuzzing controllers on the same machine.
+Controllers send select_action requests over a Unix socket; the server
+micro-batches pending requests into one forward pass, bounded by a
+configurable batch size and latency.
+
+The client side (PolicyClient) only needs the standard library and NumPy,
+so controllers using it never load torch.
+"""
+
+import os
+import time
+import socket
+import struct
+import selectors
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SOCKET_PATH = "/tmp/fuzzmaster-policy.sock"
+
+# Wire format (little endian, fixed size per connection):
+#   request:  uint8 deterministic flag, then state_dim float32 values
+#   response: int32 action, float32 log_prob, float32 value
+REQUEST_HEADER = struct.Struct('<B')
+RESPONSE = struct.Struct('<iff')
+HANDSHAKE = struct.Struct('<II')  # state_dim, action_dim sent by the server on connect
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    """Receive exactly n bytes from a blocking socket."""
+    chunks = []
+    remaining = n
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("Policy server connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+class PolicyServer:
+    """
+    Serves PPONetwork inference to many controllers with micro-batching.
+    """
+
+    def __init__(
+        self,
+        state_dim: int,
+        action_dim: int,
+        hidden_dim: int = 128,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        weights_path: Optional[str] = None,
+        max_batch: int = 64,
+        max_latency_ms: float = 2.0,
+        reload_interval: float = 5.0
+    ):
+        """
+        Initialize the policy server.
+
+        Args:
+            state_dim: Dimension of the state space
+            action_dim: Number of actions (mutation strategies)
+            hidden_dim: Hidden layer size
+            socket_path: Unix socket path to listen on
+            weights_path: Optional agent checkpoint (agent.pt) to serve
+            max_batch: Maximum number of requests per forward pass
+            max_latency_ms: Maximum time a request waits for its batch to fill
+            reload_interval: Seconds between checks for updated weights
+        """
+        import torch
+        from ppo_agent import PPONetwork
+
+        self.torch = torch
+        self.state_dim = state_dim
+        self.action_dim = action_dim
+        self.socket_path = socket_path
+        self.weights_path = weights_path
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.reload_interval = reload_interval
+
+        self.network = PPONetwork(state_dim, action_dim, hidden_dim)
+        self.network.eval()
+        self._weights_mtime = None
+        if weights_path:
+            self.reload_weights()
+
+        self.request_size = REQUEST_HEADER.size + 4 * state_dim
+        self.selector = selectors.DefaultSelector()
+        self.server_socket: Optional[socket.socket] = None
+        self.running = False
+
+        # Per-connection receive buffers and pending requests
+        self._recv_buffers: Dict[socket.socket, bytearray] = {}
+        self._pending: List[Tuple[socket.socket, bool, bytes]] = []
+        self._oldest_pending = 0.0
+
+        # Preallocated batch input
+        self._batch_states = np.zeros((max_batch, state_dim), dtype=np.float32)
+        self._batch_tensor = torch.from_numpy(self._batch_states)
+
+        # Statistics
+        self.requests_served = 0
+        self.batches_run = 0
+
+        logger.info(f"Policy server configured: max_batch={max_batch}, "
+                   f"max_latency={max_latency_ms}ms")
+
+    def reload_weights(self) -> bool:
+        """
+        Load weights from weights_path if the file changed since the last load.
+
+        Returns:
+            True if new weights were loaded
+        """
+        if not self.weights_path or not os.path.exists(self.weights_path):
+            return False
+
+        mtime = os.stat(self.weights_path).st_mtime_ns
+        if mtime == self._weights_mtime:
+            return False
+
+        checkpoint = self.torch.load(self.weights_path, map_location='cpu')
+        self.network.load_state_dict(checkpoint['network_state_dict'])
+        self._weights_mtime = mtime
+        logger.info(f"Policy weights loaded from {self.weights_path}")
+        return True
+
+    def start(self):
+        """Bind the Unix socket and start accepting controllers."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server_socket.bind(self.socket_path)
+        self.server_socket.listen(256)
+        self.server_socket.setblocking(False)
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.running = True
+
+        logger.info(f"Policy server listening on {self.socket_path}")
+
+    def _accept(self):
+        """Accept a new controller connection and send the handshake."""
+        conn, _ = self.server_socket.accept()
+        conn.sendall(HANDSHAKE.pack(self.state_dim, self.action_dim))
+        conn.setblocking(False)
+        self._recv_buffers[conn] = bytearray()
+        self.selector.register(conn, selectors.EVENT_READ)
+
+    def _close(self, conn: socket.socket):
+        """Drop a controller connection."""
+        if conn not in self._recv_buffers:
+            return
+        self.selector.unregister(conn)
+        self._recv_buffers.pop(conn, None)
+        self._pending = [p for p in self._pending if p[0] is not conn]
+        conn.close()
+
+    def _read(self, conn: socket.socket):
+        """Read available bytes from a connection and queue complete requests."""
+        try:
+            data = conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+
+        if not data:
+            self._close(conn)
+            return
+
+        buf = self._recv_buffers[conn]
+        buf.extend(data)
+
+        while len(buf) >= self.request_size:
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            deterministic = bool(buf[0])
+            self._pending.append((conn, deterministic, bytes(buf[REQUEST_HEADER.size:self.request_size])))
+            del buf[:self.request_size]
+
+    def _flush(self):
+        """Run one batched forward pass over pending requests and reply."""
+        torch = self.torch
+        batch = self._pending[:self.max_batch]
+        self._pending = self._pending[self.max_batch:]
+        if self._pending:
+            self._oldest_pending = time.monotonic()
+
+        n = len(batch)
+        for i, (_, _, payload) in enumerate(batch):
+            self._batch_states[i] = np.frombuffer(payload, dtype=np.float32)
+
+        deterministic = torch.tensor([b[1] for b in batch])
+
+        with torch.no_grad():
+            action_logits, values = self.network.forward(self._batch_tensor[:n])
+            dist = torch.distributions.Categorical(logits=action_logits)
+            actions = torch.where(deterministic, torch.argmax(action_logits, dim=-1), dist.sample())
+            log_probs = dist.log_prob(actions)
+
+        actions = actions.tolist()
+        log_probs = log_probs.tolist()
+        values = values.squeeze(-1).tolist()
+
+        for i, (conn, _, _) in enumerate(batch):
+            try:
+                conn.sendall(RESPONSE.pack(actions[i], log_probs[i], values[i]))
+            except OSError:
+                self._close(conn)
+
+        self.requests_served += n
+        self.batches_run += 1
+
+    def serve_forever(self):
+        """Main loop: gather requests and flush batches within the latency bound."""
+        if not self.running:
+            self.start()
+
+        last_reload_check = time.monotonic()
+
+        try:
+            while self.running:
+                if self._pending:
+                    timeout = max(self._oldest_pending + self.max_latency - time.monotonic(), 0.0)
+                else:
+                    timeout = self.reload_interval
+
+                for key, _ in self.selector.select(timeout):
+                    if key.fileobj is self.server_socket:
+                        self._accept()
+                    else:
+                        self._read(key.fileobj)
+
+                now = time.monotonic()
+                while self._pending and (len(self._pending) >= self.max_batch or
+                                         now - self._oldest_pending >= self.max_latency):
+                    self._flush()
+
+                if now - last_reload_check >= self.reload_interval:
+                    self.reload_weights()
+                    last_reload_check = now
+
+        except KeyboardInterrupt:
+            logger.info("Policy server interrupted")
+
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Close all connections and remove the socket file."""
+        self.running = False
+        for conn in list(self._recv_buffers):
+            self._close(conn)
+        if self.server_socket:
+            self.selector.unregister(self.server_socket)
+            self.server_socket.close()
+            self.server_socket = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+        logger.info(f"Policy server stopped ({self.requests_served} requests, "
+                   f"{self.batches_run} batches)")
+
+
+class PolicyClient:
+    """
+    Controller-side handle to a PolicyServer.
+
+    Exposes the acting half of the PPOAgent interface. Log probability and
+    value of the last action are kept for callers that record trajectories.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 10.0):
+        """
+        Connect to a running policy server.
+
+        Args:
+            socket_path: Unix socket path of the server
+            timeout: Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+
+        self.state_dim, self.action_dim = HANDSHAKE.unpack(_recv_exact(self.sock, HANDSHAKE.size))
+        self._request = bytearray(REQUEST_HEADER.size + 4 * self.state_dim)
+        self._request_states = np.frombuffer(self._request, dtype=np.float32, offset=REQUEST_HEADER.size)
+
+        self.last_log_prob = 0.0
+        self.last_value = 0.0
+
+        logger.info(f"Connected to policy server at {socket_path}")
+
+    def select_action(self, state: np.ndarray, deterministic: bool = False) -> int:
+        """
+        Request an action from the server.
+
+        Args:
+            state: Current state observation
+            deterministic: Whether to act deterministically
+
+        Returns:
+            Selected action index
+        """
+        self._request[0] = 1 if deterministic else 0
+        self._request_states[:] = np.asarray(state, dtype=np.float32).reshape(-1)
+        self.sock.sendall(self._request)
+
+        action, self.last_log_prob, self.last_value = RESPONSE.unpack(
+            _recv_exact(self.sock, RESPONSE.size)
+        )
+        return action
+
+    def close(self):
+        """Close the connection to the server."""
+        self.sock.close()
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Batched PPO policy inference server')
+    parser.add_argument('--socket', '-s', default=DEFAULT_SOCKET_PATH, help='Unix socket path')
+    parser.add_argument('--weights', '-w', help='Agent checkpoint (agent.pt) to serve')
+    parser.add_argument('--state-dim', type=int, default=10, help='State dimension')
+    parser.add_argument('--action-dim', type=int, default=8, help='Number of actions')
+    parser.add_argument('--hidden-dim', type=int, default=128, help='Hidden layer size')
+    parser.add_argument('--max-batch', type=int, default=64, help='Maximum requests per forward pass')
+    parser.add_argument('--max-latency-ms', type=float, default=2.0, help='Batching latency bound in ms')
+
+    args = parser.parse_args()
+
+    server = PolicyServer(
+        state_dim=args.state_dim,
+        action_dim=args.action_dim,
+        hidden_dim=args.hidden_dim,
+        socket_path=args.socket,
+        weights_path=args.weights,
+        max_batch=args.max_batch,
+        max_latency_ms=args.max_latency_ms
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Torch-free Policy Snapshot
+Exports the weights of a PPONetwork as NumPy arrays and runs actor
+inference with NumPy only. Controllers that only act between updates can
+use a snapshot instead of PPOAgent and never import torch.
+"""
+
+import io
+import numpy as np
+from typing import Dict, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Linear layers of PPONetwork, in forward order
+LAYER_NAMES = ('shared_fc1', 'shared_fc2', 'actor_fc', 'actor_out', 'critic_fc', 'critic_out')
+
+
+def sample_categorical(probs: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Sample actions by inverse CDF.
+
+    Mirrors ppo_agent.sample_categorical (which PPOAgent.select_action uses):
+    given the same probabilities and uniform draws, both return the same
+    actions. Both compare in float32.
+
+    Args:
+        probs: Action probabilities of shape [batch, action_dim]
+        uniforms: Uniform draws in [0, 1) of shape [batch]
+
+    Returns:
+        Sampled action indices of shape [batch]
+    """
+    cdf = np.cumsum(probs, axis=-1, dtype=np.float32)
+    actions = (cdf < (np.asarray(uniforms, dtype=np.float32)[:, None] * cdf[:, -1:])).sum(axis=-1)
+    return np.minimum(actions, probs.shape[-1] - 1)
+
+
+class PolicySnapshot:
+    """
+    NumPy inference copy of a PPONetwork.
+
+    Weights are stored transposed ([in, out]) and contiguous so each layer is
+    a single matmul plus bias.
+    """
+
+    def __init__(self, weights: Dict[str, np.ndarray], seed: Optional[int] = None):
+        """
+        Initialize the snapshot.
+
+        Args:
+            weights: Mapping of '<layer>.weight' ([out, in]) and '<layer>.bias'
+                arrays, as in PPONetwork.state_dict()
+            seed: Seed for the sampling RNG
+        """
+        self.layers = {}
+        for name in LAYER_NAMES:
+            weight = np.asarray(weights[f'{name}.weight'], dtype=np.float32)
+            bias = np.asarray(weights[f'{name}.bias'], dtype=np.float32)
+            self.layers[name] = (np.ascontiguousarray(weight.T), bias)
+
+        self.state_dim = self.layers['shared_fc1'][0].shape[0]
+        self.action_dim = self.layers['actor_out'][0].shape[1]
+        self.rng = np.random.default_rng(seed)
+
+        self.last_log_prob = 0.0
+        self.last_value = 0.0
+
+    @classmethod
+    def from_network(cls, network, seed: Optional[int] = None) -> 'PolicySnapshot':
+        """
+        Create a snapshot from a live PPONetwork.
+
+        Args:
+            network: PPONetwork instance
+            seed: Seed for the sampling RNG
+
+        Returns:
+            PolicySnapshot with copies of the current weights
+        """
+        weights = {key: value.detach().cpu().numpy().copy()
+                   for key, value in network.state_dict().items()}
+        return cls(weights, seed=seed)
+
+    @classmethod
+    def load(cls, filepath: str, seed: Optional[int] = None) -> 'PolicySnapshot':
+        """Load a snapshot saved with save()."""
+        with np.load(filepath) as data:
+            weights = {key: data[key] for key in data.files}
+        logger.info(f"Policy snapshot loaded from {filepath}")
+        return cls(weights, seed=seed)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, seed: Optional[int] = None) -> 'PolicySnapshot':
+        """Create a snapshot from the output of to_bytes()."""
+        with np.load(io.BytesIO(payload)) as data:
+            weights = {key: data[key] for key in data.files}
+        return cls(weights, seed=seed)
+
+    def _write(self, f):
+        """Write the weights in .npz format to an open binary file."""
+        arrays = {}
+        for name, (weight_t, bias) in self.layers.items():
+            arrays[f'{name}.weight'] = weight_t.T
+            arrays[f'{name}.bias'] = bias
+        np.savez(f, **arrays)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the snapshot weights (.npz format) for sending to another process."""
+        buf = io.BytesIO()
+        self._write(buf)
+        return buf.getvalue()
+
+    def save(self, filepath: str):
+        """Save the snapshot weights to an .npz file."""
+        with open(filepath, 'wb') as f:
+            self._write(f)
+        logger.info(f"Policy snapshot saved to {filepath}")
+
+    def _linear(self, name: str, x: np.ndarray) -> np.ndarray:
+        weight_t, bias = self.layers[name]
+        return x @ weight_t + bias
+
+    def forward(self, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Forward pass, mirroring PPONetwork.forward.
+
+        Args:
+            states: States of shape [batch, state_dim]
+
+        Returns:
+            Tuple of (action_logits [batch, action_dim], state_values [batch, 1])
+        """
+        x = np.maximum(self._linear('shared_fc1', states), 0.0)
+        x = np.maximum(self._linear('shared_fc2', x), 0.0)
+
+        actor = np.maximum(self._linear('actor_fc', x), 0.0)
+        action_logits = self._linear('actor_out', actor)
+
+        critic = np.maximum(self._linear('critic_fc', x), 0.0)
+        state_value = self._linear('critic_out', critic)
+
+        return action_logits, state_value
+
+    def get_action(
+        self,
+        states: np.ndarray,
+        deterministic: bool = False,
+        uniforms: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Select actions, mirroring PPONetwork.get_action for a batch of states.
+
+        Args:
+            states: States of shape [batch, state_dim]
+            deterministic: If True, select the most probable action
+            uniforms: Optional uniform draws for sampling; drawn from the
+                snapshot's RNG if not given
+
+        Returns:
+            Tuple of (actions, log_probs, values), each of shape [batch]
+        """
+        action_logits, values = self.forward(states)
+
+        shifted = action_logits - action_logits.max(axis=-1, keepdims=True)
+        exp = np.exp(shifted)
+        sum_exp = exp.sum(axis=-1, keepdims=True)
+
+        if deterministic:
+            actions = np.argmax(action_logits, axis=-1)
+        else:
+            if uniforms is None:
+                uniforms = self.rng.random(len(states))
+            actions = sample_categorical(exp / sum_exp, uniforms)
+
+        log_probs = (shifted - np.log(sum_exp))[np.arange(len(actions)), actions]
+
+        return actions, log_probs, values[:, 0]
+
+    def select_action(self, state: np.ndarray, deterministic: bool = False) -> int:
+        """
+        Select an action for a single state (actor-only PPOAgent interface).
+
+        Args:
+            state: Current state observation
+            deterministic: Whether to act deterministically
+
+        Returns:
+            Selected action index
+        """
+        states = np.asarray(state, dtype=np.float32).reshape(1, self.state_dim)
+        actions, log_probs, values = self.get_action(states, deterministic)
+
+        self.last_log_prob = float(log_probs[0])
+        self.last_value = float(values[0])
+
+        return int(actions[0])
@@ -4,13 +4,17 @@ This module implements the Proximal Policy Optimization agent that learns
 to optimize mutation strategies for fuzzing.
 """
 
+import copy
+import time
+import threading
+from pathlib import Path
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
 from torch.distributions import Categorical
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import logging
 
 # Configure logging
@@ -18,6 +22,25 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def sample_categorical(probs: torch.Tensor, uniforms: torch.Tensor) -> torch.Tensor:
+    """
+    Sample actions by inverse CDF (torch counterpart of policy_snapshot.sample_categorical).
+
+    Given the same probabilities and uniform draws, both return the same
+    actions, so the torch and NumPy acting paths agree under one seed.
+
+    Args:
+        probs: Action probabilities of shape [batch, action_dim]
+        uniforms: Uniform draws in [0, 1) of shape [batch]
+
+    Returns:
+        Sampled action indices of shape [batch]
+    """
+    cdf = torch.cumsum(probs, dim=-1)
+    actions = (cdf < (uniforms.to(cdf)[:, None] * cdf[:, -1:])).sum(dim=-1)
+    return actions.clamp(max=probs.shape[-1] - 1)
+
+
 class PPONetwork(nn.Module):
     """
     Neural network for PPO agent with separate actor and critic heads.
@@ -88,28 +111,33 @@ class PPONetwork(nn.Module):
         
         return action_logits, state_value
     
-    def get_action(self, state: torch.Tensor, deterministic: bool = False) -> Tuple[int, torch.Tensor, torch.Tensor]:
+    def get_action(self, state: torch.Tensor, deterministic: bool = False,
+                   uniforms: Optional[torch.Tensor] = None) -> Tuple[int, torch.Tensor, torch.Tensor]:
         """
         Sample an action from the policy.
         
         Args:
             state: Current state
             deterministic: If True, select the most probable action
+            uniforms: Optional uniform draw(s) for inverse-CDF sampling;
+                drawn from torch's RNG if not given
             
         Returns:
             Tuple of (action, log_prob, value)
         """
         action_logits, value = self.forward(state)
         action_probs = F.softmax(action_logits, dim=-1)
+        dist = Categorical(action_probs)
         
         if deterministic:
             action = torch.argmax(action_probs, dim=-1)
-            dist = Categorical(action_probs)
-            log_prob = dist.log_prob(action)
         else:
-            dist = Categorical(action_probs)
-            action = dist.sample()
-            log_prob = dist.log_prob(action)
+            probs = action_probs.reshape(-1, action_probs.shape[-1])
+            if uniforms is None:
+                uniforms = torch.rand(probs.shape[0])
+            action = sample_categorical(probs, torch.as_tensor(uniforms).reshape(-1))
+            action = action.reshape(action_probs.shape[:-1])
+        log_prob = dist.log_prob(action)
         
         return action.item(), log_prob, value
     
@@ -134,6 +162,208 @@ class PPONetwork(nn.Module):
         return log_probs, state_values.squeeze(-1), entropy
 
 
+def discounted_scan(deltas: np.ndarray, discounts: np.ndarray) -> np.ndarray:
+    """
+    Solve the reverse recurrence x[t] = deltas[t] + discounts[t] * x[t + 1].
+    
+    Uses a Hillis-Steele prefix scan over the associative operator
+    (c1, d1) o (c2, d2) = (c1 * c2, d1 + c1 * d2), so a rollout of T steps takes
+    ceil(log2(T)) vectorized passes instead of T interpreter iterations. Zero
+    discounts (episode boundaries) are handled exactly, without division.
+    
+    Args:
+        deltas: Array of shape [T, ...]
+        discounts: Array of the same shape as deltas
+        
+    Returns:
+        Array x of the same shape as deltas (freshly allocated)
+    """
+    x = np.array(deltas, dtype=np.float64)
+    c = np.array(discounts, dtype=np.float64)
+    n_steps = x.shape[0]
+    
+    offset = 1
+    while offset < n_steps:
+        # NumPy buffers overlapping operands, so both right-hand sides see
+        # the values from the previous pass
+        x[:-offset] += c[:-offset] * x[offset:]
+        c[:-offset] *= c[offset:]
+        offset *= 2
+    
+    return x
+
+
+def compute_gae_batch(
+    rewards: np.ndarray,
+    values: np.ndarray,
+    dones: np.ndarray,
+    next_value,
+    gamma: float,
+    gae_lambda: float,
+    advantages_out: np.ndarray = None,
+    returns_out: np.ndarray = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized Generalized Advantage Estimation over [T, n_envs] rollouts.
+    
+    Args:
+        rewards: Rewards of shape [T, n_envs]
+        values: Value estimates of shape [T, n_envs]
+        dones: Done flags of shape [T, n_envs]; dones[t] masks the bootstrap
+            from step t + 1 for that environment
+        next_value: Value of the state following the last step, [n_envs] or scalar
+        gamma: Discount factor
+        gae_lambda: GAE lambda parameter
+        advantages_out: Optional array to write advantages into
+        returns_out: Optional array to write returns into
+        
+    Returns:
+        Tuple of (advantages, returns)
+    """
+    rewards = np.asarray(rewards)
+    values = np.asarray(values)
+    next_non_terminal = 1.0 - np.asarray(dones, dtype=np.float64)
+    
+    next_values = np.empty(values.shape, dtype=np.float64)
+    next_values[:-1] = values[1:]
+    next_values[-1] = next_value
+    
+    deltas = rewards + gamma * next_values * next_non_terminal - values
+    advantages = discounted_scan(deltas, gamma * gae_lambda * next_non_terminal)
+    
+    if advantages_out is None:
+        advantages_out = advantages.astype(rewards.dtype)
+    else:
+        advantages_out[...] = advantages
+    
+    if returns_out is None:
+        returns_out = advantages_out + values
+    else:
+        np.add(advantages_out, values, out=returns_out)
+    
+    return advantages_out, returns_out
+
+
+class RolloutBuffer:
+    """
+    Fixed-capacity rollout storage for PPO.
+    
+    All fields live in contiguous NumPy arrays of shape [capacity, n_envs, ...]
+    allocated once. The torch tensors exposed to the learner share memory with
+    those arrays (torch.from_numpy), so writing a transition and reading a batch
+    never copies or reallocates. The buffer is reused across updates by
+    resetting the write position.
+    """
+    
+    def __init__(self, capacity: int, state_dim: int, n_envs: int = 1):
+        """
+        Initialize the rollout buffer.
+        
+        Args:
+            capacity: Maximum number of time steps per rollout
+            state_dim: Dimension of the state space
+            n_envs: Number of parallel environments written per time step
+        """
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.n_envs = n_envs
+        
+        # Contiguous storage, allocated once
+        self.states = np.zeros((capacity, n_envs, state_dim), dtype=np.float32)
+        self.actions = np.zeros((capacity, n_envs), dtype=np.int64)
+        self.log_probs = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.rewards = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.values = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.dones = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.advantages = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.returns = np.zeros((capacity, n_envs), dtype=np.float32)
+        self.versions = np.zeros((capacity, n_envs), dtype=np.int64)
+        
+        # Zero-copy torch views of the same memory
+        self.states_t = torch.from_numpy(self.states)
+        self.actions_t = torch.from_numpy(self.actions)
+        self.log_probs_t = torch.from_numpy(self.log_probs)
+        self.advantages_t = torch.from_numpy(self.advantages)
+        self.returns_t = torch.from_numpy(self.returns)
+        
+        self.pos = 0
+    
+    def __len__(self) -> int:
+        """Number of complete time steps stored."""
+        return self.pos
+    
+    @property
+    def full(self) -> bool:
+        """Whether the buffer has reached capacity."""
+        return self.pos >= self.capacity
+    
+    def add_observation(self, states: np.ndarray, actions: np.ndarray,
+                        log_probs: np.ndarray, values: np.ndarray, version: int = 0):
+        """
+        Write the policy outputs for the current time step in place.
+        
+        Args:
+            states: States of shape [n_envs, state_dim]
+            actions: Actions of shape [n_envs]
+            log_probs: Log probabilities of shape [n_envs]
+            values: Value estimates of shape [n_envs]
+            version: Version of the policy that produced the actions
+        """
+        if self.full:
+            raise RuntimeError(f"Rollout buffer full ({self.capacity} steps); call update() first")
+        
+        self.states[self.pos] = states
+        self.actions[self.pos] = actions
+        self.log_probs[self.pos] = log_probs
+        self.values[self.pos] = values
+        self.versions[self.pos] = version
+    
+    def add_outcome(self, rewards, dones):
+        """
+        Write rewards and done flags for the current time step and advance.
+        
+        Args:
+            rewards: Reward scalar or array of shape [n_envs]
+            dones: Done flag scalar or array of shape [n_envs]
+        """
+        if self.full:
+            raise RuntimeError(f"Rollout buffer full ({self.capacity} steps); call update() first")
+        
+        self.rewards[self.pos] = rewards
+        self.dones[self.pos] = dones
+        self.pos += 1
+    
+    def reset(self):
+        """Reset the write position; storage is kept for reuse."""
+        self.pos = 0
+    
+    def save(self, filepath: str):
+        """Write the stored time steps to an .npz file."""
+        n = self.pos
+        np.savez(
+            filepath,
+            states=self.states[:n], actions=self.actions[:n], log_probs=self.log_probs[:n],
+            rewards=self.rewards[:n], values=self.values[:n], dones=self.dones[:n],
+            versions=self.versions[:n]
+        )
+    
+    def load(self, filepath: str):
+        """
+        Restore time steps written by save() into this buffer's storage.
+        
+        Raises:
+            ValueError: If the saved rollout does not fit this buffer
+        """
+        data = np.load(filepath)
+        n = len(data['actions'])
+        if n > self.capacity or data['states'].shape[1:] != self.states.shape[1:]:
+            raise ValueError(f"Saved rollout {data['states'].shape} does not fit buffer {self.states.shape}")
+        
+        for name in ('states', 'actions', 'log_probs', 'rewards', 'values', 'dones', 'versions'):
+            getattr(self, name)[:n] = data[name]
+        self.pos = n
+
+
 class PPOAgent:
     """
     PPO Agent for fuzzing optimization.
@@ -152,7 +382,11 @@ class PPOAgent:
         value_coef: float = 0.5,
         entropy_coef: float = 0.01,
         max_grad_norm: float = 0.5,
-        device: str = None
+        target_kl: Optional[float] = None,
+        device: str = None,
+        n_envs: int = 1,
+        buffer_size: int = 2048,
+        seed: Optional[int] = None
     ):
         """
         Initialize PPO agent.
@@ -168,7 +402,14 @@ class PPOAgent:
             value_coef: Value loss coefficient
             entropy_coef: Entropy bonus coefficient
             max_grad_norm: Maximum gradient norm for clipping
+            target_kl: Stop an update early once the approximate KL divergence
+                of an epoch exceeds this value (None runs all epochs)
             device: Device to run on ('cpu' or 'cuda')
+            n_envs: Number of parallel environments acting per step
+            buffer_size: Rollout buffer capacity in time steps
+            seed: Seed for the action-sampling RNG (a NumPy Generator, as in
+                PolicySnapshot, so both pick the same actions under one
+                seed); torch's global RNG is used if None
         """
         self.device = device if device else ('cuda' if torch.cuda.is_available() else 'cpu')
         
@@ -179,18 +420,27 @@ class PPOAgent:
         self.value_coef = value_coef
         self.entropy_coef = entropy_coef
         self.max_grad_norm = max_grad_norm
+        self.target_kl = target_kl
+        self.rng = np.random.default_rng(seed) if seed is not None else None
         
         # Initialize network
         self.network = PPONetwork(state_dim, action_dim, hidden_dim).to(self.device)
         self.optimizer = optim.Adam(self.network.parameters(), lr=learning_rate)
         
+        # Network used for acting; replaced by a scripted or quantized CPU
+        # variant via set_inference_variant(), or by a detached copy when a
+        # background learner trains self.network concurrently
+        self.inference_variant = 'eager'
+        self.detached_policy = False
+        self.policy_network = self.network
+        self.policy_device = self.device
+        
+        # Incremented after every update; recorded with each transition
+        self.policy_version = 0
+        
         # Storage for experience
-        self.states = []
-        self.actions = []
-        self.log_probs = []
-        self.rewards = []
-        self.values = []
-        self.dones = []
+        self.n_envs = n_envs
+        self.buffer = RolloutBuffer(buffer_size, state_dim, n_envs)
         
         # Statistics
         self.episode_rewards = []
@@ -199,132 +449,179 @@ class PPOAgent:
         logger.info(f"PPO Agent initialized on device: {self.device}")
         logger.info(f"Hyperparameters: γ={gamma}, λ={gae_lambda}, ε={clip_epsilon}")
     
-    def select_action(self, state: np.ndarray, deterministic: bool = False) -> int:
+    def select_action(self, state: np.ndarray, deterministic: bool = False,
+                      uniforms: Optional[np.ndarray] = None):
         """
         Select an action based on the current state.
         
         Args:
-            state: Current state observation
+            state: Current state observation, [state_dim] or [n_envs, state_dim]
             deterministic: Whether to act deterministically
+            uniforms: Optional uniform draws ([n_envs]) for inverse-CDF
+                sampling; drawn from the agent's RNG if not given
             
         Returns:
-            Selected action index
+            Selected action index, or an array of indices for n_envs > 1
         """
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        version = self.policy_version
+        policy_network = self.policy_network
+        
+        states = np.asarray(state, dtype=np.float32).reshape(self.n_envs, -1)
+        state_tensor = torch.from_numpy(states).to(self.policy_device)
         
         with torch.no_grad():
-            action, log_prob, value = self.network.get_action(state_tensor, deterministic)
+            action_logits, values = policy_network(state_tensor)
+            dist = Categorical(logits=action_logits)
+            if deterministic:
+                actions = torch.argmax(action_logits, dim=-1)
+            else:
+                if uniforms is None:
+                    uniforms = self.rng.random(self.n_envs) if self.rng is not None else torch.rand(self.n_envs)
+                actions = sample_categorical(dist.probs, torch.as_tensor(uniforms).reshape(-1))
+            log_probs = dist.log_prob(actions)
         
-        # Store experience
-        self.states.append(state)
-        self.actions.append(action)
-        self.log_probs.append(log_prob.item())
-        self.values.append(value.item())
+        actions = actions.cpu().numpy()
         
-        return action
+        # Store experience
+        self.buffer.add_observation(
+            states, actions, log_probs.cpu().numpy(), values.squeeze(-1).cpu().numpy(),
+            version=version
+        )
+        
+        if self.n_envs == 1:
+            return int(actions[0])
+        return actions
     
-    def store_transition(self, reward: float, done: bool):
+    def store_transition(self, reward, done):
         """
         Store the reward and done flag for the last action.
         
         Args:
-            reward: Reward received
-            done: Whether episode is done
+            reward: Reward received (array of shape [n_envs] for n_envs > 1)
+            done: Whether episode is done (array of shape [n_envs] for n_envs > 1)
         """
-        self.rewards.append(reward)
-        self.dones.append(done)
+        self.buffer.add_outcome(reward, done)
     
-    def compute_gae(self, next_value: float) -> Tuple[np.ndarray, np.ndarray]:
+    def compute_gae(self, next_value, buffer: Optional[RolloutBuffer] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Compute Generalized Advantage Estimation.
         
+        Results are written into the buffer's advantage and return arrays.
+        
         Args:
-            next_value: Value of the next state
+            next_value: Value of the next state (scalar or array of shape [n_envs])
+            buffer: Rollout to process (defaults to the agent's buffer)
             
         Returns:
-            Tuple of (advantages, returns)
+            Tuple of (advantages, returns), each of shape [T, n_envs]
         """
-        values = np.array(self.values + [next_value])
-        rewards = np.array(self.rewards)
-        dones = np.array(self.dones)
-        
-        advantages = np.zeros_like(rewards)
-        last_gae = 0
-        
-        for t in reversed(range(len(rewards))):
-            if t == len(rewards) - 1:
-                next_non_terminal = 1.0 - dones[t]
-                next_value_t = next_value
-            else:
-                next_non_terminal = 1.0 - dones[t]
-                next_value_t = values[t + 1]
-            
-            delta = rewards[t] + self.gamma * next_value_t * next_non_terminal - values[t]
-            advantages[t] = last_gae = delta + self.gamma * self.gae_lambda * next_non_terminal * last_gae
-        
-        returns = advantages + values[:-1]
-        
-        return advantages, returns
+        buf = buffer if buffer is not None else self.buffer
+        n_steps = len(buf)
+        
+        return compute_gae_batch(
+            buf.rewards[:n_steps],
+            buf.values[:n_steps],
+            buf.dones[:n_steps],
+            next_value,
+            self.gamma,
+            self.gae_lambda,
+            advantages_out=buf.advantages[:n_steps],
+            returns_out=buf.returns[:n_steps]
+        )
     
-    def update(self, n_epochs: int = 10, batch_size: int = 64) -> Dict[str, float]:
+    def update(self, n_epochs: int = 10, batch_size: int = 64,
+               buffer: Optional[RolloutBuffer] = None,
+               target_kl: Optional[float] = None) -> Dict[str, float]:
         """
         Update the policy using PPO algorithm.
         
+        The importance ratio is taken against the log-probabilities recorded
+        at action time, i.e. against the policy version that actually acted,
+        so rollouts collected while a previous update was running stay valid.
+        
         Args:
-            n_epochs: Number of optimization epochs
+            n_epochs: Maximum number of optimization epochs
             batch_size: Mini-batch size
+            buffer: Rollout to train on (defaults to the agent's buffer)
+            target_kl: Approximate-KL early stopping threshold (defaults to
+                the agent's target_kl)
             
         Returns:
             Dictionary of training statistics
         """
-        if len(self.states) == 0:
+        if target_kl is None:
+            target_kl = self.target_kl
+        
+        buf = buffer if buffer is not None else self.buffer
+        if len(buf) == 0:
             return {}
         
+        policy_lag = self.policy_version - buf.versions[:len(buf)]
+        
         # Compute advantages and returns
         with torch.no_grad():
-            last_state = torch.FloatTensor(self.states[-1]).unsqueeze(0).to(self.device)
+            last_state = buf.states_t[len(buf) - 1].to(self.device)
             _, last_value = self.network.forward(last_state)
-            last_value = last_value.item()
-        
-        advantages, returns = self.compute_gae(last_value)
-        
-        # Normalize advantages
-        advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
-        
-        # Convert to tensors
-        states = torch.FloatTensor(np.array(self.states)).to(self.device)
-        actions = torch.LongTensor(self.actions).to(self.device)
-        old_log_probs = torch.FloatTensor(self.log_probs).to(self.device)
-        advantages_t = torch.FloatTensor(advantages).to(self.device)
-        returns_t = torch.FloatTensor(returns).to(self.device)
-        
-        # Training metrics
-        total_policy_loss = 0
-        total_value_loss = 0
-        total_entropy = 0
+            last_value = last_value.squeeze(-1).cpu().numpy()
+        
+        advantages, returns = self.compute_gae(last_value, buf)
+        mean_return = float(returns.mean())
+        mean_advantage = float(advantages.mean())
+        
+        # Normalize advantages in place
+        advantages -= mean_advantage
+        advantages /= advantages.std() + 1e-8
+        
+        # Zero-copy tensor views over the filled part of the buffer
+        n_samples = len(buf) * buf.n_envs
+        states = buf.states_t[:len(buf)].view(n_samples, -1).to(self.device)
+        actions = buf.actions_t[:len(buf)].view(n_samples).to(self.device)
+        old_log_probs = buf.log_probs_t[:len(buf)].view(n_samples).to(self.device)
+        advantages_t = buf.advantages_t[:len(buf)].view(n_samples).to(self.device)
+        returns_t = buf.returns_t[:len(buf)].view(n_samples).to(self.device)
+        
+        # Shuffle once per update: a single gather into contiguous tensors,
+        # after which every mini-batch is a slice (a view, no gather)
+        perm = torch.randperm(n_samples, device=self.device)
+        states = states[perm]
+        actions = actions[perm]
+        old_log_probs = old_log_probs[perm]
+        advantages_t = advantages_t[perm]
+        returns_t = returns_t[perm]
+        batch_starts = list(range(0, n_samples, batch_size))
+        
+        # Training metrics (accumulated as tensors to avoid a sync per mini-batch)
+        total_policy_loss = torch.zeros((), device=self.device)
+        total_value_loss = torch.zeros((), device=self.device)
+        total_entropy = torch.zeros((), device=self.device)
         n_updates = 0
+        epoch_times = []
+        approx_kl = 0.0
+        early_stopped = False
         
         # Multiple epochs of optimization
         for epoch in range(n_epochs):
-            # Generate random mini-batches
-            indices = np.random.permutation(len(states))
+            epoch_start = time.perf_counter()
+            epoch_kl = torch.zeros((), device=self.device)
             
-            for start_idx in range(0, len(states), batch_size):
-                end_idx = min(start_idx + batch_size, len(states))
-                batch_indices = indices[start_idx:end_idx]
+            # Visit the precomputed mini-batches in a new order each epoch
+            for batch_idx in np.random.permutation(len(batch_starts)):
+                start_idx = batch_starts[batch_idx]
+                end_idx = min(start_idx + batch_size, n_samples)
                 
                 # Get batch data
-                batch_states = states[batch_indices]
-                batch_actions = actions[batch_indices]
-                batch_old_log_probs = old_log_probs[batch_indices]
-                batch_advantages = advantages_t[batch_indices]
-                batch_returns = returns_t[batch_indices]
+                batch_states = states[start_idx:end_idx]
+                batch_actions = actions[start_idx:end_idx]
+                batch_old_log_probs = old_log_probs[start_idx:end_idx]
+                batch_advantages = advantages_t[start_idx:end_idx]
+                batch_returns = returns_t[start_idx:end_idx]
                 
                 # Evaluate current policy
                 log_probs, values, entropy = self.network.evaluate_actions(batch_states, batch_actions)
                 
                 # Compute ratio and clipped objective
-                ratio = torch.exp(log_probs - batch_old_log_probs)
+                log_ratio = log_probs - batch_old_log_probs
+                ratio = torch.exp(log_ratio)
                 surr1 = ratio * batch_advantages
                 surr2 = torch.clamp(ratio, 1.0 - self.clip_epsilon, 1.0 + self.clip_epsilon) * batch_advantages
                 
@@ -347,48 +644,282 @@ class PPOAgent:
                 self.optimizer.step()
                 
                 # Track metrics
-                total_policy_loss += policy_loss.item()
-                total_value_loss += value_loss.item()
-                total_entropy += entropy.mean().item()
+                with torch.no_grad():
+                    total_policy_loss += policy_loss
+                    total_value_loss += value_loss
+                    total_entropy += entropy.mean()
+                    # Low-variance KL(old || new) estimator, weighted by batch size
+                    epoch_kl += ((ratio - 1.0) - log_ratio).sum()
                 n_updates += 1
+            
+            approx_kl = epoch_kl.item() / n_samples
+            epoch_times.append(time.perf_counter() - epoch_start)
+            
+            if target_kl is not None and approx_kl > target_kl:
+                early_stopped = True
+                logger.debug(f"Early stopping at epoch {epoch + 1}/{n_epochs}: "
+                             f"approx KL {approx_kl:.4f} > {target_kl}")
+                break
         
         # Clear experience buffer
-        self.clear_buffer()
+        buf.reset()
+        
+        # Publish the new weights to the acting network, then bump the version
+        # (select_action reads the version first, so it never records a newer
+        # version than the network it acted with)
+        self._refresh_policy()
+        self.policy_version += 1
         
         # Return training statistics
         stats = {
-            'policy_loss': total_policy_loss / n_updates,
-            'value_loss': total_value_loss / n_updates,
-            'entropy': total_entropy / n_updates,
-            'mean_return': returns.mean(),
-            'mean_advantage': advantages.mean()
+            'policy_loss': total_policy_loss.item() / n_updates,
+            'value_loss': total_value_loss.item() / n_updates,
+            'entropy': total_entropy.item() / n_updates,
+            'approx_kl': approx_kl,
+            'epochs_run': len(epoch_times),
+            'early_stopped': early_stopped,
+            'epoch_times': epoch_times,
+            'time_per_epoch': sum(epoch_times) / len(epoch_times),
+            'mean_return': mean_return,
+            'mean_advantage': mean_advantage,
+            'policy_lag_mean': float(policy_lag.mean()),
+            'policy_lag_max': int(policy_lag.max()),
+            'policy_version': self.policy_version
         }
         
         return stats
     
     def clear_buffer(self):
-        """Clear the experience buffer."""
-        self.states.clear()
-        self.actions.clear()
-        self.log_probs.clear()
-        self.rewards.clear()
-        self.values.clear()
-        self.dones.clear()
+        """Clear the experience buffer (storage is kept for reuse)."""
+        self.buffer.reset()
     
     def save(self, filepath: str):
-        """Save the agent's network."""
+        """
+        Save the agent's network.
+        
+        When acting with a scripted or quantized variant, that variant is
+        exported next to the checkpoint (policy_export.exported_path).
+        """
         torch.save({
             'network_state_dict': self.network.state_dict(),
             'optimizer_state_dict': self.optimizer.state_dict(),
+            'policy_version': self.policy_version,
         }, filepath)
+        if self.inference_variant != 'eager':
+            from policy_export import export_policy
+            path = Path(filepath)
+            export_policy(self.network, str(path.parent), (self.inference_variant,), stem=path.stem)
         logger.info(f"Model saved to {filepath}")
     
-    def load(self, filepath: str):
-        """Load the agent's network."""
+    def load(self, filepath: str, variant: str = 'eager'):
+        """
+        Load the agent's network.
+        
+        Args:
+            filepath: Checkpoint written by save()
+            variant: Inference variant to act with ('eager', 'scripted' or
+                'quantized'); taken from the file save() exported next to the
+                checkpoint if it is at least as new, built otherwise
+        """
         checkpoint = torch.load(filepath, map_location=self.device)
         self.network.load_state_dict(checkpoint['network_state_dict'])
         self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
-        logger.info(f"Model loaded from {filepath}")
+        self.policy_version = checkpoint.get('policy_version', 0)
+        
+        from policy_export import exported_path, load_exported
+        exported = exported_path(filepath, variant)
+        if (variant != 'eager' and exported.exists()
+                and exported.stat().st_mtime_ns >= Path(filepath).stat().st_mtime_ns):
+            self.inference_variant = variant
+            self.policy_network = load_exported(str(exported))
+            self.policy_device = 'cpu'
+            logger.info(f"Model loaded from {filepath} ({variant} inference from {exported})")
+            return
+        self.set_inference_variant(variant)
+        logger.info(f"Model loaded from {filepath} ({variant} inference)")
+    
+    def set_inference_variant(self, variant: str):
+        """
+        Select the network variant used by select_action.
+        
+        Training always uses the eager network; scripted and quantized
+        variants are CPU-only copies rebuilt after every update.
+        
+        Args:
+            variant: 'eager', 'scripted' or 'quantized'
+        """
+        self.inference_variant = variant
+        self._refresh_policy()
+    
+    def detach_policy(self):
+        """
+        Act with a copy of the network instead of the training network.
+        
+        Required when update() runs concurrently with select_action; the copy
+        is replaced (a single reference assignment) after each update.
+        """
+        self.detached_policy = True
+        self._refresh_policy()
+    
+    def _refresh_policy(self):
+        """Rebuild the acting network from the current training weights."""
+        from policy_export import build_variant
+        
+        if self.inference_variant == 'eager':
+            if self.detached_policy:
+                policy = copy.deepcopy(self.network)
+            else:
+                policy = self.network
+            device = self.device
+        else:
+            policy = build_variant(self.network, self.inference_variant)
+            device = 'cpu'
+        
+        self.policy_device = device
+        self.policy_network = policy
+    
+    def export_snapshot(self, filepath: str = None, seed: int = None):
+        """
+        Export a torch-free NumPy inference snapshot of the network.
+        
+        Args:
+            filepath: Optional .npz path to save the snapshot to
+            seed: Seed for the snapshot's sampling RNG
+            
+        Returns:
+            PolicySnapshot of the current weights
+        """
+        from policy_snapshot import PolicySnapshot
+        
+        snapshot = PolicySnapshot.from_network(self.network, seed=seed)
+        if filepath:
+            snapshot.save(filepath)
+        return snapshot
+
+
+class AsyncLearner:
+    """
+    Background PPO learner with double-buffered rollouts.
+    
+    submit() hands the agent's full rollout buffer to a training thread and
+    gives the agent an empty spare buffer, so the control loop keeps acting
+    (with the previous weights) while the update runs. When training finishes
+    the agent's acting network is swapped for the new weights.
+    
+    A rollout whose update fails is kept and trained on again by the next
+    submit(), up to max_retries times before it is dropped.
+    """
+    
+    def __init__(self, agent: PPOAgent, n_epochs: int = 10, batch_size: int = 64,
+                 max_retries: int = 3):
+        """
+        Initialize the background learner.
+        
+        Args:
+            agent: Agent to train; its acting network is detached from training
+            n_epochs: Number of optimization epochs per update
+            batch_size: Mini-batch size
+            max_retries: Retries of a rollout whose update failed
+        """
+        self.agent = agent
+        self.n_epochs = n_epochs
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        
+        buf = agent.buffer
+        self._spare: Optional[RolloutBuffer] = RolloutBuffer(buf.capacity, buf.state_dim, buf.n_envs)
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Optional[Dict[str, float]] = None
+        self._retry: Optional[RolloutBuffer] = None
+        self._retries = 0
+        self.updates_completed = 0
+        self.updates_failed = 0
+        self.last_error: Optional[BaseException] = None
+        
+        agent.detach_policy()
+    
+    @property
+    def busy(self) -> bool:
+        """Whether an update is currently running."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def submit(self) -> bool:
+        """
+        Start a background update on the agent's current rollout, or retry
+        the rollout of a failed update (the agent keeps its buffer then).
+        
+        Returns:
+            True if an update was started, False if one is still running
+        """
+        if self._thread is not None:
+            return False
+        
+        if self._retry is not None:
+            full_buffer, self._retry = self._retry, None
+        else:
+            full_buffer = self.agent.buffer
+            self.agent.buffer = self._spare
+            self._spare = None
+        
+        self._thread = threading.Thread(
+            target=self._train, args=(full_buffer,), name="ppo-learner", daemon=True
+        )
+        self._thread.start()
+        return True
+    
+    def _train(self, buffer: RolloutBuffer):
+        """Training thread body."""
+        try:
+            self._stats = self.agent.update(self.n_epochs, self.batch_size, buffer=buffer)
+            self._spare = buffer
+            self._retries = 0
+        except Exception as e:
+            logger.error(f"Background PPO update failed: {e}", exc_info=True)
+            self.last_error = e
+            self._stats = None
+            if self._retries < self.max_retries:
+                # update() only clears the buffer on success, so the rollout is intact
+                self._retries += 1
+                self._retry = buffer
+            else:
+                logger.error(f"Dropping rollout after {self._retries} failed retries")
+                buffer.reset()
+                self._spare = buffer
+                self._retries = 0
+    
+    def poll(self) -> Optional[Dict[str, float]]:
+        """
+        Collect the result of a finished update.
+        
+        A failed update is counted in updates_failed (the error is in
+        last_error) and reported as None, like no update.
+        
+        Returns:
+            Training statistics if an update succeeded since the last poll, else None
+        """
+        if self._thread is None or self._thread.is_alive():
+            return None
+        
+        self._thread.join()
+        self._thread = None
+        stats, self._stats = self._stats, None
+        if stats is None:
+            self.updates_failed += 1
+            return None
+        if not stats:
+            return None
+        self.updates_completed += 1
+        return stats
+    
+    @property
+    def retry_pending(self) -> bool:
+        """Whether the next submit() retries the rollout of a failed update."""
+        return self._retry is not None
+    
+    def wait(self, timeout: float = None):
+        """Block until a running update finishes (its stats remain available to poll())."""
+        if self._thread is not None:
+            self._thread.join(timeout)
 
 
 if __name__ == "__main__":
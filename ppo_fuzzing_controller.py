@@ -9,11 +9,15 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from afl_stats import parse_fuzzer_stats
+from stats_bus import attach_stats_bus
+
 class PPOFuzzingController:
     def __init__(self, output_dir, name):
         self.output_dir = Path(output_dir)
         self.name = name
         self.stats_file = self.output_dir / "default/fuzzer_stats"
+        self.stats_bus = attach_stats_bus()
         
         self.iteration = 0
         self.best_coverage = 0
@@ -24,23 +28,23 @@ class PPOFuzzingController:
         self.current_strategy = "explore"
         
     def read_stats(self):
-        """Read AFL++ stats"""
-        if not self.stats_file.exists():
-            return None
-            
-        stats = {}
-        with open(self.stats_file) as f:
-            for line in f:
-                if ':' in line:
-                    key, val = line.strip().split(':', 1)
-                    stats[key.strip()] = val.strip()
-        return stats
+        """Read AFL++ stats (from the stats bus if a collector publishes them)"""
+        if self.stats_bus is not None:
+            try:
+                fresh = self.stats_bus.refresh()
+            except TimeoutError:
+                fresh = False  # No consistent snapshot; read the file instead
+            if fresh:
+                stats = self.stats_bus.get(self.stats_file)
+                if stats is not None:
+                    return stats
+        return parse_fuzzer_stats(self.stats_file)
     
     def select_strategy(self, stats):
         """PPO-based strategy selection"""
-        coverage = float(stats.get('bitmap_cvg', '0').rstrip('%'))
-        paths = int(stats.get('corpus_count', '0'))
-        crashes = int(stats.get('saved_crashes', '0'))
+        coverage = stats.bitmap_cvg
+        paths = stats.corpus_count
+        crashes = stats.saved_crashes
         
         # Track improvements
         coverage_delta = coverage - self.best_coverage
@@ -71,18 +75,12 @@ class PPOFuzzingController:
     
     def display_status(self, stats):
         """Display controller status"""
-        coverage = stats.get('bitmap_cvg', '0%')
-        paths = stats.get('corpus_count', '0')
-        execs = stats.get('execs_done', '0')
-        crashes = stats.get('saved_crashes', '0')
-        speed = stats.get('exec_speed', '0')
-        
         print(f"[{self.iteration:04d}] "
-              f"Cov: {coverage:>6s} | "
-              f"Paths: {paths:>5s} | "
-              f"Crashes: {crashes:>3s} | "
-              f"Execs: {execs:>8s} | "
-              f"Speed: {speed:>8s}/s | "
+              f"Cov: {stats.bitmap_cvg:>5.2f}% | "
+              f"Paths: {stats.corpus_count:>5d} | "
+              f"Crashes: {stats.saved_crashes:>3d} | "
+              f"Execs: {stats.execs_done:>8d} | "
+              f"Speed: {stats.execs_per_sec:>8.1f}/s | "
               f"Strategy: {self.current_strategy:>7s}")
     
     def run(self):
@@ -0,0 +1,452 @@
+"""
+Offline Replay Simulator
+Trace-driven environment for pretraining the PPO agent without running AFL++.
+
+Recorded campaign histories (AFL++ plot_data files, checkpoint
+metrics_history.json / metrics_history.bin files or binary metrics_log.bin
+histories) provide the baseline growth of coverage, paths and crashes over
+time. Strategy-response statistics from checkpoint strategy_stats.json files
+scale those increments according to the mutation strategy chosen at each
+step. State and reward are computed with the same functions FeedbackAnalyzer
+uses, over all simulated instances at once.
+"""
+
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from feedback_analyzer import build_state_vector, compute_reward_from_metrics
+from plot_data_tail import PLOT_DATA_ALIASES
+from metrics_history import load_history_file
+from mutation_selector import MutationStrategy
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Columns of a trace array
+TRACE_FIELDS = ('time', 'coverage', 'paths_total', 'unique_crashes',
+                'execs_per_sec', 'stability', 'cycles_done', 'pending_favs')
+TIME, COVERAGE, PATHS, CRASHES, EXECS, STABILITY, CYCLES, PENDING_FAVS = range(len(TRACE_FIELDS))
+
+# Metrics scaled by the strategy response (the ones the reward is built from)
+RESPONSE_FIELDS = ('coverage', 'paths', 'crashes')
+
+def load_plot_data(filepath: str) -> np.ndarray:
+    """
+    Load an AFL/AFL++ plot_data file as a trace.
+
+    Args:
+        filepath: Path to plot_data
+
+    Returns:
+        Trace array of shape [T, len(TRACE_FIELDS)]
+    """
+    with open(filepath) as f:
+        header = f.readline().lstrip('#').strip()
+        columns = [c.strip() for c in header.split(',')]
+        rows = [line.replace('%', '').split(',') for line in f if line.strip() and not line.startswith('#')]
+
+    data = np.array(rows, dtype=np.float64).reshape(len(rows), len(columns))
+    trace = np.zeros((len(rows), len(TRACE_FIELDS)))
+    trace[:, STABILITY] = 100.0  # Not recorded in plot_data
+
+    for field, aliases in PLOT_DATA_ALIASES.items():
+        for alias in aliases:
+            if alias in columns:
+                trace[:, TRACE_FIELDS.index(field)] = data[:, columns.index(alias)]
+                break
+
+    trace[:, TIME] -= trace[0, TIME] if len(trace) else 0.0
+    return trace
+
+
+def load_metrics_history(filepath: str, interval: float = 300.0) -> np.ndarray:
+    """
+    Load a checkpoint metrics_history.json as a trace.
+
+    Args:
+        filepath: Path to metrics_history.json (FeedbackAnalyzer.save_history)
+        interval: Seconds between samples (the controller's update_interval)
+
+    Returns:
+        Trace array of shape [T, len(TRACE_FIELDS)]
+    """
+    with open(filepath) as f:
+        history = json.load(f)
+
+    trace = np.zeros((len(history), len(TRACE_FIELDS)))
+    for i, sample in enumerate(history):
+        trace[i, TIME] = i * interval
+        for j, field in enumerate(TRACE_FIELDS[1:], start=1):
+            trace[i, j] = sample.get(field, 0.0)
+
+    return trace
+
+
+def load_metrics_log(filepath: str) -> np.ndarray:
+    """
+    Load a binary metrics history (metrics_log.bin or a checkpoint metrics_history.bin) as a trace.
+
+    Samples carry their own timestamps, so no sampling interval is needed.
+
+    Args:
+        filepath: Path to a file written by MetricsHistory
+
+    Returns:
+        Trace array of shape [T, len(TRACE_FIELDS)]
+    """
+    records = load_history_file(filepath)
+
+    trace = np.zeros((len(records), len(TRACE_FIELDS)))
+    if len(records) == 0:
+        return trace
+    trace[:, TIME] = records['timestamp'] - records['timestamp'][0]
+    for j, field in enumerate(TRACE_FIELDS[1:], start=1):
+        if field in records.dtype.names:
+            trace[:, j] = records[field]
+
+    return trace
+
+
+def load_strategy_response(stats_files: List[str]) -> np.ndarray:
+    """
+    Derive per-strategy response multipliers from checkpoint strategy_stats.json files.
+
+    Each strategy's average coverage, path and crash gains are divided by the
+    selection-weighted mean over all strategies, so 1.0 means "as good as the
+    average strategy". Strategies that were never selected get 1.0.
+
+    Args:
+        stats_files: Paths to strategy_stats.json files
+
+    Returns:
+        Array of shape [num_strategies, len(RESPONSE_FIELDS)]
+    """
+    num_strategies = len(MutationStrategy)
+    gains = np.zeros((num_strategies, len(RESPONSE_FIELDS)))
+    counts = np.zeros(num_strategies)
+
+    for path in stats_files:
+        with open(path) as f:
+            performance = json.load(f).get('performance', {})
+        for strategy in MutationStrategy:
+            perf = performance.get(strategy.name)
+            if not perf or perf['times_selected'] == 0:
+                continue
+            n = perf['times_selected']
+            gains[strategy] += n * np.array([perf['avg_coverage_gain'], perf['avg_paths'], perf['avg_crashes']])
+            counts[strategy] += n
+
+    response = np.ones((num_strategies, len(RESPONSE_FIELDS)))
+    if counts.sum() == 0:
+        return response
+
+    selected = counts > 0
+    mean_gain = gains[selected].sum(axis=0) / counts[selected].sum()
+    per_strategy = gains[selected] / counts[selected, None]
+    response[selected] = np.where(mean_gain > 0, per_strategy / np.maximum(mean_gain, 1e-12), 1.0)
+
+    return np.clip(response, 0.05, 20.0)
+
+
+class _MetricsBatch:
+    """Metric attributes as [n_envs] arrays, readable by the FeedbackAnalyzer formulas."""
+
+    __slots__ = ('coverage', 'paths_total', 'unique_crashes', 'execs_per_sec',
+                 'stability', 'cycles_done', 'pending_favs')
+
+    def __init__(self, n_envs: int):
+        for name in self.__slots__:
+            setattr(self, name, np.zeros(n_envs))
+
+
+class ReplaySimulator:
+    """
+    Vectorized trace-replay environment with the VecFuzzEnv interface.
+
+    Each simulated instance replays a recorded trace from a random start.
+    At every step the trace's increments in coverage, paths and crashes are
+    multiplied by the chosen strategy's response (with optional log-normal
+    noise) and accumulated; speed, stability, cycles and pending favorites
+    follow the trace. An episode ends when the trace runs out, after which
+    the instance restarts on another trace.
+    """
+
+    def __init__(
+        self,
+        traces: List[np.ndarray],
+        strategy_response: Optional[np.ndarray] = None,
+        n_envs: int = 256,
+        noise: float = 0.1,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the simulator.
+
+        Args:
+            traces: Trace arrays from load_plot_data / load_metrics_history
+            strategy_response: Array from load_strategy_response (default: all ones)
+            n_envs: Number of simulated instances
+            noise: Standard deviation of the log-normal response noise
+            seed: Seed for the simulator RNG
+        """
+        traces = [t for t in traces if len(t) >= 2]
+        if not traces:
+            raise ValueError("ReplaySimulator needs at least one trace with two or more samples")
+
+        self.n_envs = n_envs
+        self.num_actions = len(MutationStrategy)
+        self.observation_dim = 10
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+        # Pad traces into one array; steps past a trace's end are never read
+        self.lengths = np.array([len(t) for t in traces])
+        self.traces = np.zeros((len(traces), self.lengths.max(), len(TRACE_FIELDS)))
+        for i, trace in enumerate(traces):
+            self.traces[i, :len(trace)] = trace
+
+        # Trace increments of the response fields, precomputed once
+        response_columns = [COVERAGE, PATHS, CRASHES]
+        self.increments = np.maximum(np.diff(self.traces[:, :, response_columns], axis=1), 0.0)
+
+        if strategy_response is None:
+            strategy_response = np.ones((self.num_actions, len(RESPONSE_FIELDS)))
+        self.strategy_response = np.asarray(strategy_response, dtype=np.float64)
+
+        self.trace_idx = np.zeros(n_envs, dtype=np.int64)
+        self.position = np.zeros(n_envs, dtype=np.int64)
+        self.current = _MetricsBatch(n_envs)
+        self.previous = _MetricsBatch(n_envs)
+        self.env_ids = np.arange(n_envs)
+
+        logger.info(f"Replay simulator: {len(traces)} traces, {n_envs} instances")
+
+    def _restart(self, mask: np.ndarray):
+        """Start the masked instances on random traces at their first sample."""
+        n = int(mask.sum())
+        if n == 0:
+            return
+        self.trace_idx[mask] = self.rng.integers(0, len(self.lengths), n)
+        self.position[mask] = 0
+
+        sample = self.traces[self.trace_idx[mask], 0]
+        for metrics in (self.current, self.previous):
+            metrics.coverage[mask] = sample[:, COVERAGE]
+            metrics.paths_total[mask] = sample[:, PATHS]
+            metrics.unique_crashes[mask] = sample[:, CRASHES]
+            self._follow_trace(metrics, mask, sample)
+
+    @staticmethod
+    def _follow_trace(metrics: _MetricsBatch, mask, sample: np.ndarray):
+        """Copy the fields that are not influenced by the strategy from the trace."""
+        metrics.execs_per_sec[mask] = sample[:, EXECS]
+        metrics.stability[mask] = sample[:, STABILITY]
+        metrics.cycles_done[mask] = sample[:, CYCLES]
+        metrics.pending_favs[mask] = sample[:, PENDING_FAVS]
+
+    def reset(self) -> np.ndarray:
+        """
+        Restart every instance.
+
+        Returns:
+            Observations of shape [n_envs, 10]
+        """
+        self._restart(np.ones(self.n_envs, dtype=bool))
+        return build_state_vector(self.current, None).astype(np.float32)
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Advance every instance by one sample with the chosen strategies.
+
+        Args:
+            actions: Action indices of shape [n_envs]
+
+        Returns:
+            Tuple of (observations [N, 10], rewards [N], dones [N], infos)
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.n_envs)
+        cur, prev = self.previous, self.current  # swap roles; 'cur' is overwritten below
+
+        response = self.strategy_response[actions]
+        if self.noise > 0:
+            response = response * self.rng.lognormal(0.0, self.noise, response.shape)
+        gains = self.increments[self.trace_idx, self.position] * response
+
+        cur.coverage[:] = np.minimum(prev.coverage + gains[:, 0], 100.0)
+        cur.paths_total[:] = prev.paths_total + gains[:, 1]
+        cur.unique_crashes[:] = prev.unique_crashes + gains[:, 2]
+
+        self.position += 1
+        self._follow_trace(cur, slice(None), self.traces[self.trace_idx, self.position])
+        self.current, self.previous = cur, prev
+
+        # Rates over the trace's real sample spacing, as FeedbackAnalyzer measures them live
+        time_delta = np.maximum(self.traces[self.trace_idx, self.position, TIME]
+                                - self.traces[self.trace_idx, self.position - 1, TIME], 1.0)
+
+        rewards = compute_reward_from_metrics(cur, prev).astype(np.float32)
+        observations = build_state_vector(cur, prev, time_delta).astype(np.float32)
+
+        dones = self.position >= self.lengths[self.trace_idx] - 1
+        if dones.any():
+            self._restart(dones)
+            observations[dones] = build_state_vector(self.current, None)[dones]
+
+        return observations, rewards, dones, []
+
+    def close(self):
+        """No resources to release (VecFuzzEnv interface)."""
+
+
+def pretrain(
+    agent,
+    simulator: ReplaySimulator,
+    total_steps: int,
+    rollout_length: int = 64,
+    n_epochs: int = 4,
+    batch_size: int = 1024
+) -> List[Dict]:
+    """
+    Pretrain a PPOAgent on the simulator.
+
+    Args:
+        agent: PPOAgent created with n_envs == simulator.n_envs and
+            buffer_size >= rollout_length
+        simulator: ReplaySimulator to train on
+        total_steps: Total environment steps (summed over instances)
+        rollout_length: Time steps per update
+        n_epochs: PPO epochs per update
+        batch_size: Mini-batch size
+
+    Returns:
+        List of update statistics
+    """
+    if agent.n_envs != simulator.n_envs:
+        raise ValueError(f"Agent n_envs ({agent.n_envs}) != simulator n_envs ({simulator.n_envs})")
+
+    all_stats = []
+    steps = 0
+    obs = simulator.reset()
+
+    while steps < total_steps:
+        for _ in range(rollout_length):
+            actions = agent.select_action(obs)
+            obs, rewards, dones, _ = simulator.step(actions)
+            agent.store_transition(rewards, dones)
+        steps += rollout_length * simulator.n_envs
+
+        stats = agent.update(n_epochs=n_epochs, batch_size=batch_size)
+        stats['steps'] = steps
+        all_stats.append(stats)
+        logger.info(f"Pretraining {steps}/{total_steps} steps: "
+                   f"mean return {stats['mean_return']:.3f}, policy loss {stats['policy_loss']:.4f}")
+
+    return all_stats
+
+
+def greedy_actions(network, obs: np.ndarray) -> np.ndarray:
+    """Greedy actions of a PPONetwork (argmax logits) or QNetwork (argmax Q), bypassing agent buffers."""
+    import torch
+
+    with torch.no_grad():
+        output = network(torch.from_numpy(obs))
+    scores = output[0] if isinstance(output, tuple) else output
+    return scores.argmax(dim=-1).numpy()
+
+
+def evaluate_policy(network, traces: List[np.ndarray], strategy_response: Optional[np.ndarray] = None,
+                    n_envs: int = 64, steps: int = 50, seed: int = 1234) -> float:
+    """
+    Mean per-step reward of a network's greedy policy on a fixed-seed simulator.
+
+    Args:
+        network: PPONetwork or QNetwork
+        traces: Trace arrays
+        strategy_response: Array from load_strategy_response
+        n_envs: Simulated instances
+        steps: Steps to run
+        seed: Simulator seed (fixed so scores of different networks are comparable)
+
+    Returns:
+        Mean reward per instance and step
+    """
+    sim = ReplaySimulator(traces, strategy_response, n_envs=n_envs, seed=seed)
+    obs = sim.reset()
+    total = 0.0
+    for _ in range(steps):
+        obs, rewards, _, _ = sim.step(greedy_actions(network, obs))
+        total += float(rewards.mean())
+    return total / steps
+
+
+def load_traces(paths: List[str], interval: float = 300.0) -> List[np.ndarray]:
+    """
+    Load traces from plot_data, metrics_history.json and binary metrics history files or directories.
+
+    Directories are searched recursively for plot_data, metrics_history.json,
+    metrics_log.bin and metrics_history.bin files.
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob("plot_data")))
+            files.extend(sorted(path.rglob("metrics_history.json")))
+            files.extend(sorted(path.rglob("metrics_log.bin")))
+            files.extend(sorted(path.rglob("metrics_history.bin")))
+        else:
+            files.append(path)
+
+    traces = []
+    for f in files:
+        try:
+            if f.name.endswith('.bin'):
+                traces.append(load_metrics_log(str(f)))
+            elif f.name.endswith('.json'):
+                traces.append(load_metrics_history(str(f), interval))
+            else:
+                traces.append(load_plot_data(str(f)))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping trace {f}: {e}")
+
+    return traces
+
+
+def main():
+    """Main entry point: pretrain an agent and save it for FuzzingController."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pretrain the PPO agent on recorded AFL++ traces')
+    parser.add_argument('traces', nargs='+', help='plot_data / metrics_history.json / metrics_log.bin files or directories')
+    parser.add_argument('--strategy-stats', nargs='*', default=[], help='Checkpoint strategy_stats.json files')
+    parser.add_argument('--output', '-o', default='pretrained_agent.pt', help='Where to save the agent')
+    parser.add_argument('--steps', type=int, default=1_000_000, help='Total simulated steps')
+    parser.add_argument('--envs', type=int, default=256, help='Simulated instances')
+    parser.add_argument('--rollout-length', type=int, default=64, help='Time steps per update')
+    parser.add_argument('--interval', type=float, default=300.0, help='Seconds between metrics_history samples')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+
+    args = parser.parse_args()
+
+    from ppo_agent import PPOAgent
+
+    traces = load_traces(args.traces, args.interval)
+    response = load_strategy_response(args.strategy_stats)
+    simulator = ReplaySimulator(traces, response, n_envs=args.envs, seed=args.seed)
+    agent = PPOAgent(state_dim=10, action_dim=simulator.num_actions,
+                     n_envs=args.envs, buffer_size=args.rollout_length)
+
+    start = time.time()
+    pretrain(agent, simulator, args.steps, rollout_length=args.rollout_length)
+    elapsed = time.time() - start
+    logger.info(f"Pretrained for {args.steps} steps in {elapsed:.1f}s ({args.steps / elapsed:.0f} steps/s)")
+
+    agent.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
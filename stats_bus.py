@@ -0,0 +1,477 @@
+"""
+Shared-Memory Stats Bus
+One collector process scans every AFL++ instance under a set of campaign
+directories once per tick and publishes the results as a fixed-layout NumPy
+structured array (one row per instance) in multiprocessing.shared_memory.
+Controllers, monitors and dashboards attach as clients and read that array
+instead of each re-reading every fuzzer_stats file, so monitoring cost stays
+the same however many consumers are running.
+"""
+
+import os
+import time
+import signal
+import argparse
+import threading
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+
+from afl_stats import FIELDS, FuzzerStats
+from stats_watcher import CachedStatsReader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_BUS_NAME = "fuzzmaster_stats"
+DEFAULT_CAPACITY = 256
+
+# fuzzer_stats fields published per instance (named as in afl_stats.FIELDS)
+BUS_FIELDS = ('start_time', 'last_update', 'run_time', 'fuzzer_pid', 'cycles_done', 'execs_done',
+              'execs_per_sec', 'corpus_count', 'corpus_favored', 'corpus_found', 'pending_favs',
+              'pending_total', 'stability', 'bitmap_cvg', 'saved_crashes', 'saved_hangs',
+              'last_find', 'last_crash', 'last_hang', 'edges_found', 'total_edges')
+
+# One row per instance: its directory, whether its fuzzer process is alive, and the stats
+ROW_DTYPE = np.dtype([('directory', 'S256'), ('alive', 'u1')] +
+                     [(name, '<i8' if FIELDS[name] is int else '<f8') for name in BUS_FIELDS])
+
+# Segment header. seq is the seqlock: odd while the collector is writing rows;
+# generation changes whenever instances are added, so clients rebuild their index.
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('row_size', '<u4'), ('capacity', '<u4'),
+                         ('seq', '<u8'), ('tick', '<u8'), ('generation', '<u8'),
+                         ('count', '<u4'), ('interval', '<f4'), ('timestamp', '<f8')])
+HEADER_SIZE = 64
+BUS_MAGIC = b'FZSTBUS1'
+
+# Segments created by collectors in this process (already tracked by its resource tracker)
+_created = set()
+
+# Directories never searched for instances
+_SKIP_DIRS = {'queue', 'crashes', 'hangs', '.synced', '.state', 'checkpoints'}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without letting this process's resource tracker unlink it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _created:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _views(shm: shared_memory.SharedMemory) -> Tuple[np.ndarray, np.ndarray]:
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+    capacity = int(header['capacity'])
+    rows = np.ndarray((capacity,), dtype=ROW_DTYPE, buffer=shm.buf, offset=HEADER_SIZE)
+    return header, rows
+
+
+def find_instance_dirs(root: Union[str, Path], max_depth: int = 2) -> List[str]:
+    """
+    Find AFL++ instance directories (those with a fuzzer_stats file) below a root.
+
+    The root may be an instance directory, an AFL++ output directory
+    (root/default, root/master, ...) or a directory of campaigns
+    (root/<binary>/default) with the default max_depth.
+    """
+    found = []
+
+    def walk(directory: str, depth: int):
+        if os.path.isfile(os.path.join(directory, "fuzzer_stats")):
+            found.append(os.path.abspath(directory))
+            return
+        if depth == 0:
+            return
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name not in _SKIP_DIRS and entry.is_dir(follow_symlinks=False):
+                walk(entry.path, depth - 1)
+
+    walk(str(root), max_depth)
+    return found
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class StatsCollector:
+    """
+    Publishes the stats of every instance under the given roots into shared memory.
+
+    Each tick stats every known fuzzer_stats file (re-parsing only the changed
+    ones), fills a private copy of the rows and then copies it into the
+    segment under the seqlock. New instance directories are looked for every
+    `rescan_every` ticks.
+    """
+
+    def __init__(self, roots: List[Union[str, Path]], name: str = DEFAULT_BUS_NAME,
+                 capacity: int = DEFAULT_CAPACITY, max_depth: int = 2, rescan_every: int = 10):
+        """
+        Create the shared-memory segment.
+
+        Args:
+            roots: Campaign / output directories to scan
+            name: Shared-memory segment name clients attach to
+            capacity: Maximum number of instances
+            max_depth: Directory levels below each root searched for instances
+            rescan_every: Ticks between searches for new instance directories
+        """
+        self.roots = [Path(r) for r in roots]
+        self.name = name
+        self.capacity = capacity
+        self.max_depth = max_depth
+        self.rescan_every = rescan_every
+        self.reader = CachedStatsReader()
+
+        self._slots: Dict[str, int] = {}
+        self._published: Dict[int, FuzzerStats] = {}
+        self._staging = np.zeros(capacity, dtype=ROW_DTYPE)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.shm = self._create()
+        self._header, self._rows = _views(self.shm)
+        logger.info(f"Stats bus '{name}' created ({capacity} instances, {self.shm.size} bytes)")
+
+    def _create(self) -> shared_memory.SharedMemory:
+        size = HEADER_SIZE + self.capacity * ROW_DTYPE.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a collector that died; refuse to replace a live one
+            existing = _attach(self.name)
+            header = np.ndarray((), dtype=HEADER_DTYPE, buffer=existing.buf)
+            age = time.time() - float(header['timestamp'])
+            live = header['magic'] == BUS_MAGIC and age < max(10.0, 5 * float(header['interval']))
+            del header
+            existing.close()
+            if live:
+                raise RuntimeError(f"A stats collector is already publishing to '{self.name}'")
+            logger.warning(f"Replacing stale stats bus '{self.name}' (last tick {age:.0f}s ago)")
+            shared_memory.SharedMemory(name=self.name).unlink()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+
+        _created.add(self.name)
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        header['magic'] = BUS_MAGIC
+        header['row_size'] = ROW_DTYPE.itemsize
+        header['capacity'] = self.capacity
+        return shm
+
+    def rescan(self) -> int:
+        """Look for new instance directories; returns the number added."""
+        added = 0
+        for root in self.roots:
+            for directory in find_instance_dirs(root, self.max_depth):
+                if directory in self._slots:
+                    continue
+                if len(self._slots) >= self.capacity:
+                    logger.warning(f"Stats bus full ({self.capacity} instances), ignoring {directory}")
+                    return added
+                slot = len(self._slots)
+                self._slots[directory] = slot
+                self._staging[slot]['directory'] = os.fsencode(directory)[:256]
+                added += 1
+        return added
+
+    def tick(self) -> int:
+        """
+        Scan every instance once and publish the rows.
+
+        Returns:
+            Number of instances published
+        """
+        tick = int(self._header['tick'])
+        added = self.rescan() if tick % self.rescan_every == 0 else 0
+
+        staging = self._staging
+        for directory, slot in self._slots.items():
+            stats = self.reader.read(os.path.join(directory, "fuzzer_stats"))
+            row = staging[slot]
+            if stats is None:
+                row['alive'] = 0
+                continue
+            # The reader returns the same object while the file is unchanged
+            if stats is not self._published.get(slot):
+                self._published[slot] = stats
+                for name in BUS_FIELDS:
+                    row[name] = getattr(stats, name)
+            row['alive'] = _pid_alive(stats.fuzzer_pid)
+
+        count = len(self._slots)
+        header = self._header
+        header['seq'] += 1
+        self._rows[:count] = staging[:count]
+        header['count'] = count
+        header['tick'] = tick + 1
+        if added:
+            header['generation'] += 1
+        header['timestamp'] = time.time()
+        header['seq'] += 1
+        return count
+
+    def run(self, interval: float = 1.0):
+        """Publish every `interval` seconds until stop() is called."""
+        self._header['interval'] = interval
+        self._stop.clear()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Stats collector tick failed: {e}")
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def start(self, interval: float = 1.0):
+        """Run the collector on a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, args=(interval,), name='stats-collector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop publishing and remove the segment."""
+        self.stop()
+        del self._header, self._rows
+        self.shm.close()
+        self.shm.unlink()
+        _created.discard(self.name)
+
+
+class StatsBusClient:
+    """
+    Read side of the stats bus.
+
+    `rows` and `column()` are zero-copy views of the live segment (they can
+    change while being read); snapshot() / refresh() take a consistent copy
+    under the seqlock. get() has the same contract as CachedStatsReader.read
+    and StatsWatcher.get, so consumers can use the bus in their place.
+    """
+
+    def __init__(self, name: str = DEFAULT_BUS_NAME, max_age: float = 10.0):
+        """
+        Attach to a running collector.
+
+        Args:
+            name: Shared-memory segment name
+            max_age: Seconds without a tick after which the bus counts as stale
+
+        Raises:
+            FileNotFoundError: If no collector has created the segment
+        """
+        self.name = name
+        self.max_age = max_age
+        self.shm = _attach(name)
+        self._header, self._live = _views(self.shm)
+        if self._header['magic'] != BUS_MAGIC or int(self._header['row_size']) != ROW_DTYPE.itemsize:
+            self.close()
+            raise ValueError(f"Shared memory '{name}' is not a compatible stats bus")
+
+        self.snapshot_rows = np.zeros(0, dtype=ROW_DTYPE)
+        self.tick = 0
+        self.timestamp = 0.0
+        self._generation = None
+        self._index: Dict[str, int] = {}
+        self._path_slots: Dict[Union[str, Path], int] = {}
+        self._stats_cache: Dict[int, FuzzerStats] = {}
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Zero-copy view of the published rows."""
+        return self._live[:int(self._header['count'])]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one field over all published instances."""
+        return self.rows[name]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the collector's last tick."""
+        return time.time() - float(self._header['timestamp'])
+
+    def snapshot(self, timeout: float = 1.0) -> np.ndarray:
+        """
+        Consistent copy of the rows.
+
+        Retries while the collector is writing (odd seq) or a write happened
+        during the copy.
+
+        Raises:
+            TimeoutError: If no consistent copy could be taken within timeout
+        """
+        header = self._header
+        deadline = time.monotonic() + timeout
+        spins = 0
+        while True:
+            seq = int(header['seq'])
+            if not seq & 1:
+                count = int(header['count'])
+                rows = self._live[:count].copy()
+                tick, timestamp, generation = int(header['tick']), float(header['timestamp']), int(header['generation'])
+                if int(header['seq']) == seq:
+                    self.tick, self.timestamp = tick, timestamp
+                    if generation != self._generation:
+                        self._generation = generation
+                        self._index = {os.fsdecode(d): i for i, d in enumerate(rows['directory'])}
+                        self._path_slots.clear()
+                        self._stats_cache.clear()
+                    return rows
+            spins += 1
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent read of stats bus '{self.name}' within {timeout}s")
+            if spins > 100:
+                time.sleep(0.001)
+
+    def refresh(self) -> bool:
+        """
+        Take a new snapshot for get()/row().
+
+        Returns:
+            False if the collector has stopped ticking (data older than max_age)
+        """
+        previous = self.snapshot_rows
+        self.snapshot_rows = self.snapshot()
+        # Drop cached FuzzerStats of the rows that changed (one vectorized compare)
+        if self._stats_cache:
+            n = len(previous)
+            if n == len(self.snapshot_rows):
+                # Byte-wise: comparing structured arrays field by field is several times slower
+                old = previous.view(np.uint8).reshape(n, -1)
+                new = self.snapshot_rows.view(np.uint8).reshape(n, -1)
+                for i in np.flatnonzero((old != new).any(axis=1)):
+                    self._stats_cache.pop(int(i), None)
+            else:
+                self._stats_cache.clear()
+        return time.time() - self.timestamp <= self.max_age
+
+    def _slot(self, path: Union[str, Path]) -> Optional[int]:
+        i = self._path_slots.get(path)
+        if i is None:
+            directory = os.path.abspath(path)
+            if os.path.basename(directory) == "fuzzer_stats":
+                directory = os.path.dirname(directory)
+            i = self._index.get(directory)
+            if i is None:
+                return None
+            self._path_slots[path] = i
+        return i if i < len(self.snapshot_rows) else None
+
+    def row(self, path: Union[str, Path]) -> Optional[np.void]:
+        """Snapshot row of an instance, by its directory or fuzzer_stats path."""
+        i = self._slot(path)
+        return self.snapshot_rows[i] if i is not None else None
+
+    def get(self, path: Union[str, Path]) -> Optional[FuzzerStats]:
+        """
+        Stats of an instance from the last snapshot.
+
+        The same FuzzerStats object is returned until the row changes, so
+        callers can detect changes by identity. It must not be modified.
+        """
+        i = self._slot(path)
+        if i is None:
+            return None
+        stats = self._stats_cache.get(i)
+        if stats is not None:
+            return stats
+
+        row = self.snapshot_rows[i]
+        stats = FuzzerStats()
+        for name in BUS_FIELDS:
+            setattr(stats, name, row[name].item())
+        self._stats_cache[i] = stats
+        return stats
+
+    def alive_count(self) -> int:
+        """Number of instances whose fuzzer process is running (from the last snapshot)."""
+        return int(self.snapshot_rows['alive'].sum())
+
+    def close(self):
+        """Detach from the segment (the collector keeps running)."""
+        del self._header, self._live
+        self.snapshot_rows = np.zeros(0, dtype=ROW_DTYPE)
+        self.shm.close()
+
+
+def attach_stats_bus(name: str = DEFAULT_BUS_NAME, max_age: float = 10.0) -> Optional[StatsBusClient]:
+    """
+    Attach to a running collector, if there is one.
+
+    Returns:
+        StatsBusClient, or None if the bus does not exist or is not ticking
+    """
+    try:
+        client = StatsBusClient(name, max_age)
+    except (FileNotFoundError, ValueError):
+        return None
+    if client.age > max_age:
+        logger.warning(f"Stats bus '{name}' is stale, reading stats files directly")
+        client.close()
+        return None
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared-memory fuzzer stats bus')
+    parser.add_argument('--name', default=DEFAULT_BUS_NAME, help='Shared-memory segment name')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    collect_parser = subparsers.add_parser('collect', help='Run the collector daemon')
+    collect_parser.add_argument('roots', nargs='+', help='Campaign / AFL++ output directories')
+    collect_parser.add_argument('--interval', type=float, default=1.0, help='Seconds between ticks')
+    collect_parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY, help='Maximum instances')
+    collect_parser.add_argument('--max-depth', type=int, default=2, help='Directory levels searched per root')
+
+    subparsers.add_parser('show', help='Print the published stats once')
+
+    args = parser.parse_args()
+
+    if args.command == 'collect':
+        collector = StatsCollector(args.roots, args.name, args.capacity, args.max_depth)
+        signal.signal(signal.SIGTERM, lambda signum, frame: collector.stop())
+        try:
+            collector.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            collector.close()
+    else:
+        client = attach_stats_bus(args.name, max_age=float('inf'))
+        if client is None:
+            raise SystemExit(f"No stats bus named '{args.name}'")
+        rows = client.snapshot()
+        print(f"tick {client.tick}, {len(rows)} instances, {client.age:.1f}s ago")
+        for row in rows:
+            print(f"{os.fsdecode(row['directory']):60s} {'up' if row['alive'] else '--'} "
+                  f"cov {row['bitmap_cvg']:6.2f}% | paths {row['corpus_count']:6d} | "
+                  f"crashes {row['saved_crashes']:4d} | {row['execs_per_sec']:8.1f}/s")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
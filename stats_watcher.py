@@ -0,0 +1,349 @@
+"""
+Change-Detecting fuzzer_stats Reader
+Caches parsed fuzzer_stats files keyed by (inode, mtime_ns, size) so unchanged
+files are never re-read, and optionally watches their directories with Linux
+inotify (through ctypes) so monitors only touch the files that changed.
+"""
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+import logging
+
+from afl_stats import FuzzerStats, parse_fuzzer_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+StatsCallback = Callable[[str, FuzzerStats], None]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# AFL++ either rewrites fuzzer_stats in place or renames a temporary file over it
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class CachedStatsReader:
+    """
+    fuzzer_stats reader that re-parses a file only when it changed.
+
+    A file counts as changed when its (inode, mtime_ns, size) differs from
+    the last parse, which also catches AFL++ replacing the file by rename.
+    The returned FuzzerStats is shared between calls and must not be modified.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[Tuple[int, int, int], FuzzerStats]] = {}
+        self.parses = 0
+
+    def read(self, stats_file: Union[str, Path]) -> Optional[FuzzerStats]:
+        """
+        Return the parsed stats, re-parsing only if the file changed.
+
+        Args:
+            stats_file: Path to fuzzer_stats
+
+        Returns:
+            FuzzerStats record, or None if the file is missing or unreadable
+        """
+        path = str(stats_file)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._cache.pop(path, None)
+            return None
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        stats = parse_fuzzer_stats(path)
+        if stats is None:
+            return None
+        self._cache[path] = (key, stats)
+        self.parses += 1
+        return stats
+
+    def forget(self, stats_file: Union[str, Path]):
+        """Drop a file from the cache."""
+        self._cache.pop(str(stats_file), None)
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify, watching the directories of the given files."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+
+        self._wd_dirs: Dict[int, str] = {}
+        self._dir_wds: Dict[str, int] = {}
+        self._dir_files: Dict[str, Set[str]] = {}
+        # Files whose directory does not exist (yet), retried on every poll
+        self.pending: Set[str] = set()
+
+    def watch(self, path: str) -> bool:
+        """Watch the directory of a file; returns False if it cannot be watched yet."""
+        directory = os.path.dirname(path)
+        if directory not in self._dir_wds:
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                self.pending.add(path)
+                return False
+            self._wd_dirs[wd] = directory
+            self._dir_wds[directory] = wd
+
+        self._dir_files.setdefault(directory, set()).add(path)
+        self.pending.discard(path)
+        return True
+
+    def read_events(self, timeout: float) -> Tuple[Set[str], bool]:
+        """
+        Wait up to timeout seconds and drain pending events.
+
+        Returns:
+            (paths of files that changed, whether the event queue overflowed)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+
+        changed: Set[str] = set()
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                name = buf[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length]
+                offset += _EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif mask & IN_IGNORED:
+                    # Directory removed: its files go back to pending until it reappears
+                    directory = self._wd_dirs.pop(wd, None)
+                    if directory is not None:
+                        del self._dir_wds[directory]
+                        self.pending.update(self._dir_files.pop(directory, ()))
+                elif name:
+                    directory = self._wd_dirs.get(wd)
+                    if directory is not None:
+                        changed.add(os.path.join(directory, os.fsdecode(name.rstrip(b'\0'))))
+
+        return changed, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class StatsWatcher:
+    """
+    Pushes fuzzer_stats changes to subscribers.
+
+    With inotify, a poll only re-reads files the kernel reported as written;
+    without it (non-Linux, or use_inotify=False), every subscribed file is
+    stat()ed and only changed files are re-parsed. With a stats bus
+    (stats_bus.StatsBusClient), files the collector publishes are not read
+    at all. poll() can be called from a monitor loop, or start() runs it on
+    a background thread.
+    """
+
+    def __init__(self, use_inotify: bool = True, reader: Optional[CachedStatsReader] = None, bus=None):
+        """
+        Initialize the watcher.
+
+        Args:
+            use_inotify: Use inotify when available (Linux)
+            reader: Cache to read through (a new one by default)
+            bus: StatsBusClient to take published instances from (optional)
+        """
+        self.reader = reader or CachedStatsReader()
+        self.bus = bus
+        self._subscribers: Dict[str, List[StatsCallback]] = {}
+        self._latest: Dict[str, FuzzerStats] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable, falling back to stat polling: {e}")
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def subscribe(self, stats_file: Union[str, Path], callback: Optional[StatsCallback] = None):
+        """
+        Start watching a fuzzer_stats file (idempotent).
+
+        Args:
+            stats_file: Path to fuzzer_stats (need not exist yet)
+            callback: Called as callback(path, stats) whenever the file changes
+        """
+        path = os.path.abspath(stats_file)
+        with self._lock:
+            if path not in self._subscribers:
+                self._subscribers[path] = []
+                self._dirty.add(path)
+                if self._inotify is not None:
+                    self._inotify.watch(path)
+            if callback is not None:
+                self._subscribers[path].append(callback)
+
+    def unsubscribe(self, stats_file: Union[str, Path]):
+        """Stop watching a file."""
+        path = os.path.abspath(stats_file)
+        with self._lock:
+            self._subscribers.pop(path, None)
+            self._latest.pop(path, None)
+            self._dirty.discard(path)
+            self.reader.forget(path)
+
+    def get(self, stats_file: Union[str, Path]) -> Optional[FuzzerStats]:
+        """Latest stats seen for a subscribed file (as of the last poll)."""
+        return self._latest.get(os.path.abspath(stats_file))
+
+    def poll(self, timeout: float = 0.0) -> Dict[str, FuzzerStats]:
+        """
+        Process pending changes and notify subscribers.
+
+        Args:
+            timeout: Seconds to wait for inotify events (ignored without inotify)
+
+        Returns:
+            Dictionary of path -> stats for the files that changed
+        """
+        with self._lock:
+            published = self._from_bus()
+            self._collect_dirty(timeout)
+            self._dirty.difference_update(published)
+
+            changed: Dict[str, FuzzerStats] = {}
+            for path, stats in published.items():
+                if stats is not self._latest.get(path):
+                    self._latest[path] = stats
+                    changed[path] = stats
+            for path in self._dirty:
+                stats = self.reader.read(path)
+                if stats is not None and stats is not self._latest.get(path):
+                    self._latest[path] = stats
+                    changed[path] = stats
+            self._dirty.clear()
+
+            notifications = [(callback, path, stats) for path, stats in changed.items()
+                             for callback in self._subscribers.get(path, ())]
+
+        for callback, path, stats in notifications:
+            try:
+                callback(path, stats)
+            except Exception as e:
+                logger.error(f"Stats subscriber failed for {path}: {e}")
+
+        return changed
+
+    def _from_bus(self) -> Dict[str, FuzzerStats]:
+        """Stats of the subscribed files the bus publishes (none if it stopped ticking)."""
+        if self.bus is None:
+            return {}
+        try:
+            if not self.bus.refresh():
+                return {}
+        except TimeoutError as e:
+            logger.warning(f"{e}, reading stats files directly")
+            return {}
+
+        published = {}
+        for path in self._subscribers:
+            stats = self.bus.get(path)
+            if stats is not None:
+                published[path] = stats
+        return published
+
+    def _collect_dirty(self, timeout: float):
+        """Add the files that may have changed since the last poll to the dirty set (lock held)."""
+        if self._inotify is None:
+            self._dirty.update(self._subscribers)
+            return
+
+        # Retry directories that did not exist yet; files already there are read once
+        for path in list(self._inotify.pending):
+            if path not in self._subscribers:
+                self._inotify.pending.discard(path)
+            elif self._inotify.watch(path):
+                self._dirty.add(path)
+
+        events, overflow = self._inotify.read_events(timeout)
+        if overflow:
+            self._dirty.update(self._subscribers)
+        else:
+            self._dirty.update(path for path in events if path in self._subscribers)
+
+    def start(self, interval: float = 1.0):
+        """Poll on a background thread until stop() is called."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self.poll(timeout=interval if self._inotify is not None else 0.0)
+                if self._inotify is None:
+                    self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name='stats-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop polling and release the inotify descriptor (and the bus)."""
+        self.stop()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
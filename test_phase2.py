@@ -42,11 +42,316 @@ try:
     print(f"    - Policy loss: {stats.get('policy_loss', 0):.4f}")
     print(f"    - Value loss: {stats.get('value_loss', 0):.4f}")
     
+    # Test rollout buffer reuse with parallel environments
+    multi_agent = PPOAgent(state_dim=10, action_dim=8, hidden_dim=64, n_envs=4, buffer_size=16)
+    states_storage = multi_agent.buffer.states
+    for _ in range(2):
+        for _ in range(16):
+            actions = multi_agent.select_action(np.random.randn(4, 10))
+            assert actions.shape == (4,)
+            multi_agent.store_transition(np.random.randn(4), np.zeros(4))
+        multi_agent.update(n_epochs=1, batch_size=16)
+        assert len(multi_agent.buffer) == 0
+    assert multi_agent.buffer.states is states_storage
+    print("  ✓ Multi-env rollout buffer works")
+    
+    # Test approximate-KL early stopping of an update
+    assert stats['epochs_run'] == 2 and len(stats['epoch_times']) == 2 and not stats['early_stopped']
+    for target_kl, expected_epochs in ((None, 6), (1e-6, 1)):
+        for _ in range(35):
+            agent.select_action(np.random.randn(10))
+            agent.store_transition(reward=np.random.randn(), done=False)
+        kl_stats = agent.update(n_epochs=6, batch_size=16, target_kl=target_kl)
+        assert kl_stats['epochs_run'] == expected_epochs and len(kl_stats['epoch_times']) == expected_epochs
+        assert kl_stats['early_stopped'] == (target_kl is not None)
+    print("  ✓ Target-KL early stopping works")
+
+    # Test vectorized GAE against the per-step recurrence
+    from ppo_agent import compute_gae_batch
+    rewards = np.random.randn(200, 3)
+    values = np.random.randn(200, 3)
+    dones = (np.random.rand(200, 3) < 0.05).astype(np.float64)
+    next_value = np.random.randn(3)
+    advantages, returns = compute_gae_batch(rewards, values, dones, next_value, 0.99, 0.95)
+    expected = np.zeros_like(rewards)
+    last_gae, next_v = np.zeros(3), next_value
+    for t in reversed(range(200)):
+        delta = rewards[t] + 0.99 * next_v * (1 - dones[t]) - values[t]
+        expected[t] = last_gae = delta + 0.99 * 0.95 * (1 - dones[t]) * last_gae
+        next_v = values[t]
+    assert np.allclose(advantages, expected)
+    assert np.allclose(returns, expected + values)
+    print("  ✓ Vectorized GAE matches reference")
+
+    # Test NumPy policy snapshot parity with the torch network
+    import torch
+    import torch.nn.functional as F
+    from policy_snapshot import PolicySnapshot
+    from ppo_agent import sample_categorical as torch_sample_categorical
+    agent.export_snapshot("/tmp/test_snapshot.npz")
+    snapshot = PolicySnapshot.load("/tmp/test_snapshot.npz", seed=123)
+    test_states = np.random.randn(512, 10).astype(np.float32)
+    uniforms = np.random.rand(512)
+    with torch.no_grad():
+        logits, values = agent.network(torch.from_numpy(test_states))
+        probs = F.softmax(logits, dim=-1).numpy()
+        torch_log_probs = F.log_softmax(logits, dim=-1).numpy()
+    np_actions, np_log_probs, np_values = snapshot.get_action(test_states, deterministic=True)
+    assert np.array_equal(np_actions, logits.argmax(dim=-1).numpy())
+    assert np.allclose(np_values, values.squeeze(-1).numpy(), atol=1e-5)
+    np_actions, np_log_probs, _ = snapshot.get_action(test_states, uniforms=uniforms)
+    assert np.array_equal(np_actions, torch_sample_categorical(torch.from_numpy(probs), torch.from_numpy(uniforms)).numpy())
+    assert np.allclose(np_log_probs, torch_log_probs[np.arange(512), np_actions], atol=1e-5)
+    # Same draws, same actions: torch agent and NumPy snapshot under one seed
+    seeded_agent = PPOAgent(state_dim=10, action_dim=8, hidden_dim=64, seed=7)
+    seeded_agent.network.load_state_dict(agent.network.state_dict())
+    seeded_snapshot = PolicySnapshot.from_network(agent.network, seed=7)
+    torch_actions = []
+    for s in test_states[:200]:
+        torch_actions.append(seeded_agent.select_action(s))
+        seeded_agent.buffer.reset()
+    assert torch_actions == [seeded_snapshot.select_action(s) for s in test_states[:200]]
+    assert agent.network.get_action(torch.from_numpy(test_states[0]), uniforms=torch.tensor([uniforms[0]]))[0] == \
+        snapshot.get_action(test_states[:1], uniforms=uniforms[:1])[0][0]
+    print("  ✓ NumPy policy snapshot matches torch network")
+
     # Test save/load
     agent.save("/tmp/test_agent.pt")
     agent.load("/tmp/test_agent.pt")
     print("  ✓ Save/load works")
-    
+
+    # Test exported inference variants: scripted matches eager, quantized mostly agrees
+    from policy_export import build_variant, exported_path
+    variant_states = torch.from_numpy(np.random.randn(1000, 10).astype(np.float32))
+    with torch.no_grad():
+        eager_actions = agent.network(variant_states)[0].argmax(dim=-1)
+        scripted_actions = build_variant(agent.network, 'scripted')(variant_states)[0].argmax(dim=-1)
+        quantized_actions = build_variant(agent.network, 'quantized')(variant_states)[0].argmax(dim=-1)
+    quantized_agreement = (quantized_actions == eager_actions).float().mean().item()
+    assert torch.equal(scripted_actions, eager_actions) and quantized_agreement > 0.9
+    variant_agent = PPOAgent(state_dim=10, action_dim=8, hidden_dim=64)
+    variant_agent.network.load_state_dict(agent.network.state_dict())
+    variant_agent.set_inference_variant('scripted')
+    variant_agent.save("/tmp/test_variant_agent.pt")
+    assert exported_path("/tmp/test_variant_agent.pt", 'scripted').exists()
+    loaded_agent = PPOAgent(state_dim=10, action_dim=8, hidden_dim=64)
+    loaded_agent.load("/tmp/test_variant_agent.pt", variant='scripted')
+    assert isinstance(loaded_agent.policy_network, torch.jit.ScriptModule)
+    assert [loaded_agent.select_action(s.numpy(), deterministic=True) for s in variant_states[:100]] == \
+        eager_actions[:100].tolist()
+    print(f"  ✓ Exported policy variants work (quantized agreement {quantized_agreement * 100:.1f}%)")
+
+    # Test batched policy server: parity with the network, micro-batching, latency bound
+    import tempfile
+    import threading
+    import time
+    from policy_server import PolicyServer, PolicyClient
+    server_dir = tempfile.mkdtemp()
+    server = PolicyServer(state_dim=10, action_dim=8, hidden_dim=64,
+                          socket_path=f"{server_dir}/policy.sock", weights_path="/tmp/test_agent.pt",
+                          max_batch=16, max_latency_ms=20.0, reload_interval=0.1)
+    server.start()
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    clients = [PolicyClient(f"{server_dir}/policy.sock") for _ in range(4)]
+    server_states = np.random.randn(4, 5, 10).astype(np.float32)
+    replies = [[None] * 5 for _ in clients]
+    barrier = threading.Barrier(len(clients))
+
+    def run_client(i):
+        for j in range(5):
+            barrier.wait()
+            action = clients[i].select_action(server_states[i, j], deterministic=True)
+            replies[i][j] = (action, clients[i].last_value)
+
+    client_threads = [threading.Thread(target=run_client, args=(i,)) for i in range(len(clients))]
+    for thread in client_threads:
+        thread.start()
+    for thread in client_threads:
+        thread.join()
+    with torch.no_grad():
+        server_logits, server_values = agent.network(torch.from_numpy(server_states.reshape(20, 10)))
+    assert [r[0] for rows in replies for r in rows] == server_logits.argmax(dim=-1).tolist()
+    assert np.allclose([r[1] for rows in replies for r in rows], server_values.squeeze(-1).numpy(), atol=1e-5)
+    # A lone request waits at most the latency bound (plus forward pass and scheduling slack)
+    lone_start = time.perf_counter()
+    clients[0].select_action(server_states[0, 0])
+    lone_latency = time.perf_counter() - lone_start
+    assert lone_latency < server.max_latency + 0.03
+    for client in clients:
+        client.close()
+    server.running = False
+    server_thread.join(timeout=5)
+    # Counters are read once the server thread is done (it counts after replying)
+    assert server.requests_served == 21 and server.batches_run < server.requests_served
+    print(f"  ✓ Policy server batches requests ({server.batches_run} batches, "
+          f"lone request {lone_latency * 1000:.1f} ms)")
+
+    # Test distributed PPO round trip: two actors stream chunks, the learner trains on them
+    from distributed_ppo import DistributedLearner, DistributedActor
+    from policy_snapshot import PolicySnapshot
+    dist_learner = DistributedLearner(ppo_config={'hidden_dim': 32}, socket_path=f"{server_dir}/learner.sock",
+                                      unroll_length=8, chunks_per_update=4, n_epochs=2, batch_size=16)
+    dist_learner.start()
+    actors = [DistributedActor(f"{server_dir}/learner.sock", timeout=10.0, seed=i) for i in range(2)]
+    assert all(a.policy_version == 0 for a in actors)
+    sent_chunks = [[] for _ in actors]
+    def run_actor(i, n_chunks):
+        for _ in range(n_chunks):
+            chunk_states = np.random.default_rng(10 * i + len(sent_chunks[i])).standard_normal((8, 10))
+            for row in chunk_states:
+                actors[i].select_action(row)
+                actors[i].store_transition(reward=float(row[0] > 0), done=False)
+            sent_chunks[i].append(chunk_states.astype(np.float32))
+    actor_threads = [threading.Thread(target=run_actor, args=(i, 2)) for i in range(2)]
+    for t in actor_threads:
+        t.start()
+    dist_stats = dist_learner.train_step(timeout=10.0)
+    for t in actor_threads:
+        t.join()
+    assert dist_learner.chunks_received == 4 and dist_stats['policy_version'] == 1
+    assert dist_stats['policy_lag_max'] == 0
+    trained_columns = [dist_learner.buffer.states[:, c] for c in range(4)]
+    assert all(any(np.array_equal(col, chunk) for col in trained_columns)
+               for chunks in sent_chunks for chunk in chunks)
+    # The reply to each actor's next chunk carries the new weights
+    for i in range(2):
+        run_actor(i, 1)
+    learner_snapshot = PolicySnapshot.from_network(dist_learner.agent.network)
+    probe = np.random.randn(4, 10).astype(np.float32)
+    for a in actors:
+        assert a.policy_version == 1
+        assert np.allclose(a.policy.forward(probe)[0], learner_snapshot.forward(probe)[0], atol=1e-5)
+        a.close()
+    dist_learner.stop()
+    print("  ✓ Distributed learner trains on actor chunks and broadcasts weights")
+
+    # Test policy library warm-start lookup and eviction
+    import tempfile
+    from policy_library import PolicyLibrary
+    with tempfile.TemporaryDirectory() as libdir:
+        library = PolicyLibrary(libdir, max_entries=2)
+        assert library.lookup({'binary_hash': 'a', 'benchmark': 'x', 'input_type': 'png'}) is None
+        library.set_generic("/tmp/test_agent.pt")
+        library.add("/tmp/test_agent.pt", {'binary_hash': 'a', 'benchmark': 'libpng', 'input_type': 'png'})
+        match_id = library.add("/tmp/test_agent.pt", {'binary_hash': 'b', 'benchmark': 'libpng', 'input_type': 'raw'})
+        found = library.lookup({'binary_hash': 'c', 'benchmark': 'libpng', 'input_type': 'raw'})
+        assert found.name == f"{match_id}.pt"
+        assert library.lookup({'binary_hash': 'z', 'benchmark': 'y', 'input_type': 'w'}).name == "generic.pt"
+        library.add("/tmp/test_agent.pt", {'binary_hash': 'd', 'benchmark': 'sqlite', 'input_type': 'sql'})
+        assert len(library.entries()) == 3  # Two stored agents plus the generic prior
+        agent.load(str(found))
+    # Entries of another network shape are skipped; an entry that fails to load means a cold start
+    from fuzzing_controller import FuzzingController
+    with tempfile.TemporaryDirectory() as libdir:
+        library = PolicyLibrary(libdir)
+        legacy_id = library.add("/tmp/test_agent.pt", {'binary_hash': 'b', 'benchmark': 'libpng', 'input_type': 'raw'})
+        shaped = {'binary_hash': 'b', 'benchmark': 'libpng', 'input_type': 'raw', 'hidden_dim': 64}
+        shaped_id = library.add("/tmp/test_agent.pt", shaped)
+        assert library.lookup(shaped).name == f"{shaped_id}.pt"
+        assert library.lookup(dict(shaped, hidden_dim=32)).name == f"{legacy_id}.pt"
+        (Path(libdir) / "seeds").mkdir()
+        (Path(libdir) / "seeds" / "seed.raw").write_bytes(b"seed")
+        cold = FuzzingController(sys.executable, f"{libdir}/seeds", f"{libdir}/out", config={
+            'ppo': {'policy_library': libdir, 'hidden_dim': 32},
+            'experiment': {'benchmark': 'libpng', 'input_type': 'raw'},
+        })
+        assert cold.agent.network.shared_fc1.out_features == 32
+        cold.feedback_analyzer.close()
+    print("  ✓ Policy library warm start works")
+
+    # Test background learner: acting during training, weight swap, policy lag and retry
+    import threading
+    import torch
+    from ppo_agent import AsyncLearner
+    async_agent = PPOAgent(state_dim=10, action_dim=8, hidden_dim=32, buffer_size=64, seed=1)
+    learner = AsyncLearner(async_agent, n_epochs=2, batch_size=16)
+    train_update = async_agent.update
+    release = threading.Event()
+    def gated_update(*args, **kwargs):
+        release.wait(10)
+        return train_update(*args, **kwargs)
+    def failing_update(*args, **kwargs):
+        raise RuntimeError("simulated update failure")
+    def act(steps):
+        for _ in range(steps):
+            async_agent.select_action(np.random.randn(10))
+            async_agent.store_transition(reward=np.random.randn(), done=False)
+    async_agent.update = gated_update
+    act(40)
+    old_policy = async_agent.policy_network
+    assert learner.submit() and not learner.submit()
+    act(40)  # Recorded with policy version 0 while the update runs
+    assert learner.poll() is None and len(async_agent.buffer) == 40
+    release.set()
+    learner.wait()
+    async_stats = learner.poll()
+    assert async_stats['policy_version'] == 1 and learner.updates_completed == 1
+    assert async_agent.policy_network is not old_policy
+    assert all(torch.equal(p, q) for p, q in zip(async_agent.policy_network.parameters(),
+                                                 async_agent.network.parameters()))
+    assert learner.submit()
+    learner.wait()
+    lag_stats = learner.poll()
+    assert lag_stats['policy_lag_max'] == 1 and lag_stats['policy_version'] == 2
+    async_agent.update = failing_update
+    act(20)
+    assert learner.submit()
+    learner.wait()
+    assert learner.poll() is None and learner.updates_failed == 1 and learner.updates_completed == 2
+    async_agent.update = train_update
+    act(5)
+    assert learner.submit()  # Retries the kept rollout; the agent keeps its buffer
+    learner.wait()
+    assert learner.poll()['policy_version'] == 3 and learner.updates_completed == 3
+    assert len(async_agent.buffer) == 5
+    print("  ✓ Background learner works")
+
+    # Test off-policy DQN agent with prioritized replay (same interface)
+    from dqn_agent import DQNAgent
+    dqn = DQNAgent(state_dim=10, action_dim=8, hidden_dim=64, buffer_size=64, seed=0)
+    for _ in range(80):
+        action = dqn.select_action(np.random.randn(10))
+        dqn.store_transition(reward=float(action == 2), done=False)
+    dqn_stats = dqn.update(n_epochs=4, batch_size=16)
+    assert len(dqn.buffer) == 64 and dqn_stats['gradient_steps'] == 4
+    assert abs(dqn.buffer.tree[1] - dqn.buffer.tree[dqn.buffer.tree_size:].sum()) < 1e-6
+    dqn.save("/tmp/test_dqn.pt")
+    restored = DQNAgent(state_dim=10, action_dim=8, hidden_dim=64, buffer_size=64)
+    restored.load("/tmp/test_dqn.pt")
+    assert len(restored.buffer) == 64 and set(restored.buffer.actions) == set(dqn.buffer.actions)
+    print("  ✓ DQN agent with prioritized replay works")
+
+    # Test sweep search space sampling and PBT perturbation bounds
+    from hyperparameter_sweep import SEARCH_SPACE, sample_params, perturb_params, to_framework_config
+    sweep_rng = np.random.default_rng(0)
+    params = sample_params(sweep_rng)
+    for _ in range(50):
+        params = perturb_params(params, sweep_rng)
+        for name, (kind, *spec) in SEARCH_SPACE.items():
+            assert params[name] in spec[0] if kind == 'choice' else spec[0] <= params[name] <= spec[1]
+    assert set(to_framework_config(params)) == {'ppo_learning_rate', 'ppo_batch_size', 'ppo_epochs'}
+    print("  ✓ Hyperparameter sweep sampling works")
+
+    # Test sweep bookkeeping: shared worker data stays out of tasks, failed trials serialize as null
+    import json
+    from hyperparameter_sweep import PopulationSweep, run_trial
+    with tempfile.TemporaryDirectory() as sweep_dir:
+        sweep = PopulationSweep(sweep_dir, population_size=2, n_workers=1, seed=0,
+                                traces=[np.zeros((4, 8))], n_envs=2)
+        sweep_tasks = sweep._tasks(0)
+        assert 'traces' not in sweep_tasks[0] and sweep_tasks[0]['n_envs'] == 2
+        assert 'traces' in sweep.trial_kwargs
+        failed_trial = run_trial(sweep_tasks[0])  # No worker traces: the trial fails
+        assert failed_trial['failed'] and failed_trial['score'] is None
+        ok_trial = dict(failed_trial, member=1, score=0.5, failed=False)
+        sweep.history = [failed_trial, ok_trial]
+        sweep.write_results([ok_trial, failed_trial])
+        history_text = (Path(sweep_dir) / "sweep_history.json").read_text()
+        assert 'Infinity' not in history_text and json.loads(history_text)[0]['score'] is None
+        assert json.loads((Path(sweep_dir) / "best_config.json").read_text())['score'] == 0.5
+    print("  ✓ Hyperparameter sweep records failed trials")
+
     print("✓ PPO Agent: PASS\n")
     
 except Exception as e:
@@ -96,7 +401,46 @@ pending_total     : 25
         assert metrics is not None
         assert metrics.coverage > 0
         print(f"  ✓ Metrics parsing works (coverage={metrics.coverage:.2f}%)")
-        
+
+        # Shared parser: legacy and AFL++ 4.x key names map to the same fields
+        from afl_stats import parse_stats_text
+        legacy = parse_stats_text(stats_content)
+        current = parse_stats_text(stats_content.replace('paths_total', 'corpus_count') + "afl_banner : x:y\n")
+        assert legacy.corpus_count == current.corpus_count == metrics.paths_total == 150
+        assert current.stability == 98.5 and current.execs_done == 100000
+        assert current.afl_banner == 'x:y' and current.get('paths_total') == 150
+        # Values are converted when read; failures read as the default and land in extras
+        lazy = parse_stats_text("cycles_done : 3\nexec_timeout : 20+\nunique_hangs : 4\nnew_key : v\n")
+        assert lazy.cycles_done == 3 and lazy.saved_hangs == 4 and lazy.exec_timeout == 0
+        assert lazy.extras == {'exec_timeout': '20+', 'new_key': 'v'} and lazy.afl_version == ''
+        print("  ✓ Shared fuzzer_stats parser works")
+
+        # Unchanged files are served from the cache; watchers see rewrites
+        from stats_watcher import StatsWatcher
+        analyzer.get_current_metrics()
+        assert analyzer.stats_reader.parses == 1
+        watcher = StatsWatcher()
+        seen = []
+        watcher.subscribe(stats_file, lambda path, stats: seen.append(stats.corpus_count))
+        watcher.poll()
+        stats_file.write_text(stats_content.replace('150', '151'))
+        watcher.poll(timeout=0.5)
+        uses_inotify = watcher.uses_inotify
+        watcher.close()
+        assert seen == [150, 151] and analyzer.get_current_metrics().paths_total == 151
+        print(f"  ✓ Change-detecting stats watcher works (inotify={uses_inotify})")
+
+        # Rate features come from the plot_data tail when rows are available
+        plot_file = output_dir / "default" / "plot_data"
+        header = "# relative_time, cycles_done, cur_item, corpus_count, pending_total, pending_favs, map_size, saved_crashes\n"
+        plot_file.write_text(header + "0, 0, 0, 100, 0, 0, 40.00%, 0\n30, 0, 0, 130, 0, 0, 43.00%, 3\n")
+        analyzer.update()
+        state = analyzer.get_state_vector()
+        assert len(analyzer.plot_tail) == 2 and abs(state[1] - 0.1) < 1e-9 and abs(state[6] - 1.0) < 1e-9
+        plot_file.write_text(header + "0, 0, 0, 5, 0, 0, 1.00%, 0\n")  # AFL restart
+        assert analyzer.plot_tail.poll() == 1 and analyzer.plot_tail.restarts == 1
+        print("  ✓ plot_data tail reader works")
+
         # Test state generation
         analyzer.update()
         state, reward = analyzer.get_state_and_reward()
@@ -107,7 +451,61 @@ pending_total     : 25
         summary = analyzer.get_summary()
         assert 'current_metrics' in summary
         print("  ✓ Summary generation works")
-        
+
+        # Columnar history: O(1) ring appends, zero-copy windows, memmappable log
+        from metrics_history import MetricsHistory, load_history_file
+        history = MetricsHistory(3, sample_type=FuzzingMetrics, log_file=output_dir / "metrics_log.bin")
+        for i in range(5):
+            metrics.timestamp, metrics.unique_crashes = 100.0 + i, i
+            history.append(metrics)
+        history.close()
+        assert len(history) == 3 and history[-1].unique_crashes == 4 and history[0].unique_crashes == 2
+        assert np.shares_memory(history.window(2), history._data)
+        assert list(history.column('unique_crashes')) == [2, 3, 4] and history.since(1.0).shape[1] == 2
+        assert len(load_history_file(output_dir / "metrics_log.bin")) == 5
+        print("  ✓ Columnar metrics history works")
+
+        # Parallel campaigns: every -M/-S instance is read, plus an aggregate
+        parallel_dir = Path(tmpdir) / "parallel"
+        for i, name in enumerate(['master', 'slave1']):
+            (parallel_dir / name).mkdir(parents=True)
+            (parallel_dir / name / "fuzzer_stats").write_text(stats_content)
+            bitmap = np.full(64, 0xff, dtype=np.uint8)
+            bitmap[i * 8:i * 8 + 16] = 0  # overlapping 16-edge ranges, 24 edges in total
+            bitmap.tofile(parallel_dir / name / "fuzz_bitmap")
+        parallel = FeedbackAnalyzer(str(parallel_dir))
+        assert parallel.update() and sorted(parallel.instances) == ['master', 'slave1']
+        total = parallel.metrics_history[-1]
+        assert total.unique_crashes == 6 and abs(total.execs_per_sec - 5001.0) < 1e-6
+        assert total.coverage == 100.0 * 24 / 64 and total.paths_total == 150
+        assert set(parallel.get_instance_states()) == {'master', 'slave1'}
+        parallel.close()
+        print("  ✓ Multi-instance aggregation works")
+
+        # Stats bus: one collector publishes, clients read shared memory
+        import os
+        from stats_bus import StatsCollector, attach_stats_bus
+        collector = StatsCollector([parallel_dir], name=f"test_bus_{os.getpid()}", capacity=4)
+        assert collector.tick() == 2
+        client = attach_stats_bus(collector.name)
+        bus_watcher = StatsWatcher(use_inotify=False, bus=client)
+        bus_watcher.subscribe(parallel_dir / "slave1" / "fuzzer_stats")
+        bus_watcher.poll()
+        assert bus_watcher.get(parallel_dir / "slave1" / "fuzzer_stats").corpus_count == 150
+        assert list(client.column('saved_crashes')) == [3, 3] and bus_watcher.reader.parses == 0
+        bus_watcher.close()
+        collector.close()
+
+        # A bus that cannot give a consistent snapshot falls back to the stats file
+        from ppo_fuzzing_controller import PPOFuzzingController
+        class StalledBus:
+            def refresh(self):
+                raise TimeoutError("stats bus stalled")
+        ppo_controller = PPOFuzzingController(output_dir, "test")
+        ppo_controller.stats_bus = StalledBus()
+        assert ppo_controller.read_stats().corpus_count == parse_stats_text(stats_file.read_text()).corpus_count > 0
+        print("  ✓ Shared-memory stats bus works")
+
     print("✓ Feedback Analyzer: PASS\n")
     
 except Exception as e:
@@ -151,7 +549,104 @@ try:
     distribution = selector.get_strategy_distribution()
     assert abs(sum(distribution.values()) - 1.0) < 0.01
     print("  ✓ Distribution calculation works")
-    
+
+    # Test policy distillation into a decision tree loadable by the selector
+    from policy_distill import distill
+    teacher = PPONetwork(10, selector.get_num_actions(), 64)
+    distill_states = np.random.randn(20000, 10).astype(np.float32)
+    tree, report = distill(teacher, distill_states, selector.get_num_actions(), max_depth=8, seed=0)
+    assert report['holdout_agreement'] > 0.5
+    assert all(tree.act(s) == a for s, a in zip(distill_states[:200], tree.predict(distill_states[:200])))
+    tree.save("/tmp/test_distilled.npz")
+    selector.load_distilled_policy("/tmp/test_distilled.npz")
+    assert selector.select_strategy_for_state(distill_states[0]) == MutationStrategy(tree.act(distill_states[0]))
+    print(f"  ✓ Policy distillation works ({report['holdout_agreement']*100:.1f}% agreement)")
+
+    # AFL++ custom mutator follows the strategy the controller publishes
+    import os
+    import afl_mutator
+    from mutation_selector import CONTROL_ENV, MutatorControl
+    control = MutatorControl(create=True)
+    os.environ[CONTROL_ENV] = control.name
+    afl_mutator.init(0)
+    assert afl_mutator.describe(64) == "ppo" and afl_mutator.fuzz(bytearray(b"abc"), None, 2) == b"ab"
+    control.publish(MutationStrategy.HAVOC_HEAVY, selector.get_afl_mutation_config(MutationStrategy.HAVOC_HEAVY))
+    assert afl_mutator.fuzz_count(bytearray(b"seed")) == 1024 + 128
+    assert afl_mutator.describe(64) == "ppo-havoc_heavy" and 0 < len(afl_mutator.fuzz(bytearray(b"seed"), None, 4)) <= 4
+    # A controller killed mid-publish leaves the sequence odd; readers give up and keep the strategy
+    control_reader = MutatorControl(control.name)
+    assert control_reader.poll()[0] == MutationStrategy.HAVOC_HEAVY
+    stuck_seq = MutatorControl._SEQ.unpack_from(control._buf, 8)[0] + 1
+    MutatorControl._SEQ.pack_into(control._buf, 8, stuck_seq)
+    assert control_reader.poll() is None
+    assert afl_mutator.fuzz_count(bytearray(b"seed")) == 1024 + 128
+    assert afl_mutator.describe(64) == "ppo-havoc_heavy"
+    control_reader.close()
+    afl_mutator.deinit()
+    control.close()
+    del os.environ[CONTROL_ENV]
+    print("  ✓ AFL++ custom mutator follows the control block")
+
+    # Vectorized kernels mutate in place, stay within max_size and splice
+    import mutation_kernels
+    kernel_rng = np.random.default_rng(0)
+    seed_input = b"\x5a" * 64
+    for kernel in (mutation_kernels.flip_bits, mutation_kernels.flip_bytes,
+                   mutation_kernels.arith, mutation_kernels.interesting):
+        assert kernel(mutation_kernels.as_buffer(seed_input), kernel_rng, n=4).tobytes() != seed_input
+    for _ in range(50):
+        assert mutation_kernels.havoc(mutation_kernels.as_buffer(seed_input), kernel_rng, max_size=96).size <= 96
+    spliced = mutation_kernels.splice(mutation_kernels.as_buffer(seed_input), bytes(64), kernel_rng, stack_pow=1)
+    assert spliced.size > 0
+    print("  ✓ Vectorized mutation kernels work")
+
+    # Batches of mutants are memoryviews into one reusable arena
+    from mutation_selector import AFLCustomMutator
+    batch_mutator = AFLCustomMutator(seed=0)
+    for strategy in (MutationStrategy.BITFLIP, MutationStrategy.HAVOC_MEDIUM):
+        batch_mutator.set_strategy(int(strategy))
+        batch = batch_mutator.mutate_batch(seed_input, 100, 80)
+        assert len(batch) == 100 and all(v.obj is batch_mutator.arena and 0 < len(v) <= 80 for v in batch)
+        assert sum(bytes(v) != seed_input for v in batch) > 90
+    print("  ✓ Batch mutation into the output arena works")
+
+    # Deterministic stages resume per seed across strategy switches and restarts, never repeating
+    cursor_file = "/tmp/test_cursors.bin"
+    if os.path.exists(cursor_file):
+        os.remove(cursor_file)
+    walk_seed = bytearray(range(16))
+    walk_mutator = AFLCustomMutator(seed=0, cursor_file=cursor_file)
+    walk_mutator.set_strategy(int(MutationStrategy.BITFLIP))
+    total_steps = walk_mutator.fuzz_count(walk_seed)
+    walk = [bytes(walk_mutator.fuzz(walk_seed, None, 64)) for _ in range(50)]
+    walk_mutator.set_strategy(int(MutationStrategy.HAVOC_LIGHT))
+    walk_mutator.fuzz_count(walk_seed)
+    walk_mutator.fuzz(walk_seed, None, 64)
+    walk_mutator.set_strategy(int(MutationStrategy.BITFLIP))
+    assert walk_mutator.fuzz_count(walk_seed) == total_steps - 50
+    walk += [bytes(walk_mutator.fuzz(walk_seed, None, 64)) for _ in range(100)]
+    walk_mutator.close()
+    walk_mutator = AFLCustomMutator(seed=0, cursor_file=cursor_file)
+    walk_mutator.set_strategy(int(MutationStrategy.BITFLIP))
+    remaining_steps = walk_mutator.fuzz_count(walk_seed)
+    walk += [bytes(walk_mutator.fuzz(walk_seed, None, 64)) for _ in range(remaining_steps)]
+    assert remaining_steps == total_steps - 150 and len(set(walk)) == total_steps
+    assert walk_mutator.fuzz_count(walk_seed) == 0
+    walk_mutator.close()
+    # An input longer than max_size is not walked, so the cursor never lands in cut coordinates
+    from deterministic_stages import seed_id
+    long_seed = bytearray(range(100))
+    walk_mutator = AFLCustomMutator(seed=0)
+    walk_mutator.set_strategy(int(MutationStrategy.BITFLIP))
+    full_steps = walk_mutator.fuzz_count(long_seed)
+    assert all(len(walk_mutator.fuzz(long_seed, None, 50)) <= 50 for _ in range(full_steps))
+    assert walk_mutator.stages.cursor(seed_id(bytes(long_seed)), 'bitflip') == (0, 0)
+    assert walk_mutator.fuzz_count(long_seed) == full_steps
+    first_flip = bytes(walk_mutator.fuzz(long_seed, None, 200))
+    assert first_flip == bytes([long_seed[0] ^ 0x80]) + bytes(long_seed[1:])
+    walk_mutator.close()
+    print(f"  ✓ Deterministic stages resume without repeats ({total_steps} bitflips)")
+
     print("✓ Mutation Selector: PASS\n")
     
 except Exception as e:
@@ -216,10 +711,95 @@ pending_favs      : 5
         print(f"  ✓ Training loop simulation completed ({step+1} steps)")
         
         # Perform update
-        if len(agent.states) >= 4:
+        if len(agent.buffer) >= 4:
             stats = agent.update(n_epochs=1, batch_size=4)
             print("  ✓ Agent update completed")
-        
+
+        # Vectorized environment over several instances
+        from fuzz_env import VecFuzzEnv
+        for name in ("second", "third"):
+            (Path(tmpdir) / name / "default").mkdir(parents=True)
+            shutil.copy(stats_file, Path(tmpdir) / name / "default" / "fuzzer_stats")
+        vec_env = VecFuzzEnv.from_parent_dir(tmpdir)
+        assert vec_env.num_envs == 3
+        vec_agent = PPOAgent(state_dim=10, action_dim=8, n_envs=3)
+        obs = vec_env.reset()
+        for step in range(4):
+            actions = vec_agent.select_action(obs)
+            obs, rewards, dones, infos = vec_env.step(actions)
+            vec_agent.store_transition(rewards, dones)
+        assert obs.shape == (3, 10) and rewards.shape == (3,)
+        vec_agent.update(n_epochs=1, batch_size=4)
+        closed_analyzers = []
+        for env in vec_env.envs:
+            env.analyzer.close = lambda a=env.analyzer, close=env.analyzer.close: (closed_analyzers.append(a), close())
+        vec_env.close()
+        assert closed_analyzers == [env.analyzer for env in vec_env.envs]
+        print("  ✓ Vectorized environment works")
+
+        # Offline replay simulator on a synthetic plot_data trace
+        from types import SimpleNamespace
+        from feedback_analyzer import build_state_vector
+        from replay_simulator import ReplaySimulator, load_plot_data, TRACE_FIELDS
+        plot_data = Path(tmpdir) / "replay" / "plot_data"
+        plot_data.parent.mkdir()
+        plot_data.write_text(
+            "# relative_time, cycles_done, cur_item, corpus_count, pending_total, pending_favs, "
+            "map_size, saved_crashes, saved_hangs, max_depth, execs_per_sec, total_execs, edges_found\n"
+            + "".join(f"{t}, {i // 3}, 0, {20 + 7 * i}, 10, {9 - i}, {5.0 + 1.5 * i:.2f}%, {i // 2}, 0, 2, "
+                      f"{400 + 10 * i}.00, {1000 * t}, {100 + 5 * i}\n"
+                      for i, t in enumerate((0, 60, 90, 200, 260, 400)))
+        )
+        trace = load_plot_data(str(plot_data))
+        rows = [SimpleNamespace(**dict(zip(TRACE_FIELDS[1:], row[1:]))) for row in trace]
+        sim = ReplaySimulator([trace], n_envs=3, noise=0.0, seed=0)
+        obs = sim.reset()
+        assert obs.shape == (3, 10)
+        assert np.allclose(obs, build_state_vector(rows[0], None).astype(np.float32))
+        for t in range(1, 5):
+            obs, rewards, dones, _ = sim.step(np.arange(3))
+            expected = build_state_vector(rows[t], rows[t - 1], trace[t, 0] - trace[t - 1, 0])
+            assert obs.shape == (3, 10) and not dones.any()
+            assert np.allclose(obs, expected.astype(np.float32))
+        def replay_run(seed):
+            noisy = ReplaySimulator([trace, trace[:4] * 1.5], n_envs=4, noise=0.2, seed=seed)
+            outputs = [noisy.reset()]
+            for step in range(8):
+                outputs.extend(noisy.step(np.full(4, step % 8))[:3])
+            return outputs
+        assert all(np.array_equal(a, b) for a, b in zip(replay_run(5), replay_run(5)))
+        print("  ✓ Replay simulator matches build_state_vector and is deterministic")
+
+        # Checkpoint and resume a controller campaign
+        from fuzzing_controller import FuzzingController
+        import torch
+        seeds_dir = Path(tmpdir) / "seeds"
+        seeds_dir.mkdir()
+        (seeds_dir / "seed").write_bytes(b"seed")
+        controller = FuzzingController(sys.executable, str(seeds_dir), str(output_dir))
+        for _ in range(3):
+            controller.training_step()
+        controller.episodes = 2
+        controller.save_checkpoint(suffix="_periodic")
+        expected_draw = np.random.rand()
+        resumed = FuzzingController(sys.executable, str(seeds_dir), str(output_dir))
+        assert resumed.resume()
+        assert np.random.rand() == expected_draw
+        assert len(resumed.agent.buffer) == len(controller.agent.buffer) == 3
+        assert np.array_equal(resumed.agent.buffer.states[:3], controller.agent.buffer.states[:3])
+        assert all(torch.equal(a, b) for a, b in zip(resumed.agent.network.parameters(),
+                                                     controller.agent.network.parameters()))
+        assert len(resumed.feedback_analyzer.metrics_history) == 3
+        assert resumed.feedback_analyzer.baseline_metrics.coverage == \
+               controller.feedback_analyzer.baseline_metrics.coverage
+        assert resumed.mutation_selector.strategy_stats == controller.mutation_selector.strategy_stats
+        assert resumed.episodes == 2
+        # Checkpoint histories are picked up as replay traces
+        from replay_simulator import load_traces
+        checkpoint_traces = load_traces([str(output_dir / "checkpoints")])
+        assert len(checkpoint_traces) == 1 and len(checkpoint_traces[0]) == 3
+        print("  ✓ Campaign checkpoint/resume works")
+
     print("✓ Integration Test: PASS\n")
     
 except Exception as e: